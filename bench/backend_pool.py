@@ -0,0 +1,117 @@
+"""
+Ollama 서버 풀 확인 스크립트
+
+가짜 Ollama 서버(bench.fake_ollama)를 여러 포트에 띄워 다음을 측정/확인합니다.
+  1. 서버 수에 따른 처리량 (처리 중 요청이 가장 적은 서버로 분배)
+  2. 한 서버가 계속 실패할 때 다른 서버로 재시도하고 그 서버를 제외하는지
+  3. 한 서버가 느릴 때 헤징(다른 서버에 같은 요청을 보냄)으로 꼬리 지연이 줄어드는지
+
+사용 예:
+    python -m bench.backend_pool --servers 1 2 4 --requests 40 --latency 0.2
+"""
+import sys
+import os
+import time
+import asyncio
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench.fake_ollama import start_server, stop_server
+from utils import llm_scheduler
+from utils.backend_pool import BackendPool
+from utils.ollama_utils import OllamaClient
+
+# 서버 풀만 측정하도록 앞단 대기열(동시 실행 제한)은 끔
+llm_scheduler.LLM_SCHEDULER_ENABLED = False
+
+BASE_PORT = 11500
+
+async def run_requests(client, count):
+    """count개의 요청을 동시에 보내고 (소요 시간, 요청별 지연 목록, 실패 수)를 반환합니다."""
+    latencies = []
+    failures = 0
+
+    async def one(i):
+        nonlocal failures
+        started = time.perf_counter()
+        try:
+            await client.generate(f"선택지 {i}")
+            latencies.append(time.perf_counter() - started)
+        except Exception:
+            failures += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(count)))
+    return time.perf_counter() - started, sorted(latencies), failures
+
+def percentile(values, p):
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+async def with_servers(specs, **pool_options):
+    """specs [(포트, create_app 인자)]대로 서버를 띄우고 클라이언트를 만들어 반환합니다."""
+    servers = [await start_server(port, **kwargs) for port, kwargs in specs]
+    pool = BackendPool([f"http://127.0.0.1:{port}" for port, _ in specs], **pool_options)
+    return servers, OllamaClient(pool)
+
+async def shutdown(servers, client):
+    await client.aclose()
+    for server, task in servers:
+        await stop_server(server, task)
+
+async def scaling(server_counts, requests, latency):
+    print("1. 서버 수별 처리량 (서버당 동시 처리 1개)")
+    print(f"{'서버':>4} {'초':>8} {'요청/초':>8} {'p50':>7} {'p99':>7}")
+    for count in server_counts:
+        specs = [(BASE_PORT + i, {"latency": latency}) for i in range(count)]
+        servers, client = await with_servers(specs)
+        try:
+            elapsed, latencies, _ = await run_requests(client, requests)
+        finally:
+            await shutdown(servers, client)
+        print(f"{count:>4} {elapsed:>8.2f} {requests / elapsed:>8.1f} "
+              f"{percentile(latencies, 50):>7.2f} {percentile(latencies, 99):>7.2f}")
+
+async def failover(requests, latency):
+    print("2. 실패하는 서버 제외")
+    specs = [(BASE_PORT, {"latency": latency}), (BASE_PORT + 1, {"latency": latency, "fail": True})]
+    servers, client = await with_servers(specs, eject_after_failures=2, eject_duration=60.0)
+    try:
+        _, _, failures = await run_requests(client, requests)
+        stats = client.pool.stats()["backends"]
+    finally:
+        await shutdown(servers, client)
+    print(f"   실패한 요청: {failures}/{requests}")
+    for backend in stats:
+        print(f"   {backend['url']}: 요청 {backend['requests']}, 실패 {backend['failures']}, 제외 {backend['ejected']}")
+
+async def hedging(requests, latency):
+    print("3. 느린 서버가 섞였을 때 헤징 효과")
+    for enabled in (False, True):
+        # 빠른 서버 3대와 10배 느린 서버 1대
+        specs = [(BASE_PORT + i, {"latency": latency, "parallel": 100}) for i in range(3)]
+        specs.append((BASE_PORT + 3, {"latency": latency * 10, "parallel": 100}))
+        servers, client = await with_servers(specs, hedge_enabled=enabled, hedge_percentile=70, hedge_min_samples=5)
+        try:
+            # 지연 표본을 먼저 모음
+            await run_requests(client, 20)
+            _, latencies, failures = await run_requests(client, requests)
+            hedged = client.pool.hedged
+        finally:
+            await shutdown(servers, client)
+        print(f"   헤징 {'켬' if enabled else '끔'}: p50 {percentile(latencies, 50):.2f}초, "
+              f"p99 {percentile(latencies, 99):.2f}초, 헤징 {hedged}회, 실패 {failures}")
+
+async def main(args):
+    await scaling(args.servers, args.requests, args.latency)
+    await failover(args.requests, args.latency)
+    await hedging(args.requests, args.latency)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ollama 서버 풀 확인")
+    parser.add_argument("--servers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--requests", type=int, default=40)
+    parser.add_argument("--latency", type=float, default=0.1, help="가짜 서버의 요청당 처리 시간(초)")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,72 @@
+"""
+로컬 오답 엔진 조회 속도 측정 스크립트
+
+임시 디렉토리에 색인을 만들고 메모리 매핑으로 불러온 뒤, 단어 목록에 있는 의미와
+없는 의미(문자 n-gram으로 찾음)를 각각 조회해 조회당 지연(p50/p99)과 오답을 찾은 비율을 출력합니다.
+
+사용 예:
+    python -m bench.distractor_engine --queries 5000 --show 10
+"""
+import sys
+import os
+import time
+import random
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.distractor_engine import DistractorEngine, build_distractor_index
+
+# 단어 목록에 없는 의미 (학생 단어장에 나올 만한 것)
+UNKNOWN_MEANINGS = [
+    "포기하다", "행복감", "기차표", "수학여행", "우주비행사", "초록빛", "배려하는", "도전적인",
+    "놀이기구", "환경보호", "자원봉사", "바닷바람", "눈사람", "생일잔치", "물놀이", "등굣길",
+]
+
+def percentile(values, p):
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+def measure(engine, meanings, queries):
+    """무작위로 고른 의미를 queries번 조회하고 (지연 목록(마이크로초), 성공 수)를 반환합니다."""
+    latencies = []
+    found = 0
+    for _ in range(queries):
+        meaning = random.choice(meanings)
+        started = time.perf_counter()
+        result = engine.nearest(meaning)
+        latencies.append((time.perf_counter() - started) * 1e6)
+        found += result is not None
+    return sorted(latencies), found
+
+def main(args):
+    with tempfile.TemporaryDirectory() as directory:
+        vectors_path = os.path.join(directory, "vectors.npy")
+        meanings_path = os.path.join(directory, "meanings.json")
+
+        started = time.perf_counter()
+        build_distractor_index(vectors_path, meanings_path)
+        print(f"색인 생성: {(time.perf_counter() - started) * 1000:.1f}ms")
+
+        started = time.perf_counter()
+        engine = DistractorEngine.load(vectors_path, meanings_path)
+        print(f"불러오기(메모리 매핑): {(time.perf_counter() - started) * 1000:.1f}ms, "
+              f"행렬 {engine.vectors.shape[0]}x{engine.vectors.shape[1]}")
+
+        # 첫 조회는 페이지를 읽어 들이므로 제외
+        engine.nearest("사과")
+
+        print(f"{'질의':<10} {'p50(us)':>9} {'p99(us)':>9} {'최대(us)':>9} {'찾음':>7}")
+        for name, meanings in (("목록 안", engine.meanings), ("목록 밖", UNKNOWN_MEANINGS)):
+            latencies, found = measure(engine, meanings, args.queries)
+            print(f"{name:<10} {percentile(latencies, 50):>9.1f} {percentile(latencies, 99):>9.1f} "
+                  f"{latencies[-1]:>9.1f} {found / args.queries:>7.0%}")
+
+        for meaning in random.sample(engine.meanings, args.show) + UNKNOWN_MEANINGS[:args.show]:
+            print(f"   {meaning}: {engine.nearest(meaning)}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="로컬 오답 엔진 조회 속도 측정")
+    parser.add_argument("--queries", type=int, default=5000)
+    parser.add_argument("--show", type=int, default=5, help="결과 예시를 보여 줄 의미 수")
+    main(parser.parse_args())
@@ -0,0 +1,354 @@
+"""
+엔드포인트 지연/처리량 측정 스크립트
+
+가짜 Ollama 서버(bench.fake_ollama)와 프로세스 내 MongoDB 대체 컬렉션(bench.fake_mongo)을 띄우고
+실제 앱(main.app)을 uvicorn으로 실행한 뒤, 다음 엔드포인트를 동시 요청 수별로 호출합니다.
+  generate  POST /vocabulary/generate (단어 count개)
+  options   POST /vocabulary/generate-options (요청마다 처음 보는 단어 words개, 오답 저장소에 없음)
+  list      GET  /vocabulary (미리 저장한 단어장에서 limit개)
+
+동시 요청 수마다 워커가 끝나는 대로 다음 요청을 보내며(closed loop), 처리량과 p50/p95/p99 지연,
+요청당 Ollama 호출 수와 재시도율(배치에서 빠진 단어를 다시 생성한 횟수 / 요청 수), 파싱 실패 수를
+출력하고 결과를 JSON 파일(bench/results/)로 저장합니다. --compare로 이전 결과 파일을 주면
+p50/p99 지연과 처리량이 threshold% 넘게 나빠진 항목을 보고하고 종료 코드 1로 끝납니다.
+
+응답 캐시와 단어 풀, 구조화 로그는 측정을 흐리므로 기본으로 끄며(--cache, --pool, --log로 켬),
+--mongo-url을 주면 대체 컬렉션 대신 실제 mongod의 임시 데이터베이스를 사용합니다(끝나면 삭제).
+--malformed-rate로 가짜 Ollama의 텍스트 응답 일부를 형식에서 벗어나게 하고, --no-structured와 비교하면
+구조화 출력(EnglishCommand.yaml의 format)이 재시도와 파싱 실패를 얼마나 줄이는지 볼 수 있습니다.
+
+사용 예:
+    python -m bench.endpoints --concurrency 1 4 16 --requests 40 --latency 0.05 --tokens-per-second 200
+    python -m bench.endpoints --scenarios list --output bench/results/base.json
+    python -m bench.endpoints --compare bench/results/base.json --threshold 10
+    python -m bench.endpoints --scenarios generate options --malformed-rate 0.2 --no-structured
+"""
+import sys
+import os
+import json
+import time
+import shutil
+import asyncio
+import argparse
+import datetime
+import tempfile
+import itertools
+import subprocess
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(ROOT, "bench", "results")
+APP_PORT = 18000
+OLLAMA_PORT = 11600
+SCHOOL_LEVELS = ["초등", "중등", "고등"]
+SAMPLE_MEANINGS = [
+    "사과", "학교", "선생님", "강", "산", "창문", "의사", "도서관", "연필", "의자",
+    "친구", "가족", "도시", "기차", "비행기", "감자", "토끼", "여름", "겨울", "부엌",
+]
+# 결과 파일에 함께 남길 설정 (비교할 때 조건이 같은지 확인용)
+CONFIG_KEYS = [
+    "CACHE_ENABLED", "SINGLE_FLIGHT_ENABLED", "LLM_SCHEDULER_ENABLED", "LLM_INITIAL_CONCURRENCY",
+    "LLM_MAX_CONCURRENCY", "OPTIONS_REQUEST_CONCURRENCY", "OPTIONS_GLOBAL_CONCURRENCY",
+    "OPTIONS_BATCH_SIZE", "VOCABULARY_POOL_ENABLED", "DISTRACTOR_ENGINE_MODE", "MONGO_INSERT_CHUNK_SIZE",
+    "LOG_ENABLED", "LOG_LEVEL", "LOG_PAYLOAD_SAMPLE_RATE", "MODEL_WARMUP_ENABLED", "STRUCTURED_OUTPUT_ENABLED",
+]
+
+def configure(args, directory):
+    """
+    앱 모듈을 불러오기 전에 설정을 바꿉니다.
+    각 모듈이 from config import로 값을 복사하므로 반드시 main을 임포트하기 전에 호출해야 합니다.
+    """
+    config.OLLAMA_URL = f"http://127.0.0.1:{OLLAMA_PORT}"
+    config.OLLAMA_BACKENDS = [f"http://127.0.0.1:{OLLAMA_PORT + i}" for i in range(args.servers)]
+    config.CACHE_ENABLED = args.cache
+    config.CACHE_DB_PATH = None
+    config.VOCABULARY_POOL_ENABLED = args.pool
+    config.VOCABULARY_POOL_PATH = None
+    config.DISTRACTOR_ENGINE_VECTORS_PATH = os.path.join(directory, "distractor_vectors.npy")
+    config.DISTRACTOR_ENGINE_MEANINGS_PATH = os.path.join(directory, "distractor_meanings.json")
+    if args.distractor_mode:
+        config.DISTRACTOR_ENGINE_MODE = args.distractor_mode
+    config.LOG_ENABLED = args.log
+    config.MODEL_WARMUP_ENABLED = args.warmup
+    config.STRUCTURED_OUTPUT_ENABLED = args.structured
+    if args.log:
+        config.LOG_PATH = args.log_path
+
+def percentile(values, p):
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+class Scenario:
+    """
+    엔드포인트 하나에 보낼 요청을 만듭니다. make_request()는 (메서드, 경로, 인자)를 반환합니다.
+    요청 번호는 동시 요청 수가 바뀌어도 이어지므로 options 단어가 앞 단계와 겹치지 않습니다.
+    """
+
+    def __init__(self, name, args):
+        self.name = name
+        self.args = args
+        self._counter = itertools.count()
+
+    def make_request(self):
+        i = next(self._counter)
+        if self.name == "generate":
+            return "POST", "/vocabulary/generate", {"json": {
+                "count": self.args.count,
+                "school_level": SCHOOL_LEVELS[i % len(SCHOOL_LEVELS)],
+                "userId": f"bench-user-{i % self.args.users}",
+            }}
+        if self.name == "options":
+            # 요청마다 새 단어를 써서 오답 저장소에 걸리지 않게 함
+            return "POST", "/vocabulary/generate-options", {"json": {
+                "items": [
+                    {"word": f"word{i}x{j}", "meaning": f"{meaning}{i}"}
+                    for j, meaning in enumerate(SAMPLE_MEANINGS[:self.args.words])
+                ],
+                "userId": f"bench-user-{i % self.args.users}",
+                "vocaId": f"bench-voca-{i}",
+            }}
+        return "GET", "/vocabulary", {"params": {
+            "userId": "bench-list", "vocaId": "bench-list", "limit": self.args.limit,
+        }}
+
+def llm_counters():
+    """앱의 Ollama 호출, 재시도, 파싱 실패 지표의 현재 합계를 반환합니다. 단계 전후의 차이로 단계별 값을 구합니다."""
+    from utils.metrics import OLLAMA_DURATION, RETRIES, PARSE_FAILURES, OPTION_FALLBACKS, STRUCTURED_OUTPUT
+    return {
+        "ollama_calls": OLLAMA_DURATION.total_count(),
+        "retries": RETRIES.total(),
+        "parse_failures": PARSE_FAILURES.total(),
+        "option_fallbacks": OPTION_FALLBACKS.total(),
+        "structured_fallbacks": STRUCTURED_OUTPUT.total(result="fallback"),
+    }
+
+async def run_level(client, scenario, concurrency, requests):
+    """동시 요청 수 concurrency로 요청 requests개를 보내고 결과 요약을 반환합니다."""
+    counters_before = llm_counters()
+    latencies = []
+    statuses = {}
+    sequence = iter(range(requests))
+
+    async def worker():
+        for _ in sequence:
+            method, path, kwargs = scenario.make_request()
+            started = time.perf_counter()
+            try:
+                response = await client.request(method, path, **kwargs)
+                status = response.status_code
+            except Exception as e:
+                status = type(e).__name__
+            elapsed = time.perf_counter() - started
+            statuses[str(status)] = statuses.get(str(status), 0) + 1
+            if status == 200:
+                latencies.append(elapsed)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    duration = time.perf_counter() - started
+    latencies.sort()
+    counters = {key: value - counters_before[key] for key, value in llm_counters().items()}
+    return {
+        "scenario": scenario.name,
+        "concurrency": concurrency,
+        "requests": requests,
+        "ok": len(latencies),
+        "errors": requests - len(latencies),
+        "statuses": statuses,
+        "duration_s": round(duration, 4),
+        "throughput_rps": round(len(latencies) / duration, 3) if duration else 0.0,
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 3) if latencies else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+        "max_ms": round(latencies[-1] * 1000, 3) if latencies else 0.0,
+        **counters,
+        "ollama_calls_per_request": round(counters["ollama_calls"] / requests, 3) if requests else 0.0,
+        "retry_rate": round(counters["retries"] / requests, 3) if requests else 0.0,
+    }
+
+async def seed_list(collection, count):
+    """list 시나리오용 단어장 항목을 저장합니다."""
+    now = datetime.datetime.now()
+    await collection.insert_many([{
+        "word": f"word{i}",
+        "meaning": f"의미{i}",
+        "options": [f"의미{i}", "사과", "바나나", "오렌지"],
+        "userId": "bench-list",
+        "vocaId": "bench-list",
+        "createdAt": now
+    } for i in range(count)], ordered=False)
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, timeout=10
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+def compare(results, baseline_path, threshold):
+    """baseline 결과와 비교해 threshold% 넘게 나빠진 항목 목록을 반환합니다."""
+    with open(baseline_path, "r", encoding="utf-8") as file:
+        baseline = {(row["scenario"], row["concurrency"]): row for row in json.load(file)["results"]}
+    regressions = []
+    print(f"\n기준 결과와 비교: {baseline_path} (허용 {threshold}%)")
+    print(f"{'시나리오':<10} {'동시':>4} {'p50 변화':>9} {'p99 변화':>9} {'처리량 변화':>11}")
+    for row in results:
+        base = baseline.get((row["scenario"], row["concurrency"]))
+        if base is None:
+            continue
+        changes = {}
+        for key, higher_is_worse in (("p50_ms", True), ("p99_ms", True), ("throughput_rps", False)):
+            if not base[key]:
+                changes[key] = 0.0
+                continue
+            change = (row[key] - base[key]) / base[key] * 100
+            changes[key] = change
+            if (change if higher_is_worse else -change) > threshold:
+                regressions.append(f"{row['scenario']} 동시 {row['concurrency']}: {key} {change:+.1f}%")
+        print(f"{row['scenario']:<10} {row['concurrency']:>4} {changes['p50_ms']:>+8.1f}% "
+              f"{changes['p99_ms']:>+8.1f}% {changes['throughput_rps']:>+10.1f}%")
+    return regressions
+
+async def run(args, directory):
+    import uvicorn
+    import httpx
+    from bench.fake_ollama import start_server, stop_server
+    from bench.fake_mongo import InMemoryCollection
+    from routes import vocabulary_routes
+
+    mongo_client = None
+    if args.mongo_url:
+        from motor.motor_asyncio import AsyncIOMotorClient
+        mongo_client = AsyncIOMotorClient(args.mongo_url)
+        vocabulary_routes.vocabulary_collection = mongo_client.bench_endpoints_db.vocabulary_items
+        vocabulary_routes.distractor_collection = mongo_client.bench_endpoints_db.distractors
+    else:
+        vocabulary_routes.vocabulary_collection = InMemoryCollection(args.rtt_ms / 1000)
+        vocabulary_routes.distractor_collection = InMemoryCollection(args.rtt_ms / 1000)
+
+    from main import app
+
+    outputs = None
+    if args.outputs:
+        with open(args.outputs, "r", encoding="utf-8") as file:
+            outputs = json.load(file)
+    fake_servers = [
+        await start_server(
+            OLLAMA_PORT + i, latency=args.latency, parallel=args.parallel,
+            tokens_per_second=args.tokens_per_second, outputs=outputs, load_time=args.load_time,
+            malformed_rate=args.malformed_rate
+        )
+        for i in range(args.servers)
+    ]
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=APP_PORT, log_level="warning"))
+    server_task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.01)
+
+    results = []
+    limits = httpx.Limits(max_connections=max(args.concurrency) + 10)
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{APP_PORT}", timeout=300.0, limits=limits) as client:
+            if args.warmup:
+                # 배포 후 로드 밸런서처럼 모델이 올라올 때까지 기다린 뒤 측정
+                while (await client.get("/ready")).status_code != 200:
+                    await asyncio.sleep(0.05)
+            if "list" in args.scenarios:
+                await seed_list(vocabulary_routes.vocabulary_collection, args.seed)
+            print(f"{'시나리오':<10} {'동시':>4} {'요청':>5} {'오류':>4} {'요청/초':>8} "
+                  f"{'p50(ms)':>9} {'p95(ms)':>9} {'p99(ms)':>9} {'호출/요청':>9} {'재시도율':>8} {'파싱실패':>8}")
+            for name in args.scenarios:
+                scenario = Scenario(name, args)
+                for concurrency in args.concurrency:
+                    row = await run_level(client, scenario, concurrency, args.requests)
+                    results.append(row)
+                    print(f"{name:<10} {concurrency:>4} {row['requests']:>5} {row['errors']:>4} "
+                          f"{row['throughput_rps']:>8.1f} {row['p50_ms']:>9.1f} {row['p95_ms']:>9.1f} "
+                          f"{row['p99_ms']:>9.1f} {row['ollama_calls_per_request']:>9.2f} "
+                          f"{row['retry_rate']:>8.2f} {row['parse_failures']:>8.0f}")
+    finally:
+        server.should_exit = True
+        await server_task
+        for fake_server, task in fake_servers:
+            await stop_server(fake_server, task)
+        if mongo_client is not None:
+            await mongo_client.drop_database("bench_endpoints_db")
+            mongo_client.close()
+    return results
+
+def main(args):
+    directory = tempfile.mkdtemp(prefix="bench-endpoints-")
+    try:
+        configure(args, directory)
+        results = asyncio.run(run(args, directory))
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+            "git_commit": git_commit(),
+            "python": sys.version.split()[0],
+            "args": {key: value for key, value in vars(args).items() if key not in ("output", "compare")},
+            "config": {key: getattr(config, key) for key in CONFIG_KEYS},
+        },
+        "results": results,
+    }
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"endpoints-{datetime.datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as file:
+        json.dump(report, file, ensure_ascii=False, indent=2)
+    print(f"결과 저장: {output}")
+
+    if args.compare:
+        regressions = compare(results, args.compare, args.threshold)
+        if regressions:
+            print("성능 저하:")
+            for regression in regressions:
+                print(f"   {regression}")
+            sys.exit(1)
+        print("성능 저하 없음")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="엔드포인트 지연/처리량 측정")
+    parser.add_argument("--scenarios", nargs="+", choices=["generate", "options", "list"],
+                        default=["generate", "options", "list"])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--requests", type=int, default=40, help="동시 요청 수마다 보낼 요청 수")
+    parser.add_argument("--count", type=int, default=10, help="generate 요청의 단어 수")
+    parser.add_argument("--words", type=int, default=10, help="options 요청의 단어 수 (최대 20)")
+    parser.add_argument("--limit", type=int, default=100, help="list 요청의 limit")
+    parser.add_argument("--seed", type=int, default=1000, help="list 시나리오용으로 미리 저장할 항목 수")
+    parser.add_argument("--users", type=int, default=8, help="요청을 나눠 보낼 사용자 수 (공정 분배 대상)")
+    parser.add_argument("--servers", type=int, default=1, help="가짜 Ollama 서버 수")
+    parser.add_argument("--latency", type=float, default=0.05, help="가짜 Ollama 첫 토큰까지의 지연(초)")
+    parser.add_argument("--tokens-per-second", type=float, default=200.0, help="가짜 Ollama 토큰 생성 속도")
+    parser.add_argument("--load-time", type=float, default=0.0, help="가짜 Ollama 모델 불러오기 시간(초, 첫 요청에 더해짐)")
+    parser.add_argument("--parallel", type=int, default=4, help="가짜 Ollama 서버당 동시 처리 수")
+    parser.add_argument("--outputs", help="가짜 Ollama 고정 응답 목록 JSON 파일")
+    parser.add_argument("--malformed-rate", type=float, default=0.0,
+                        help="가짜 Ollama의 텍스트(format 없는) 응답이 형식을 벗어날 확률")
+    parser.add_argument("--structured", action=argparse.BooleanOptionalAction, default=config.STRUCTURED_OUTPUT_ENABLED,
+                        help="format을 지정한 명령어에 구조화(JSON) 출력 사용")
+    parser.add_argument("--rtt-ms", type=float, default=0.5, help="대체 컬렉션의 왕복 지연(ms)")
+    parser.add_argument("--mongo-url", help="실제 mongod 주소 (지정하면 대체 컬렉션 대신 사용)")
+    parser.add_argument("--cache", action="store_true", help="LLM 응답 캐시(메모리 계층) 사용")
+    parser.add_argument("--pool", action="store_true", help="학교 수준별 단어 풀 사용")
+    parser.add_argument("--warmup", action="store_true", help="시작 시 모델 예열 (가짜 서버의 --load-time과 함께 사용)")
+    parser.add_argument("--log", action="store_true", help="구조화 로그 사용 (로그 비용까지 측정)")
+    parser.add_argument("--log-path", default=os.devnull, help="--log일 때 로그를 쓸 파일")
+    parser.add_argument("--distractor-mode", choices=["first", "fallback", "off"], help="로컬 오답 엔진 모드")
+    parser.add_argument("--output", help="결과 JSON 경로 (기본: bench/results/endpoints-<시각>.json)")
+    parser.add_argument("--compare", help="비교할 이전 결과 JSON")
+    parser.add_argument("--threshold", type=float, default=10.0, help="성능 저하로 볼 변화율(%%)")
+    args = parser.parse_args()
+    args.words = min(args.words, len(SAMPLE_MEANINGS))
+    main(args)
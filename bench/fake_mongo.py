@@ -0,0 +1,191 @@
+"""
+벤치마크용 프로세스 내 MongoDB 컬렉션 대체 구현
+
+motor 컬렉션 중 이 서비스가 쓰는 부분(insert_one / insert_many / find / bulk_write / create_index)만
+메모리에서 흉내 내며, 요청(왕복)마다 rtt초를 기다려 네트워크 지연을 흉내 냅니다.
+필터는 같음 비교와 $in, $gt, $gte, $lt, $lte만 지원합니다.
+"""
+import asyncio
+
+from bson import ObjectId
+from pymongo.errors import BulkWriteError
+
+OPERATORS = {
+    "$in": lambda value, operand: value in operand,
+    "$gt": lambda value, operand: value is not None and value > operand,
+    "$gte": lambda value, operand: value is not None and value >= operand,
+    "$lt": lambda value, operand: value is not None and value < operand,
+    "$lte": lambda value, operand: value is not None and value <= operand,
+}
+
+def matches(doc, filter_condition):
+    """doc이 filter_condition을 만족하는지 확인합니다."""
+    for field, condition in filter_condition.items():
+        value = doc.get(field)
+        if isinstance(condition, dict) and condition and all(key.startswith("$") for key in condition):
+            for operator, operand in condition.items():
+                if operator not in OPERATORS:
+                    raise NotImplementedError(f"지원하지 않는 연산자입니다: {operator}")
+                if not OPERATORS[operator](value, operand):
+                    return False
+        elif value != condition:
+            return False
+    return True
+
+def project(doc, projection):
+    """projection(포함 방식)에 있는 필드만 남긴 복사본을 반환합니다."""
+    if not projection:
+        return dict(doc)
+    fields = [field for field, include in projection.items() if include and field != "_id"]
+    result = {field: doc[field] for field in fields if field in doc}
+    if projection.get("_id", 1) and "_id" in doc:
+        result["_id"] = doc["_id"]
+    return result
+
+class InMemoryCursor:
+    """sort / skip / limit / to_list / 비동기 반복을 지원하는 커서입니다."""
+
+    def __init__(self, collection, filter_condition, projection, batch_size):
+        self._collection = collection
+        self._filter = filter_condition or {}
+        self._projection = projection
+        self._batch_size = max(1, batch_size or 101)
+        self._sort = None
+        self._skip = 0
+        self._limit = 0
+        self._results = None
+        self._position = 0
+
+    def sort(self, key, direction=1):
+        self._sort = (key, direction)
+        return self
+
+    def skip(self, count):
+        self._skip = count
+        return self
+
+    def limit(self, count):
+        self._limit = count
+        return self
+
+    def _execute(self):
+        docs = [doc for doc in self._collection.docs.values() if matches(doc, self._filter)]
+        if self._sort is not None:
+            key, direction = self._sort
+            docs.sort(key=lambda doc: doc.get(key), reverse=direction < 0)
+        docs = docs[self._skip:]
+        if self._limit:
+            docs = docs[:self._limit]
+        return [project(doc, self._projection) for doc in docs]
+
+    async def _next_batch(self):
+        # 배치(getMore) 하나가 왕복 한 번
+        await self._collection._round_trip()
+        if self._results is None:
+            self._results = self._execute()
+        batch = self._results[self._position:self._position + self._batch_size]
+        self._position += len(batch)
+        return batch
+
+    async def to_list(self, length=None):
+        results = []
+        while length is None or len(results) < length:
+            batch = await self._next_batch()
+            if not batch:
+                break
+            results.extend(batch)
+            if self._position >= len(self._results):
+                break
+        return results if length is None else results[:length]
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        while True:
+            batch = await self._next_batch()
+            if not batch:
+                return
+            for doc in batch:
+                yield doc
+            if self._position >= len(self._results):
+                return
+
+    async def close(self):
+        self._results = []
+
+class InMemoryCollection:
+    """요청마다 rtt초를 기다리는 motor 컬렉션 대체 구현입니다."""
+
+    def __init__(self, rtt=0.0):
+        self.rtt = rtt
+        self.docs = {}
+        self.round_trips = 0
+        self._unique_values = {}  # 유니크 인덱스 필드 -> 저장된 값 집합
+
+    def with_options(self, **kwargs):
+        return self
+
+    async def _round_trip(self):
+        self.round_trips += 1
+        await asyncio.sleep(self.rtt)
+
+    def _insert(self, doc):
+        doc.setdefault("_id", ObjectId())
+        if doc["_id"] in self.docs or any(doc.get(field) in values for field, values in self._unique_values.items()):
+            raise KeyError(doc["_id"])
+        self.docs[doc["_id"]] = doc
+        for field, values in self._unique_values.items():
+            values.add(doc.get(field))
+
+    async def create_index(self, keys, unique=False, name=None, **kwargs):
+        await self._round_trip()
+        if unique and isinstance(keys, str):
+            self._unique_values[keys] = {doc.get(keys) for doc in self.docs.values()}
+        return name or str(keys)
+
+    async def insert_one(self, doc):
+        await self._round_trip()
+        self._insert(doc)
+
+    async def insert_many(self, docs, ordered=True):
+        await self._round_trip()
+        write_errors = []
+        for index, doc in enumerate(docs):
+            try:
+                self._insert(doc)
+            except KeyError:
+                write_errors.append({"index": index, "code": 11000, "errmsg": f"E11000 duplicate key: {doc['_id']}"})
+                if ordered:
+                    break
+        if write_errors:
+            raise BulkWriteError({"writeErrors": write_errors, "writeConcernErrors": []})
+
+    def _find_one(self, filter_condition):
+        # 유니크 필드 하나로 찾는 경우(오답 저장소의 key)는 값 집합으로 먼저 걸러 전체 탐색을 피함
+        if len(filter_condition) == 1:
+            (field, value), = filter_condition.items()
+            values = self._unique_values.get(field)
+            if values is not None and not isinstance(value, dict) and value not in values:
+                return None
+        return next((doc for doc in self.docs.values() if matches(doc, filter_condition)), None)
+
+    def find(self, filter_condition=None, projection=None, batch_size=None, **kwargs):
+        return InMemoryCursor(self, filter_condition, projection, batch_size)
+
+    async def bulk_write(self, operations, ordered=True):
+        """UpdateOne의 $set / $setOnInsert 업서트만 지원합니다."""
+        await self._round_trip()
+        for operation in operations:
+            update = operation._doc
+            existing = self._find_one(operation._filter)
+            if existing is not None:
+                existing.update(update.get("$set", {}))
+            elif operation._upsert:
+                doc = {**operation._filter, **update.get("$setOnInsert", {}), **update.get("$set", {})}
+                self._insert(doc)
+
+    async def drop(self):
+        self.docs.clear()
+        for values in self._unique_values.values():
+            values.clear()
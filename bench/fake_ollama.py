@@ -0,0 +1,248 @@
+"""
+테스트/벤치마크용 가짜 Ollama 서버
+
+/api/generate (스트리밍, 비스트리밍), /api/tags, /api/ps를 흉내 냅니다.
+CPU 추론 서버처럼 parallel개의 요청만 동시에 처리하고 나머지는 기다리게 합니다.
+load_time을 주면 메모리에 없는 모델의 첫 요청이 그만큼 더 걸리고, 모델은 요청의 keep_alive
+(기본 5분) 동안 메모리에 남습니다. 프롬프트 없는 요청은 모델만 불러옵니다.
+tokens_per_second를 주지 않으면 요청 하나는 latency초가 걸리고, 주면 latency초(첫 토큰까지)에
+출력 토큰 수 / tokens_per_second초가 더해집니다.
+응답 내용은 프롬프트 종류(단어장/선택지/배치 선택지)에 맞춰 만들거나, outputs로 준 고정 응답을 차례로 씁니다.
+요청에 format이 있으면 실제 Ollama의 구조화 출력처럼 항상 올바른 JSON으로 답하고,
+없으면 malformed_rate 비율로 형식을 벗어난 텍스트(설명문, 쉼표 없는 선택지, 빠진 줄)를 돌려줍니다.
+
+사용 예:
+    python -m bench.fake_ollama --port 11435 --latency 0.5 --parallel 1
+    python -m bench.fake_ollama --latency 0.2 --tokens-per-second 30 --outputs outputs.json
+    python -m bench.fake_ollama --malformed-rate 0.2
+"""
+import sys
+import os
+import re
+import json
+import random
+import asyncio
+import argparse
+import itertools
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+SAMPLE_VOCABULARY = [
+    ("apple", "사과"), ("dog", "개"), ("school", "학교"), ("teacher", "선생님"),
+    ("carrot", "당근"), ("river", "강"), ("mountain", "산"), ("window", "창문"),
+    ("doctor", "의사"), ("library", "도서관"), ("orange", "오렌지"), ("cat", "고양이"),
+    ("pencil", "연필"), ("chair", "의자"), ("friend", "친구"), ("family", "가족"),
+]
+DISTRACTORS = ["바나나", "오렌지", "포도", "딸기", "당근", "감자", "고양이", "토끼"]
+BATCH_ITEM_PATTERN = re.compile(r"^- (.+?): (.+)$", re.MULTILINE)
+COUNT_PATTERN = re.compile(r"영어 단어장을 (\d+)개")
+# 토큰 수 추정용: 공백으로 끝나는 조각 하나를 토큰 하나로 봄
+TOKEN_PATTERN = re.compile(r"\S+\s*|\s+")
+DURATION_PATTERN = re.compile(r"^(-?\d+(?:\.\d+)?)(ms|s|m|h)?$")
+DURATION_UNITS = {"ms": 0.001, "s": 1, "m": 60, "h": 3600, None: 1}
+DEFAULT_KEEP_ALIVE = 300.0
+
+def sample_words(count, counter):
+    """같은 단어가 반복되지 않도록 번호를 알파벳으로 붙인 (단어, 의미) count개를 만듭니다."""
+    words = []
+    for _ in range(count):
+        number = next(counter)
+        word, meaning = SAMPLE_VOCABULARY[number % len(SAMPLE_VOCABULARY)]
+        suffix = "".join(chr(ord("a") + int(digit)) for digit in str(number // len(SAMPLE_VOCABULARY)))
+        words.append((f"{word}{suffix}", meaning))
+    return words
+
+def make_response(prompt, counter, structured=False, malformed=False):
+    """
+    프롬프트 종류에 맞는 모델 출력을 만듭니다.
+    structured이면 JSON으로, malformed이면 텍스트 파서가 읽지 못하는 형식으로 만듭니다.
+    """
+    if "한 줄씩" in prompt:
+        # 배치 선택지: '단어: 의미, 오답1, 오답2, 오답3'
+        entries = [(word, meaning, [d for d in DISTRACTORS if d != meaning][:3])
+                   for word, meaning in BATCH_ITEM_PATTERN.findall(prompt)]
+        if structured:
+            return json.dumps({"items": [{"word": word, "distractors": distractors}
+                                         for word, _, distractors in entries]}, ensure_ascii=False)
+        lines = [f"{word}: {meaning}, {', '.join(distractors)}" for word, meaning, distractors in entries]
+        if malformed:
+            # 단어 절반을 빠뜨림
+            lines = lines[::2]
+        return "\n".join(lines)
+    if "선택지" in prompt:
+        if structured:
+            return json.dumps({"distractors": DISTRACTORS[1:4]}, ensure_ascii=False)
+        # 쉼표 없이 공백으로만 나열
+        return (" " if malformed else ", ").join(DISTRACTORS[:4])
+
+    match = COUNT_PATTERN.search(prompt)
+    words = sample_words(int(match.group(1)) if match else 10, counter)
+    if structured:
+        return json.dumps({"items": [{"word": word, "meaning": meaning} for word, meaning in words]},
+                          ensure_ascii=False)
+    if malformed:
+        # 형식을 무시한 설명문
+        return "다음은 요청하신 단어장입니다. " + " ".join(f"{word}은(는) {meaning}라는 뜻입니다." for word, meaning in words)
+    return "\n".join(f"-단어: {word}\n-의미: {meaning}\n" for word, meaning in words)
+
+def parse_keep_alive(value):
+    """Ollama keep_alive 값("30m", 600, -1 등)을 초로 바꿉니다. 음수는 무기한(None)입니다."""
+    if value is None:
+        return DEFAULT_KEEP_ALIVE
+    if isinstance(value, (int, float)):
+        seconds = float(value)
+    else:
+        match = DURATION_PATTERN.match(str(value).strip())
+        if not match:
+            return DEFAULT_KEEP_ALIVE
+        seconds = float(match.group(1)) * DURATION_UNITS[match.group(2)]
+    return None if seconds < 0 else seconds
+
+def split_tokens(text):
+    """응답을 토큰 단위 조각으로 나눕니다. 이어 붙이면 원문이 됩니다."""
+    return TOKEN_PATTERN.findall(text) or [text]
+
+def create_app(latency=0.2, parallel=1, chunks=8, fail=False, tokens_per_second=None, outputs=None, load_time=0.0,
+               malformed_rate=0.0, seed=0):
+    """
+    가짜 Ollama 앱을 만듭니다. fail이 True이면 /api/generate가 503을 반환합니다.
+    outputs(문자열 목록)를 주면 프롬프트와 관계없이 그 응답을 차례로 돌려씁니다.
+    malformed_rate는 format 없는 요청의 응답이 형식을 벗어날 확률이며, seed로 같은 순서를 재현합니다.
+    app.state.fake["loaded"]에서 모델을 지우면 메모리에서 내려간 것처럼 동작합니다.
+    """
+    slots = asyncio.Semaphore(parallel)
+    counter = itertools.count()
+    canned = itertools.cycle(outputs) if outputs else None
+    rng = random.Random(seed)
+    # loaded: 모델 이름 -> 만료 시각(loop 시간, None이면 무기한)
+    state = {"requests": 0, "loads": 0, "malformed": 0, "loaded": {}}
+    load_lock = asyncio.Lock()
+
+    def model_name(model):
+        return model if ":" in model else f"{model}:latest"
+
+    def is_loaded(name):
+        if name not in state["loaded"]:
+            return False
+        expires = state["loaded"][name]
+        if expires is not None and expires <= asyncio.get_running_loop().time():
+            del state["loaded"][name]
+            return False
+        return True
+
+    async def ensure_loaded(model, keep_alive):
+        name = model_name(model)
+        async with load_lock:
+            if not is_loaded(name):
+                state["loads"] += 1
+                await asyncio.sleep(load_time)
+        seconds = parse_keep_alive(keep_alive)
+        if seconds == 0:
+            state["loaded"].pop(name, None)
+        else:
+            state["loaded"][name] = None if seconds is None else asyncio.get_running_loop().time() + seconds
+
+    def pieces_of(text):
+        # 속도를 지정하면 토큰마다, 아니면 chunks개로 나눠 보냄
+        if tokens_per_second:
+            return split_tokens(text), 1 / tokens_per_second
+        size = max(1, len(text) // chunks + 1)
+        return [text[start:start + size] for start in range(0, len(text), size)], latency / chunks
+
+    async def generate(request):
+        body = await request.json()
+        state["requests"] += 1
+        if fail:
+            return JSONResponse({"error": "server busy"}, status_code=503)
+        model = body.get("model", "llama2")
+        await ensure_loaded(model, body.get("keep_alive"))
+        if not body.get("prompt"):
+            # 프롬프트 없는 요청은 모델만 불러옴
+            return JSONResponse({"model": model, "response": "", "done": True, "done_reason": "load"})
+        if canned:
+            text = next(canned)
+        else:
+            structured = bool(body.get("format"))
+            malformed = not structured and malformed_rate > 0 and rng.random() < malformed_rate
+            state["malformed"] += malformed
+            text = make_response(body["prompt"], counter, structured, malformed)
+        pieces, delay = pieces_of(text)
+        eval_duration = int(len(pieces) * delay * 1e9)
+
+        if not body.get("stream", True):
+            async with slots:
+                await asyncio.sleep(latency + len(pieces) * delay if tokens_per_second else latency)
+            return JSONResponse({
+                "model": model, "response": text, "done": True,
+                "eval_count": len(pieces), "eval_duration": eval_duration
+            })
+
+        async def stream():
+            async with slots:
+                if tokens_per_second:
+                    await asyncio.sleep(latency)
+                for piece in pieces:
+                    await asyncio.sleep(delay)
+                    yield json.dumps({"model": model, "response": piece, "done": False},
+                                     ensure_ascii=False) + "\n"
+                yield json.dumps({
+                    "model": model, "response": "", "done": True,
+                    "eval_count": len(pieces), "eval_duration": eval_duration
+                }) + "\n"
+
+        return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+    async def tags(request):
+        return JSONResponse({"models": [{"name": "llama2"}]})
+
+    async def ps(request):
+        names = [name for name in list(state["loaded"]) if is_loaded(name)]
+        return JSONResponse({"models": [{"name": name, "model": name} for name in names]})
+
+    app = Starlette(routes=[
+        Route("/api/generate", generate, methods=["POST"]),
+        Route("/api/tags", tags, methods=["GET"]),
+        Route("/api/ps", ps, methods=["GET"]),
+    ])
+    app.state.fake = state
+    return app
+
+async def start_server(port, **kwargs):
+    """현재 이벤트 루프에서 가짜 서버를 시작하고 (server, task)를 반환합니다."""
+    config = uvicorn.Config(create_app(**kwargs), host="127.0.0.1", port=port, log_level="warning")
+    server = uvicorn.Server(config)
+    task = asyncio.create_task(server.serve())
+    while not server.started:
+        if task.done():
+            task.result()
+        await asyncio.sleep(0.01)
+    return server, task
+
+async def stop_server(server, task):
+    """start_server로 시작한 서버를 멈춥니다."""
+    server.should_exit = True
+    await task
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="가짜 Ollama 서버")
+    parser.add_argument("--port", type=int, default=11435)
+    parser.add_argument("--latency", type=float, default=0.2, help="요청 하나의 처리 시간(초)")
+    parser.add_argument("--parallel", type=int, default=1, help="동시에 처리하는 요청 수")
+    parser.add_argument("--tokens-per-second", type=float, help="출력 토큰 생성 속도 (주면 latency는 첫 토큰까지의 시간)")
+    parser.add_argument("--outputs", help="고정 응답 목록 JSON 파일 (문자열 배열)")
+    parser.add_argument("--load-time", type=float, default=0.0, help="메모리에 없는 모델을 불러오는 시간(초)")
+    parser.add_argument("--malformed-rate", type=float, default=0.0, help="format 없는 요청의 응답이 형식을 벗어날 확률")
+    parser.add_argument("--seed", type=int, default=0, help="malformed-rate 난수 시드")
+    args = parser.parse_args()
+    outputs = None
+    if args.outputs:
+        with open(args.outputs, "r", encoding="utf-8") as file:
+            outputs = json.load(file)
+    app = create_app(args.latency, args.parallel, tokens_per_second=args.tokens_per_second, outputs=outputs,
+                     load_time=args.load_time, malformed_rate=args.malformed_rate, seed=args.seed)
+    uvicorn.run(app, host="127.0.0.1", port=args.port)
@@ -0,0 +1,93 @@
+"""
+단어장 항목 저장 방식 비교 스크립트
+
+기존 방식(insert_one을 항목마다 순서대로 호출)과 save_vocabulary_items의
+순서 없는 insert_many 방식을 단어장 크기별로 비교합니다.
+
+기본은 왕복 지연을 흉내 내는 프로세스 내 대체 컬렉션을 사용하며,
+--mongo-url을 주면 실제 mongod의 임시 데이터베이스에 저장합니다(끝나면 삭제).
+
+사용 예:
+    python -m bench.mongo_bulk_insert --sizes 10 50 500 --rtt-ms 1.0
+    python -m bench.mongo_bulk_insert --mongo-url mongodb://localhost:27017
+"""
+import sys
+import os
+import time
+import asyncio
+import argparse
+import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bson import ObjectId
+
+from bench.fake_mongo import InMemoryCollection
+from routes import vocabulary_routes
+
+def make_items(count):
+    now = datetime.datetime.now()
+    return [{
+        "word": f"word{i}",
+        "meaning": f"의미{i}",
+        "options": [f"의미{i}", "사과", "바나나", "오렌지"],
+        "userId": "bench",
+        "vocaId": "bench",
+        "createdAt": now
+    } for i in range(count)]
+
+async def save_one_by_one(items):
+    """기존 구현: 항목마다 insert_one을 기다립니다."""
+    for item in items:
+        await vocabulary_routes.vocabulary_collection.insert_one(item)
+
+async def measure(save, count, repeat):
+    collection = vocabulary_routes.vocabulary_collection
+    elapsed = []
+    for _ in range(repeat):
+        await collection.drop()
+        items = make_items(count)
+        start = time.perf_counter()
+        await save(items)
+        elapsed.append(time.perf_counter() - start)
+    return min(elapsed)
+
+async def check_partial_failure():
+    """중복 _id가 섞여도 나머지 문서는 저장되고 실패 목록이 반환되는지 확인합니다."""
+    await vocabulary_routes.vocabulary_collection.drop()
+    items = make_items(5)
+    items[3]["_id"] = items[1]["_id"] = ObjectId()
+    failures = await vocabulary_routes.save_vocabulary_items(items)
+    return [failure["index"] for failure in failures]
+
+async def main(args):
+    if args.mongo_url:
+        from motor.motor_asyncio import AsyncIOMotorClient
+        client = AsyncIOMotorClient(args.mongo_url)
+        vocabulary_routes.vocabulary_collection = client.bench_vocabulary_db.vocabulary_items
+        target = args.mongo_url
+    else:
+        client = None
+        vocabulary_routes.vocabulary_collection = InMemoryCollection(args.rtt_ms / 1000)
+        target = f"프로세스 내 대체 컬렉션 (왕복 {args.rtt_ms}ms)"
+
+    print(f"대상: {target}")
+    print(f"{'항목 수':>8} {'insert_one(초)':>15} {'insert_many(초)':>16} {'속도 향상':>10}")
+    try:
+        for count in args.sizes:
+            sequential = await measure(save_one_by_one, count, args.repeat)
+            bulk = await measure(vocabulary_routes.save_vocabulary_items, count, args.repeat)
+            print(f"{count:>8} {sequential:>15.4f} {bulk:>16.4f} {sequential / bulk:>9.1f}x")
+        print(f"부분 실패 시 보고된 인덱스: {await check_partial_failure()}")
+    finally:
+        if client is not None:
+            await client.drop_database("bench_vocabulary_db")
+            client.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="단어장 항목 저장 방식 비교")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 50, 500, 5000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--rtt-ms", type=float, default=1.0, help="대체 컬렉션의 왕복 지연(ms)")
+    parser.add_argument("--mongo-url", help="실제 mongod 주소 (지정하면 대체 컬렉션 대신 사용)")
+    asyncio.run(main(parser.parse_args()))
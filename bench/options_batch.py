@@ -0,0 +1,113 @@
+"""
+선택지 배치 크기별 처리량 측정 스크립트
+
+실행 중인 Ollama 서버(config.OLLAMA_URL)를 대상으로 같은 단어 목록을
+배치 크기별로 생성해 보고, 소요 시간 / 초당 단어 수 / Ollama 호출 수 /
+단어별 생성으로 대체된 수를 출력합니다.
+
+사용 예:
+    python -m bench.options_batch --sizes 1 5 10 20 --words 40
+"""
+import sys
+import os
+import time
+import asyncio
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.ollama_utils import get_ollama_client, close_ollama_client
+
+SAMPLE_WORDS = [
+    ("apple", "사과"), ("dog", "개"), ("school", "학교"), ("teacher", "선생님"),
+    ("carrot", "당근"), ("river", "강"), ("mountain", "산"), ("window", "창문"),
+    ("doctor", "의사"), ("library", "도서관"), ("orange", "오렌지"), ("cat", "고양이"),
+    ("pencil", "연필"), ("chair", "의자"), ("friend", "친구"), ("family", "가족"),
+    ("city", "도시"), ("country", "나라"), ("train", "기차"), ("airplane", "비행기"),
+    ("potato", "감자"), ("rabbit", "토끼"), ("lion", "사자"), ("tiger", "호랑이"),
+    ("summer", "여름"), ("winter", "겨울"), ("rain", "비"), ("snow", "눈"),
+    ("kitchen", "부엌"), ("hospital", "병원"), ("bread", "빵"), ("milk", "우유"),
+    ("red", "빨간색"), ("blue", "파란색"), ("music", "음악"), ("science", "과학"),
+    ("history", "역사"), ("hand", "손"), ("foot", "발"), ("eye", "눈"),
+]
+
+class CallCounter:
+    """공유 클라이언트의 generate 호출 수를 셉니다."""
+
+    def __init__(self, client):
+        self.client = client
+        self.calls = 0
+        self._generate = client.generate
+
+    async def generate(self, *args, **kwargs):
+        self.calls += 1
+        return await self._generate(*args, **kwargs)
+
+async def run_size(batch_size, words):
+    """주어진 배치 크기로 단어 목록 전체의 선택지를 생성하고 결과를 반환합니다."""
+    from services.problemgeneration_service import (
+        generate_vocabulary_options,
+        generate_vocabulary_options_batch
+    )
+
+    client = get_ollama_client()
+    counter = CallCounter(client)
+    client.generate = counter.generate
+    fallbacks = 0
+    failures = 0
+
+    start = time.perf_counter()
+    try:
+        for i in range(0, len(words), batch_size):
+            batch = words[i:i + batch_size]
+            if batch_size > 1:
+                try:
+                    results = await generate_vocabulary_options_batch(batch)
+                except Exception:
+                    results = [None] * len(batch)
+            else:
+                results = [None] * len(batch)
+
+            for (word, meaning), options in zip(batch, results):
+                if options is not None:
+                    continue
+                if batch_size > 1:
+                    fallbacks += 1
+                try:
+                    await generate_vocabulary_options(word, meaning)
+                except Exception:
+                    failures += 1
+    finally:
+        client.generate = counter._generate
+    elapsed = time.perf_counter() - start
+
+    return {
+        "batch_size": batch_size,
+        "words": len(words),
+        "seconds": elapsed,
+        "words_per_sec": len(words) / elapsed if elapsed else 0.0,
+        "ollama_calls": counter.calls,
+        "fallbacks": fallbacks,
+        "failures": failures,
+    }
+
+async def main(sizes, word_count):
+    words = (SAMPLE_WORDS * (word_count // len(SAMPLE_WORDS) + 1))[:word_count]
+    rows = []
+    try:
+        for size in sizes:
+            rows.append(await run_size(size, words))
+    finally:
+        await close_ollama_client()
+
+    print(f"{'batch':>6} {'words':>6} {'sec':>8} {'words/s':>8} {'calls':>6} {'fallback':>9} {'fail':>5}")
+    for row in rows:
+        print(f"{row['batch_size']:>6} {row['words']:>6} {row['seconds']:>8.2f} {row['words_per_sec']:>8.2f} "
+              f"{row['ollama_calls']:>6} {row['fallbacks']:>9} {row['failures']:>5}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="선택지 배치 크기별 처리량 측정")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 5, 10, 20], help="측정할 배치 크기 목록")
+    parser.add_argument("--words", type=int, default=40, help="생성할 단어 수")
+    args = parser.parse_args()
+    asyncio.run(main(args.sizes, args.words))
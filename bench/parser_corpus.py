@@ -0,0 +1,183 @@
+"""
+모델 출력 코퍼스와 파서 동등성 검사 스크립트
+
+bench/corpus/model_outputs.jsonl에는 Ollama 응답(정상, 형식이 깨진 것, 번호 목록, 한국어/영어 혼합 등)이
+한 줄에 하나씩 들어 있습니다. 각 레코드의 형식:
+    {"parser": "vocabulary" | "options" | "options_batch", "name": ..., "tags": [...],
+     "input": {"text": ..., "meaning" 또는 "items": ...}, "expected": {파서 이름: 결과, ...}}
+"json" 태그가 붙은 레코드는 구조화 출력(EnglishCommand.yaml의 format) 응답이며, 모든 레코드를
+구조화 출력 경로(JSON 디코드 후 실패하면 텍스트 파서)에도 넣어 봅니다.
+
+기본 실행은 모든 레코드를 현재 파서에 넣고 expected와 다른 결과를 보고합니다(다르면 종료 코드 1).
+파서를 최적화한 뒤 이 검사를 통과하면 기존 동작과 같다는 뜻입니다.
+  --update   현재 파서의 결과로 expected를 다시 씁니다 (동작을 의도적으로 바꾼 경우에만)
+  --record   실행 중인 Ollama 서버에서 응답을 받아 코퍼스에 추가합니다
+
+사용 예:
+    python -m bench.parser_corpus
+    python -m bench.parser_corpus --record vocabulary --times 5
+    python -m bench.parser_corpus --record options --word river --meaning 강
+"""
+import sys
+import os
+import io
+import json
+import random
+import asyncio
+import argparse
+import contextlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# 파서의 진행 로그가 결과 출력과 측정에 섞이지 않도록 서비스 모듈을 불러오기 전에 끔
+import config
+config.LOG_ENABLED = False
+
+from utils import clean_option, parse_vocabulary_options
+from services.problemgeneration_service import (
+    parse_vocabulary_data,
+    parse_vocabulary_output,
+    extract_options_from_text,
+    decode_options,
+    parse_vocabulary_options_batch,
+    parse_options_batch_output
+)
+
+CORPUS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "corpus", "model_outputs.jsonl")
+
+def split_option_pieces(text):
+    """clean_option 입력: 응답을 쉼표와 줄바꿈으로 나눈 조각 (선택지 파서가 넘기는 것과 같은 단위)."""
+    return [piece for line in text.split("\n") for piece in line.split(",")]
+
+# 레코드 종류 -> {파서 이름: 입력을 받아 결과를 반환하는 함수}
+PARSERS = {
+    "vocabulary": {
+        "parse_vocabulary_data": lambda data: parse_vocabulary_data(data["text"]),
+        "parse_vocabulary_output": lambda data: parse_vocabulary_output(data["text"], True)[0],
+    },
+    "options": {
+        "extract_options_from_text": lambda data: extract_options_from_text(data["text"], data["meaning"]),
+        "parse_vocabulary_options": lambda data: parse_vocabulary_options(data["text"]),
+        "clean_option": lambda data: [clean_option(piece) for piece in split_option_pieces(data["text"])],
+        "decode_options": lambda data: decode_options(data["text"], data["meaning"]),
+    },
+    "options_batch": {
+        "parse_vocabulary_options_batch": lambda data: parse_vocabulary_options_batch(
+            data["text"], [tuple(item) for item in data["items"]]
+        ),
+        "parse_options_batch_output": lambda data: parse_options_batch_output(
+            data["text"], [tuple(item) for item in data["items"]], True
+        )[0],
+    },
+}
+
+def load_corpus(path=CORPUS_PATH):
+    """코퍼스 레코드 목록을 반환합니다."""
+    with open(path, "r", encoding="utf-8") as file:
+        return [json.loads(line) for line in file if line.strip()]
+
+def save_corpus(records, path=CORPUS_PATH):
+    with open(path, "w", encoding="utf-8") as file:
+        for record in records:
+            file.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+def run_parser(function, data):
+    """
+    파서를 실행하고 JSON으로 비교할 수 있는 결과를 반환합니다.
+    빈 선택지를 채울 때 쓰는 무작위 선택을 고정하고, 파서의 진행 출력은 버리며, 예외는 결과로 기록합니다.
+    """
+    random.seed(0)
+    with contextlib.redirect_stdout(io.StringIO()):
+        try:
+            result = function(data)
+        except Exception as e:
+            return {"error": type(e).__name__}
+    # 튜플 등을 JSON에 저장된 형태와 같게 맞춤
+    return json.loads(json.dumps(result, ensure_ascii=False))
+
+def run_record(record):
+    """레코드에 해당하는 모든 파서의 결과를 {파서 이름: 결과}로 반환합니다."""
+    return {name: run_parser(function, record["input"]) for name, function in PARSERS[record["parser"]].items()}
+
+def check(records):
+    """expected와 다른 (레코드 이름, 파서 이름, 기대 결과, 실제 결과) 목록을 반환합니다."""
+    failures = []
+    for record in records:
+        actual = run_record(record)
+        for name, result in actual.items():
+            expected = record.get("expected", {}).get(name)
+            if result != expected:
+                failures.append((f"{record['parser']}/{record['name']}", name, expected, result))
+    return failures
+
+async def record_outputs(args):
+    """실행 중인 Ollama에서 응답을 받아 expected 없이 반환합니다 (저장 전에 --update 처리)."""
+    from utils.command_registry import get_command_registry
+    from utils.ollama_utils import get_ollama_client, close_ollama_client
+
+    registry = get_command_registry()
+    if args.record == "vocabulary":
+        command = registry.get("generate_vocabulary")
+        prompt = command.render(school_level=args.school_level, count=args.count)
+        data = {}
+    elif args.record == "options":
+        command = registry.get("generate_vocabulary_options")
+        prompt = command.render(word=args.word, meaning=args.meaning)
+        data = {"meaning": args.meaning}
+    else:
+        items = [item.split(":", 1) for item in args.items]
+        command = registry.get("generate_vocabulary_options_batch")
+        prompt = command.render(items="\n".join(f"- {word}: {meaning}" for word, meaning in items))
+        data = {"items": items}
+
+    records = []
+    try:
+        for i in range(args.times):
+            text = await get_ollama_client().generate(prompt, **command.model_settings())
+            records.append({
+                "parser": args.record,
+                "name": f"{args.name or 'recorded'}_{i}",
+                "tags": ["recorded"],
+                "input": {**data, "text": text},
+            })
+    finally:
+        await close_ollama_client()
+    return records
+
+def main(args):
+    records = load_corpus()
+
+    if args.record:
+        new_records = asyncio.run(record_outputs(args))
+        for record in new_records:
+            record["expected"] = run_record(record)
+        save_corpus(records + new_records)
+        print(f"{len(new_records)}개 응답을 코퍼스에 추가했습니다: {CORPUS_PATH}")
+        return 0
+
+    if args.update:
+        for record in records:
+            record["expected"] = run_record(record)
+        save_corpus(records)
+        print(f"{len(records)}개 레코드의 기대 결과를 다시 썼습니다.")
+        return 0
+
+    failures = check(records)
+    total = sum(len(PARSERS[record["parser"]]) for record in records)
+    for record_name, parser_name, expected, actual in failures:
+        print(f"FAIL {record_name} [{parser_name}]\n  expected: {expected}\n  actual:   {actual}")
+    print(f"{total - len(failures)}/{total} 통과 (레코드 {len(records)}개)")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="모델 출력 코퍼스 파서 동등성 검사")
+    parser.add_argument("--update", action="store_true", help="현재 파서의 결과로 기대 결과를 다시 씀")
+    parser.add_argument("--record", choices=list(PARSERS), help="Ollama 응답을 받아 코퍼스에 추가할 종류")
+    parser.add_argument("--times", type=int, default=1, help="--record로 받을 응답 수")
+    parser.add_argument("--name", help="--record로 추가할 레코드 이름")
+    parser.add_argument("--school-level", default="중등")
+    parser.add_argument("--count", type=int, default=10)
+    parser.add_argument("--word", default="apple")
+    parser.add_argument("--meaning", default="사과")
+    parser.add_argument("--items", nargs="+", default=["apple:사과", "dog:개", "river:강"], help="단어:의미 목록")
+    sys.exit(main(parser.parse_args()))
@@ -0,0 +1,126 @@
+"""
+파서 마이크로벤치마크 스크립트
+
+bench/corpus/model_outputs.jsonl의 모든 레코드를 각 파서(parse_vocabulary_data, extract_options_from_text,
+parse_vocabulary_options, clean_option, parse_vocabulary_options_batch와 구조화 출력 경로인
+parse_vocabulary_output, decode_options, parse_options_batch_output)에 넣어
+호출당 시간(레코드별 최솟값의 중앙값/평균/최대, 마이크로초)과 호출당 최대 메모리 할당량(tracemalloc 최고치, 바이트)을 출력합니다.
+구조화 로그는 꺼진 상태(bench.parser_corpus가 끔)로 측정하며, 남은 표준 출력은 /dev/null로 보냅니다.
+
+--output으로 결과를 JSON으로 저장하고, --compare로 이전 결과와 비교해 파서별 속도 변화를 볼 수 있습니다.
+
+사용 예:
+    python -m bench.parser_microbench --repeat 5
+    python -m bench.parser_microbench --output before.json
+    python -m bench.parser_microbench --compare before.json
+    python -m bench.parser_microbench --tags json
+"""
+import sys
+import os
+import json
+import time
+import random
+import argparse
+import tracemalloc
+import contextlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench.parser_corpus import PARSERS, load_corpus
+
+def percentile(values, p):
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+def time_call(function, data, repeat, min_time):
+    """호출 한 번에 걸리는 시간(초)을 반환합니다. min_time초 이상 반복한 묶음을 repeat번 재고 최솟값을 씁니다."""
+    number = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(number):
+            function(data)
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_time:
+            break
+        number *= 2
+    best = elapsed / number
+    for _ in range(repeat - 1):
+        started = time.perf_counter()
+        for _ in range(number):
+            function(data)
+        best = min(best, (time.perf_counter() - started) / number)
+    return best
+
+def peak_allocation(function, data):
+    """호출 한 번 동안 늘어난 메모리 최고치(바이트)를 반환합니다. tracemalloc이 켜져 있어야 합니다."""
+    baseline, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    function(data)
+    _, peak = tracemalloc.get_traced_memory()
+    return peak - baseline
+
+def measure(records, repeat, min_time):
+    """파서별 {호출 수, 시간 통계(us), 할당 통계(바이트)}를 반환합니다."""
+    timings = {}
+    allocations = {}
+    for record in records:
+        for name, function in PARSERS[record["parser"]].items():
+            random.seed(0)
+            timings.setdefault(name, []).append(time_call(function, record["input"], repeat, min_time) * 1e6)
+
+    tracemalloc.start()
+    try:
+        for record in records:
+            for name, function in PARSERS[record["parser"]].items():
+                allocations.setdefault(name, []).append(peak_allocation(function, record["input"]))
+    finally:
+        tracemalloc.stop()
+
+    results = {}
+    for name, values in timings.items():
+        values.sort()
+        sizes = sorted(allocations[name])
+        results[name] = {
+            "records": len(values),
+            "p50_us": round(percentile(values, 50), 3),
+            "mean_us": round(sum(values) / len(values), 3),
+            "max_us": round(values[-1], 3),
+            "mean_alloc_bytes": round(sum(sizes) / len(sizes)),
+            "max_alloc_bytes": sizes[-1],
+        }
+    return results
+
+def main(args):
+    records = load_corpus()
+    if args.tags:
+        records = [record for record in records if set(args.tags) & set(record.get("tags", []))]
+    # 파서가 표준 출력에 찍는 내용은 화면에 보이지 않게 함
+    with open(os.devnull, "w", encoding="utf-8") as devnull, contextlib.redirect_stdout(devnull):
+        results = measure(records, args.repeat, args.min_time)
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as file:
+            baseline = json.load(file)["results"]
+
+    print(f"{'파서':<32} {'레코드':>6} {'p50(us)':>9} {'평균(us)':>9} {'최대(us)':>9} {'할당(B)':>9} {'최대할당(B)':>11}"
+          + (f" {'평균 변화':>9}" if baseline else ""))
+    for name, row in results.items():
+        line = (f"{name:<32} {row['records']:>6} {row['p50_us']:>9.2f} {row['mean_us']:>9.2f} "
+                f"{row['max_us']:>9.2f} {row['mean_alloc_bytes']:>9} {row['max_alloc_bytes']:>11}")
+        if name in baseline and baseline[name]["mean_us"]:
+            line += f" {baseline[name]['mean_us'] / row['mean_us']:>8.2f}x"
+        print(line)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump({"records": len(records), "results": results}, file, ensure_ascii=False, indent=2)
+        print(f"결과 저장: {args.output}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="파서 마이크로벤치마크")
+    parser.add_argument("--repeat", type=int, default=5, help="레코드별 측정 반복 횟수 (최솟값 사용)")
+    parser.add_argument("--min-time", type=float, default=0.005, help="측정 한 번의 최소 시간(초)")
+    parser.add_argument("--tags", nargs="+", help="이 태그가 붙은 레코드만 측정")
+    parser.add_argument("--output", help="결과 JSON 경로")
+    parser.add_argument("--compare", help="비교할 이전 결과 JSON (평균 시간 기준 속도 향상 배수 출력)")
+    main(parser.parse_args())
@@ -0,0 +1,188 @@
+"""
+단어장 파서 동등성 검사 스크립트
+
+VocabularyStreamParser를 기존(리팩터링 이전) parse_vocabulary_data 구현과 비교합니다.
+각 샘플을 한 번에 / 한 글자씩 / 줄 단위로 / 임의 크기 조각으로 나눠 넣어
+결과가 기존 파서와 같은지 확인하고, 다르면 종료 코드 1을 반환합니다.
+
+사용 예:
+    python -m bench.parser_parity
+"""
+import sys
+import os
+import re
+import random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import clean_meaning
+from services.vocabulary_parser import VocabularyStreamParser
+
+def legacy_parse_vocabulary_data(text):
+    """리팩터링 이전의 parse_vocabulary_data (출력문만 제거)."""
+    vocabulary_data = []
+
+    numbered_pattern = r'(\d+)\.\s+Word:\s+"([^"]+)"\s+Meaning:\s+([^\.]+)'
+    numbered_matches = re.findall(numbered_pattern, text, re.IGNORECASE)
+
+    if numbered_matches:
+        for match in numbered_matches:
+            item = {
+                "word": match[1].strip(),
+                "meaning": clean_meaning(match[2].strip()),
+                "example": ""
+            }
+            vocabulary_data.append(item)
+
+    if not vocabulary_data:
+        current_item = {}
+
+        lines = text.split('\n')
+        for line in lines:
+            line = line.strip()
+            if not line:
+                if current_item and "word" in current_item and "meaning" in current_item:
+                    if "example" not in current_item:
+                        current_item["example"] = ""
+                    vocabulary_data.append(current_item)
+                    current_item = {}
+                continue
+
+            if ":" in line:
+                parts = line.split(":", 1)
+                if len(parts) == 2:
+                    key, value = parts
+                    key = key.strip().lower()
+                    value = value.strip()
+
+                    if key == "단어" or key == "word":
+                        if current_item and "word" in current_item and "meaning" in current_item:
+                            if "example" not in current_item:
+                                current_item["example"] = ""
+                            vocabulary_data.append(current_item)
+                            current_item = {}
+                        if value.startswith('"') and value.endswith('"'):
+                            value = value[1:-1]
+                        current_item["word"] = value
+                    elif key == "의미" or key == "meaning":
+                        current_item["meaning"] = clean_meaning(value)
+                    elif key == "예문" or key == "example" or key == "영어" or key == "english":
+                        current_item["example"] = value
+
+        if current_item and "word" in current_item and "meaning" in current_item:
+            if "example" not in current_item:
+                current_item["example"] = ""
+            vocabulary_data.append(current_item)
+
+    if not vocabulary_data:
+        pattern = r'(\d+)\.\s+Word:\s+"?([^"\n]+)"?\s+Meaning:\s+([^\.\n]+)'
+        matches = re.findall(pattern, text)
+
+        for match in matches:
+            item = {
+                "word": match[1].strip(),
+                "meaning": match[2].strip(),
+                "example": ""
+            }
+            vocabulary_data.append(item)
+
+    return vocabulary_data
+
+# (이름, 모델 출력)
+SAMPLES = [
+    ("block_korean", "단어: apple\n의미: 사과\n\n단어: dog\n의미: 개 (gae)\n예문: I have a dog.\n"),
+    ("block_english_keys", 'Word: "Creative"\nMeaning: 창의적인\nExample: She is creative.\n\nWord: Happy\nMeaning: 행복한\n'),
+    ("block_no_blank_lines", "단어: apple\n의미: 사과\n단어: banana\n의미: 바나나\n단어: cherry\n의미: 체리"),
+    ("block_with_chatter", "물론입니다! 다음은 단어장입니다:\n\n단어: apple\n의미: 사과\n\n단어: river\n의미: 강\n\n도움이 되었길 바랍니다."),
+    ("block_crlf", "단어: apple\r\n의미: 사과\r\n\r\n단어: dog\r\n의미: 개\r\n"),
+    ("block_missing_meaning", "단어: apple\n\n단어: dog\n의미: 개\n"),
+    ("numbered_quoted", '1. Word: "Creative" Meaning: 창의적인.\n2. Word: "Brave" Meaning: 용감한.\n'),
+    ("numbered_quoted_one_line", 'Here: 1. Word: "Creative" Meaning: 창의적인. 2. Word: "Brave" Meaning: 용감한 (yong-gam-han).'),
+    ("numbered_quoted_multiline", '1. Word: "Creative"\n   Meaning: 창의적인.\n\n2. Word: "Brave"\n   Meaning: 용감한.\n'),
+    ("numbered_plain", "1. Word: Creative Meaning: 창의적인\n2. Word: Brave Meaning: 용감한\n"),
+    ("numbered_plain_two_lines", "1. Word: Creative\nMeaning: 창의적인\n2. Word: Brave\nMeaning: 용감한\n"),
+    ("no_items", "죄송합니다. 요청하신 단어장을 생성할 수 없습니다."),
+    ("empty", ""),
+]
+
+# 기존 파서와 의도적으로 다른 경우: (이름, 모델 출력, 기대 결과, 이유)
+KNOWN_DIFFERENCES = [
+    (
+        "numbered_quoted_no_period",
+        '1. Word: "Creative" Meaning: 창의적인\n2. Word: "Brave" Meaning: 용감한\n3. Word: "Calm" Meaning: 차분한\n',
+        [
+            {"word": "Creative", "meaning": "창의적인", "example": ""},
+            {"word": "Brave", "meaning": "용감한", "example": ""},
+            {"word": "Calm", "meaning": "차분한", "example": ""},
+        ],
+        "기존 파서는 의미를 다음 항목 번호의 마침표까지 읽어 '창의적인\\n2'를 만들고 2번 항목을 건너뜀",
+    ),
+    (
+        "dash_bullet_block",
+        "-단어: apple\n-의미: 사과\n\n- 단어: dog\n- 의미: 개\n",
+        [
+            {"word": "apple", "meaning": "사과", "example": ""},
+            {"word": "dog", "meaning": "개", "example": ""},
+        ],
+        "generate_vocabulary 프롬프트가 요구하는 '-단어:' 형식을 기존 파서는 인식하지 못함",
+    ),
+]
+
+def split_whole(text):
+    return [text]
+
+def split_chars(text):
+    return list(text)
+
+def split_lines(text):
+    return text.splitlines(keepends=True)
+
+def split_random(text, seed=0):
+    rng = random.Random(seed)
+    chunks = []
+    position = 0
+    while position < len(text):
+        size = rng.randint(1, 8)
+        chunks.append(text[position:position + size])
+        position += size
+    return chunks
+
+SPLITTERS = [
+    ("whole", split_whole),
+    ("chars", split_chars),
+    ("lines", split_lines),
+    ("random", split_random),
+]
+
+def run_incremental(chunks):
+    parser = VocabularyStreamParser()
+    items = []
+    for chunk in chunks:
+        items.extend(parser.feed(chunk))
+    items.extend(parser.close())
+    return items
+
+def check(name, text, expected):
+    """모든 분할 방식에서 기대 결과와 같은지 검사하고 실패 목록을 반환합니다."""
+    failures = []
+    for split_name, splitter in SPLITTERS:
+        actual = run_incremental(splitter(text))
+        if actual != expected:
+            failures.append(f"{name} [{split_name}]\n  expected: {expected}\n  actual:   {actual}")
+    return failures
+
+def main():
+    failures = []
+    for name, text in SAMPLES:
+        failures.extend(check(name, text, legacy_parse_vocabulary_data(text)))
+    for name, text, expected, _ in KNOWN_DIFFERENCES:
+        failures.extend(check(name, text, expected))
+
+    total = (len(SAMPLES) + len(KNOWN_DIFFERENCES)) * len(SPLITTERS)
+    for failure in failures:
+        print(f"FAIL {failure}")
+    print(f"{total - len(failures)}/{total} 통과 (의도적 차이 {len(KNOWN_DIFFERENCES)}건 포함)")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
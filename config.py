@@ -1,7 +1,121 @@
 MONGO_URL = "mongodb://localhost:27017"
 
+# 명령어 설정 파일
+COMMANDS_PATH = "EnglishCommand.yaml"
+COMMANDS_RELOAD_INTERVAL = 2.0  # 파일 변경(mtime)을 확인하는 최소 간격(초)
+
+# Ollama 서버 설정
+OLLAMA_URL = "http://localhost:11434"
+# 여러 서버를 쓰려면 모두 나열 (예: ["http://10.0.0.11:11434", "http://10.0.0.12:11434"])
+OLLAMA_BACKENDS = [OLLAMA_URL]
+OLLAMA_POOL_SIZE = 20  # 서버별 최대 동시 커넥션 수
+OLLAMA_KEEPALIVE_CONNECTIONS = 10  # 서버별로 유지할 keep-alive 커넥션 수
+OLLAMA_CONNECT_TIMEOUT = 5.0  # 초
+OLLAMA_READ_TIMEOUT = 300.0  # 초 (생성이 오래 걸릴 수 있음)
+OLLAMA_POOL_TIMEOUT = 30.0  # 커넥션 풀 대기 시간(초)
+OLLAMA_HEALTH_INTERVAL = 10.0  # 서버 상태 확인 간격(초), 서버가 2대 이상일 때만 확인
+OLLAMA_HEALTH_TIMEOUT = 2.0  # 상태 확인 응답 대기 시간(초)
+OLLAMA_EJECT_AFTER_FAILURES = 3  # 연속 실패가 이만큼 나면 서버를 잠시 제외
+OLLAMA_EJECT_DURATION = 30.0  # 제외 시간(초), 지나면 다시 요청을 보내 봄
+OLLAMA_HEDGE_ENABLED = False  # 느린 요청을 다른 서버에도 보낼지 여부 (서버 부하가 늘어남)
+OLLAMA_HEDGE_PERCENTILE = 95  # 최근 지연의 이 백분위수를 넘으면 다른 서버에도 보냄
+OLLAMA_HEDGE_MIN_SAMPLES = 20  # 헤징을 시작하기 전에 모을 지연 표본 수
+OLLAMA_KEEP_ALIVE = "30m"  # 마지막 요청 후 모델을 메모리에 유지할 시간 (-1이면 무기한)
+OLLAMA_MODEL_KEEP_ALIVE = {}  # 모델별 keep_alive (예: {"llama2": "1h"})
+
+# 모델 예열 (시작 시 모든 서버에 명령어가 쓰는 모델을 불러오고, 내려가면 다시 불러옴)
+MODEL_WARMUP_ENABLED = True
+MODEL_WARMUP_INTERVAL = 30.0  # 모델이 메모리에 있는지(/api/ps) 확인하는 간격(초)
+MODEL_WARMUP_TIMEOUT = 300.0  # 모델 하나를 불러올 때까지 기다리는 시간(초)
+
+# LLM 응답 캐시 (명령어별 사용 여부는 EnglishCommand.yaml의 cache 항목)
+CACHE_ENABLED = True
+CACHE_TTL = 7 * 24 * 3600  # 기본 유효 시간(초)
+CACHE_MEMORY_MAX_ENTRIES = 2000
+CACHE_MEMORY_MAX_BYTES = 32 * 1024 * 1024
+CACHE_DB_PATH = "cache/llm_cache.sqlite3"  # None이면 디스크 계층 사용 안 함
+CACHE_DB_MAX_ENTRIES = 200000
+
+# 같은 프롬프트로 동시에 들어온 생성 요청을 한 번의 호출로 합침
+SINGLE_FLIGHT_ENABLED = True
+
+# Ollama 호출 대기열 (우선순위/사용자별 공정 분배, 지연 기반 동시 실행 수 조절)
+LLM_SCHEDULER_ENABLED = True
+LLM_INITIAL_CONCURRENCY = 4  # 시작 시 동시 호출 수
+LLM_MIN_CONCURRENCY = 1
+LLM_MAX_CONCURRENCY = 16  # OLLAMA_POOL_SIZE 이하로 설정
+LLM_MAX_QUEUE_DEPTH = 100  # 대기 중인 호출이 이보다 많으면 바로 429 응답
+LLM_LATENCY_TOLERANCE = 2.0  # 지연이 기준 지연의 이 배수를 넘으면 동시 호출 수를 줄임
+LLM_PRIORITY_WEIGHTS = {"interactive": 4, "bulk": 1}  # 차례를 나누는 비율
+LLM_BULK_ITEMS_THRESHOLD = 50  # generate-options 단어 수가 이 이상이면 bulk 우선순위로 처리
+
+# 구조화 출력 (EnglishCommand.yaml에서 format을 지정한 명령어만 JSON으로 요청)
+# 스키마 format은 Ollama 0.5 이상 필요, 이전 버전이면 명령어의 format을 "json"으로 지정
+STRUCTURED_OUTPUT_ENABLED = True
+
+# 선택지 생성 동시 실행 제한
+OPTIONS_REQUEST_CONCURRENCY = 4  # 요청 하나당 동시에 실행할 생성 호출 수
+OPTIONS_GLOBAL_CONCURRENCY = 8  # 서버 전체에서 동시에 실행할 생성 호출 수
+
+# 선택지 배치 생성 (한 프롬프트에 여러 단어)
+OPTIONS_BATCH_SIZE = 10  # 1 이하이면 단어별로 생성
+OPTIONS_BATCH_TOKENS_PER_ITEM = 60  # 배치 호출 시 단어당 확보할 출력 토큰 수
+
+# MongoDB 일괄 저장
+MONGO_WRITE_CONCERN = 1  # 쓰기 확인 수준 (정수 또는 "majority")
+MONGO_WRITE_JOURNAL = False  # True이면 저널 기록까지 기다림
+MONGO_INSERT_CHUNK_SIZE = 1000  # insert_many 한 번에 보낼 최대 문서 수
+
+# 학교 수준별 단어 미리 생성 풀
+VOCABULARY_POOL_ENABLED = True
+VOCABULARY_POOL_LEVELS = ["초등", "중등", "고등"]
+VOCABULARY_POOL_LOW_WATERMARK = 30  # 이보다 적으면 백그라운드에서 다시 채움
+VOCABULARY_POOL_HIGH_WATERMARK = 100  # 이 개수까지 채움
+VOCABULARY_POOL_REFILL_COUNT = 20  # 생성 호출 한 번에 요청할 단어 수
+VOCABULARY_POOL_MAX_IDLE_ATTEMPTS = 3  # 새 단어가 없는 생성이 이만큼 이어지면 다음 확인까지 멈춤
+VOCABULARY_POOL_CHECK_INTERVAL = 60.0  # 풀 상태를 확인하는 간격(초)
+VOCABULARY_POOL_PATH = "cache/vocabulary_pool.json"  # None이면 저장하지 않음
+
+# 단어장 내보내기
+EXPORT_BATCH_SIZE = 500  # 커서가 한 번에 가져오고 소켓에 한 번에 쓰는 문서 수
+
+# 카테고리별 한국어 단어 목록 (오답 후보)
+LEXICON_PATH = "CategoryLexicon.yaml"
+
+# 로컬 오답 엔진 (의미 벡터의 최근접 이웃으로 LLM 없이 오답 생성)
+# "first": 엔진을 먼저 쓰고 찾지 못한 단어만 LLM 호출
+# "fallback": LLM을 먼저 쓰고 선택지 추출이나 호출이 실패하면 엔진 사용
+# "off": 사용 안 함
+DISTRACTOR_ENGINE_MODE = "fallback"
+DISTRACTOR_ENGINE_DIM = 256  # 문자 n-gram 해시 벡터 차원
+DISTRACTOR_ENGINE_VECTORS_PATH = "cache/distractor_vectors.npy"  # 메모리 매핑으로 읽는 의미 벡터 행렬
+DISTRACTOR_ENGINE_MEANINGS_PATH = "cache/distractor_meanings.json"  # 행렬의 행 순서대로 된 의미 목록
+DISTRACTOR_ENGINE_MIN_SIMILARITY = 0.1  # 이보다 유사도가 낮은 후보는 오답으로 쓰지 않음
+DISTRACTOR_ENGINE_MAX_SIMILARITY = 0.95  # 이보다 높으면 사실상 같은 뜻으로 보고 제외
+
+# Prometheus 지표 (/metrics)
+METRICS_ENABLED = True
+METRICS_BUCKETS = [0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300]  # 초
+
+# 구조화 로그 (JSON 한 줄씩, 백그라운드 스레드가 기록)
+LOG_ENABLED = True  # False이면 로그를 전혀 만들지 않음 (벤치마크용)
+LOG_LEVEL = "info"  # "debug", "info", "warning", "error"
+LOG_PATH = None  # None이면 표준 출력
+LOG_QUEUE_SIZE = 10000  # 기록을 기다리는 최대 레코드 수, 넘으면 버림
+LOG_PAYLOAD_SAMPLE_RATE = 0.01  # 프롬프트/생성 텍스트를 기록할 요청의 비율
+LOG_PAYLOAD_MAX_CHARS = 2000  # 기록할 프롬프트/생성 텍스트의 최대 길이
+
+# 요청 단위 프로파일링 (X-Profile: 1 헤더나 ?profile=1 쿼리가 있는 요청만)
+PROFILING_ENABLED = False  # False이면 미들웨어를 등록하지 않음
+PROFILING_TOKEN = None  # 지정하면 헤더/쿼리 값이 이 값과 같아야 프로파일링
+PROFILING_FORMAT = "html"  # "html"(pyinstrument 플레임그래프) 또는 "pstats"(cProfile)
+PROFILING_DIR = "static/profiles"  # /static으로 제공되는 위치
+PROFILING_URL_PREFIX = "/static/profiles"
+PROFILING_MAX_FILES = 50  # 이보다 많으면 오래된 프로파일부터 삭제
+PROFILING_INTERVAL = 0.001  # 샘플링 간격(초), html 형식에만 적용
+
 DEFAULT_OPTIONS = {
     "과일": ["사과", "바나나", "오렌지", "포도", "딸기", "키위", "망고", "복숭아"],
     "채소": ["당근", "양파", "감자", "배추", "시금치", "오이", "토마토", "고추"],
     "동물": ["개", "고양이", "말", "소", "돼지", "토끼", "사자", "호랑이"],
-} 
\ No newline at end of file
+}
@@ -1,6 +1,8 @@
 import sys
 import os
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 from fastapi.staticfiles import StaticFiles
 import uvicorn
 
@@ -8,22 +10,72 @@ import uvicorn
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 # 상대 경로로 임포트
-from routes.vocabulary_routes import vocabulary_router
+from routes.vocabulary_routes import vocabulary_router, ensure_indexes
+from routes.system_routes import system_router
+from utils.ollama_utils import start_ollama_health_checks, close_ollama_client
+from utils.model_warmup import start_model_warmup, close_model_warmup
+from utils.response_cache import close_response_cache
+from utils.llm_scheduler import LLMOverloadedError
+from services.vocabulary_pool import start_vocabulary_pool, close_vocabulary_pool
+from services.distractor_engine import get_distractor_engine
+from utils.lexicon import get_category_lexicon
+from utils.structured_log import RequestContextMiddleware, close_logger
+from utils.profiling import ProfilingMiddleware
+from config import PROFILING_ENABLED
 
 # 디렉토리 생성
 os.makedirs("static", exist_ok=True)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    시작 시 MongoDB 인덱스, 카테고리 색인, 로컬 오답 엔진 색인을 준비하고 Ollama 서버 상태 확인, 모델 예열,
+    단어 풀 채우기를 시작합니다. 모델 예열은 백그라운드에서 진행되며 /ready로 완료 여부를 확인합니다.
+    종료 시 단어 풀을 저장하고 공유 Ollama 커넥션 풀과 응답 캐시를 닫은 뒤 남은 로그를 씁니다.
+    """
+    await ensure_indexes()
+    # 첫 선택지 요청이 색인 생성을 기다리지 않도록 미리 불러옴
+    get_category_lexicon()
+    get_distractor_engine()
+    start_ollama_health_checks()
+    start_model_warmup()
+    start_vocabulary_pool()
+    yield
+    await close_vocabulary_pool()
+    await close_model_warmup()
+    await close_ollama_client()
+    close_response_cache()
+    close_logger()
+
 app = FastAPI(
     title="영단어 생성 API",
-    description="Ollama를 사용한 영어 단어 생성 API"
+    description="Ollama를 사용한 영어 단어 생성 API",
+    lifespan=lifespan
 )
 
+@app.exception_handler(LLMOverloadedError)
+async def llm_overloaded_handler(request: Request, exc: LLMOverloadedError):
+    """LLM 대기열이 가득 찼으면 오래 기다리게 하지 않고 429와 Retry-After로 바로 응답합니다."""
+    return JSONResponse(
+        status_code=429,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(exc.retry_after)}
+    )
+
+# 설정으로 켠 경우에만 X-Profile 헤더/?profile= 쿼리가 있는 요청을 프로파일링
+if PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware)
+
+# 요청마다 request_id를 로그에 붙이고 X-Request-ID 헤더로 돌려줌 (가장 바깥 미들웨어)
+app.add_middleware(RequestContextMiddleware)
+
 # 정적 파일 마운트
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
 # 라우터 등록
 app.include_router(vocabulary_router)
+app.include_router(system_router)
 
 # 서버 실행
 if __name__ == "__main__":
-    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True) 
\ No newline at end of file
+    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
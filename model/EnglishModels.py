@@ -45,9 +45,21 @@ class VocabularyItem(BaseModel):
     meaning: str
     options: List[str]
 
+class VocabularyItemError(BaseModel):
+    word: str
+    meaning: str
+    message: str
+
 class VocabularyResponse(BaseModel):
     status: str
     data: List[VocabularyItem]
+    errors: List[VocabularyItemError] = []
+
+class VocabularyListResponse(BaseModel):
+    status: str
+    count: int
+    data: List[VocabularyItem]
+    next: Optional[str] = None
 
 class ErrorResponse(BaseModel):
     status: str
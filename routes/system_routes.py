@@ -0,0 +1,88 @@
+import sys
+import os
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import PlainTextResponse, JSONResponse
+from typing import Dict, Any
+
+# 현재 디렉토리의 상위 디렉토리를 경로에 추가
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.response_cache import get_response_cache
+from utils.single_flight import get_single_flight
+from utils.llm_scheduler import get_llm_scheduler
+from utils.ollama_utils import get_ollama_client
+from utils.model_warmup import get_model_warmer
+from services.vocabulary_pool import get_vocabulary_pool
+from services.distractor_engine import get_distractor_engine
+from utils.lexicon import get_category_lexicon
+from utils.metrics import render_metrics
+from config import METRICS_ENABLED
+
+# Prometheus 텍스트 형식 버전
+METRICS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+system_router = APIRouter(tags=["system"])
+
+@system_router.get("/cache/stats", response_model=Dict[str, Any])
+async def get_cache_stats():
+    """LLM 응답 캐시의 적중/실패 횟수를 조회합니다."""
+    cache = get_response_cache()
+    if cache is None:
+        return {"status": "success", "enabled": False, "data": {}}
+    return {"status": "success", "enabled": True, "data": cache.stats()}
+
+@system_router.get("/llm/stats", response_model=Dict[str, Any])
+async def get_llm_stats():
+    """LLM 대기열과 Ollama 서버별 상태, 하나로 합쳐진 생성 요청 수를 조회합니다."""
+    scheduler = get_llm_scheduler()
+    return {
+        "status": "success",
+        "data": {
+            "single_flight": get_single_flight().stats(),
+            "scheduler": scheduler.stats() if scheduler is not None else None,
+            "backends": get_ollama_client().pool.stats()
+        }
+    }
+
+@system_router.get("/pool/stats", response_model=Dict[str, Any])
+async def get_pool_stats():
+    """학교 수준별 단어 풀의 남은 개수와 제공 횟수를 조회합니다."""
+    pool = get_vocabulary_pool()
+    if pool is None:
+        return {"status": "success", "enabled": False, "data": {}}
+    return {"status": "success", "enabled": True, "data": pool.stats()}
+
+@system_router.get("/distractors/stats", response_model=Dict[str, Any])
+async def get_distractor_stats():
+    """카테고리 색인 크기와 로컬 오답 엔진의 색인 크기, 조회/성공 횟수를 조회합니다."""
+    engine = get_distractor_engine()
+    return {
+        "status": "success",
+        "enabled": engine is not None,
+        "data": {
+            "lexicon": get_category_lexicon().stats(),
+            "engine": engine.stats() if engine is not None else None
+        }
+    }
+
+@system_router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """단계별 지연, Ollama 토큰 처리량, 파싱 실패/대체/재시도 횟수를 Prometheus 형식으로 내보냅니다."""
+    if not METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="지표 수집이 꺼져 있습니다.")
+    return PlainTextResponse(render_metrics(), media_type=METRICS_CONTENT_TYPE)
+
+@system_router.get("/ready", response_model=Dict[str, Any])
+async def get_readiness():
+    """
+    명령어가 쓰는 모든 모델이 Ollama 서버 메모리에 올라와 있으면 200, 아직 불러오는 중이거나 내려갔으면 503으로 응답합니다.
+    모델 예열이 꺼져 있으면 확인할 수 없으므로 항상 200입니다.
+    """
+    warmer = get_model_warmer()
+    if warmer is None:
+        return {"status": "ready", "enabled": False, "data": {}}
+    ready = warmer.ready()
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={"status": "ready" if ready else "warming", "enabled": True, "data": warmer.stats()}
+    )
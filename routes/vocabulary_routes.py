@@ -1,18 +1,41 @@
 import sys
 import os
-from fastapi import APIRouter, HTTPException
+import asyncio
+import json
+from contextlib import aclosing
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from typing import Dict, Any, List, Optional
+import base64
+import binascii
 import datetime
+import unicodedata
 from motor.motor_asyncio import AsyncIOMotorClient
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import ASCENDING, UpdateOne, WriteConcern
+from pymongo.errors import BulkWriteError
 
 # 현재 디렉토리의 상위 디렉토리를 경로에 추가
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 # 상대 경로로 임포트
 from model.EnglishModels import (
-    VocabularyRequest, VocabularyGenerateRequest, VocabularyResponse
+    VocabularyRequest, VocabularyGenerateRequest, VocabularyResponse, VocabularyListResponse
 )
 from utils.ollama_utils import generate_with_ollama, load_config
+from utils.llm_scheduler import (
+    LLMOverloadedError, llm_request_context, PRIORITY_INTERACTIVE, PRIORITY_BULK
+)
+from config import (
+    OPTIONS_REQUEST_CONCURRENCY, OPTIONS_GLOBAL_CONCURRENCY, OPTIONS_BATCH_SIZE,
+    MONGO_WRITE_CONCERN, MONGO_WRITE_JOURNAL, MONGO_INSERT_CHUNK_SIZE, EXPORT_BATCH_SIZE,
+    LLM_BULK_ITEMS_THRESHOLD, DISTRACTOR_ENGINE_MODE
+)
+from services.distractor_engine import find_local_options
+from utils.command_registry import get_command_registry
+from utils.metrics import MONGO_DURATION, RETRIES
+from utils.structured_log import log, log_exception, log_context
 
 # vocabulary_service.py 파일이 없으므로 필요한 함수를 직접 정의합니다
 # 이 함수들은 원래 services.vocabulary_service에 있었을 것입니다
@@ -24,7 +47,7 @@ async def generate_and_parse_vocabulary(prompt, count):
         from services.problemgeneration_service import generate_vocabulary
         
         # 실제 단어장 생성 함수 호출
-        vocabulary_items = generate_vocabulary()
+        vocabulary_items = await generate_vocabulary()
         
         # 생성된 항목 수가 요청한 수보다 적으면 추가 생성
         if len(vocabulary_items) < count:
@@ -38,7 +61,7 @@ async def generate_and_parse_vocabulary(prompt, count):
         # 요청한 수만큼만 반환
         return vocabulary_items[:count]
     except Exception as e:
-        print(f"단어장 생성 중 오류 발생: {str(e)}")
+        log("error", "vocabulary_generation_failed", f"단어장 생성 중 오류 발생: {str(e)}")
         # 오류 발생 시 임시 데이터 반환
         return [{"word": f"word{i}", "meaning": f"의미{i}", "example": f"This is example {i}", 
                 "options": [f"옵션{j}" for j in range(4)]} for i in range(count)]
@@ -72,11 +95,206 @@ def create_vocabulary_item(item, options, userId, vocaId):
     }
 
 async def save_vocabulary_items(items):
-    """단어장 항목을 저장합니다."""
-    # 임시 구현
-    for item in items:
-        await vocabulary_collection.insert_one(item)
-    return True
+    """
+    단어장 항목을 순서 없는(unordered) insert_many로 나눠 저장합니다.
+    실패한 문서의 목록 [{"index", "word", "meaning", "message"}]을 반환합니다.
+    """
+    collection = vocabulary_collection.with_options(
+        write_concern=WriteConcern(w=MONGO_WRITE_CONCERN, j=MONGO_WRITE_JOURNAL)
+    )
+    failures = []
+    for start in range(0, len(items), MONGO_INSERT_CHUNK_SIZE):
+        chunk = items[start:start + MONGO_INSERT_CHUNK_SIZE]
+        try:
+            with MONGO_DURATION.time(operation="insert_vocabulary"):
+                await collection.insert_many(chunk, ordered=False)
+        except BulkWriteError as e:
+            # 순서 없는 쓰기이므로 실패한 문서만 빠지고 나머지는 저장됨
+            for write_error in e.details.get("writeErrors", []):
+                index = start + write_error["index"]
+                failures.append({
+                    "index": index,
+                    "word": items[index]["word"],
+                    "meaning": items[index]["meaning"],
+                    "message": f"항목 저장 실패: {write_error.get('errmsg', '')}"
+                })
+            for concern_error in e.details.get("writeConcernErrors", []):
+                log("warning", "write_concern_error", f"경고: 쓰기 확인 오류: {concern_error.get('errmsg', '')}")
+    return failures
+
+# 서버 전체에서 공유하는 선택지 생성 동시 실행 제한
+options_semaphore = asyncio.Semaphore(OPTIONS_GLOBAL_CONCURRENCY)
+
+async def gather_or_cancel(*aws):
+    """
+    asyncio.gather처럼 결과를 입력 순서대로 반환하지만, 하나가 예외를 내면 나머지를 취소한 뒤 그 예외를 발생시킵니다.
+    대기열 초과(429)로 요청을 끝낼 때 남은 생성 호출이 슬롯을 잡고 계속 실행되지 않도록 합니다.
+    """
+    tasks = [asyncio.ensure_future(aw) for aw in aws]
+    try:
+        return await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+async def generate_llm_options(items):
+    """
+    항목별 선택지를 제한된 동시성으로 LLM에서 생성합니다.
+    입력 순서대로 (선택지, LLM 응답에서 추출했는지 여부, 오류 메시지)를 반환합니다.
+    """
+    from services.problemgeneration_service import (
+        generate_vocabulary_options_with_source as gen_options,
+        generate_vocabulary_options_batch as gen_options_batch
+    )
+
+    request_semaphore = asyncio.Semaphore(OPTIONS_REQUEST_CONCURRENCY)
+
+    async def generate_one(item):
+        # 요청별 제한을 먼저 잡아 한 요청이 전체 슬롯을 대기열로 점유하지 않도록 함
+        async with request_semaphore:
+            async with options_semaphore:
+                try:
+                    options, from_llm = await gen_options(item.word, item.meaning)
+                except LLMOverloadedError:
+                    raise
+                except Exception as e:
+                    error_msg = f"'{item.word}' 단어의 선택지 생성 중 오류: {str(e)}"
+                    log("warning", "options_item_failed", error_msg, word=item.word)
+                    return None, False, error_msg
+        return options, from_llm, None
+
+    async def resolve(item, options):
+        # 배치 응답에서 찾지 못한 단어는 단어별 생성으로 대체
+        if options is None:
+            RETRIES.inc(kind="options_batch_item")
+            return await generate_one(item)
+        return options, True, None
+
+    async def generate_batch(batch):
+        async with request_semaphore:
+            async with options_semaphore:
+                try:
+                    batch_options = await gen_options_batch([(item.word, item.meaning) for item in batch])
+                except LLMOverloadedError:
+                    raise
+                except Exception as e:
+                    log("warning", "options_batch_failed", f"배치 선택지 생성 실패, 단어별 생성으로 전환: {str(e)}",
+                        items=len(batch))
+                    batch_options = [None] * len(batch)
+        return await gather_or_cancel(*(resolve(item, options) for item, options in zip(batch, batch_options)))
+
+    if OPTIONS_BATCH_SIZE > 1 and len(items) > 1:
+        batches = [items[i:i + OPTIONS_BATCH_SIZE] for i in range(0, len(items), OPTIONS_BATCH_SIZE)]
+        batch_results = await gather_or_cancel(*(generate_batch(batch) for batch in batches))
+        return [result for batch_result in batch_results for result in batch_result]
+    return await gather_or_cancel(*(generate_one(item) for item in items))
+
+async def generate_options_concurrently(items, userId, vocaId):
+    """
+    공유 오답 저장소를 먼저 조회하고, 저장소에 없는 단어만 LLM으로 생성합니다.
+    로컬 오답 엔진을 먼저 쓰는 설정이면 엔진이 오답을 찾지 못한 단어만 LLM으로 생성합니다.
+    입력 순서대로 성공 항목과 오류 목록을 반환합니다.
+    """
+    keys = [make_distractor_key(item.word, item.meaning) for item in items]
+    stored = await find_stored_distractors(keys)
+
+    # 저장소에 없는 (단어, 의미)만, 같은 요청 안의 중복은 한 번만 생성
+    missing = {}
+    for item, key in zip(items, keys):
+        if key not in stored and key not in missing:
+            missing[key] = item
+    local = {}
+    if DISTRACTOR_ENGINE_MODE == "first":
+        for key, item in list(missing.items()):
+            options = find_local_options(item.meaning)
+            if options is not None:
+                local[key] = options[1:]
+                del missing[key]
+    generated = dict(zip(missing, await generate_llm_options(list(missing.values()))))
+    log("info", "options_sources", items=len(items), store_hits=sum(key in stored for key in keys),
+        local_engine=len(local), llm_generated=len(missing))
+
+    # 기본 선택지로 대체된 결과는 다른 사용자와 공유하지 않음
+    new_distractors = [
+        (missing[key], options[1:])
+        for key, (options, from_llm, _) in generated.items()
+        if from_llm and len(options) >= 4
+    ]
+    await save_distractors(new_distractors)
+
+    result_items = []
+    errors = []
+    for item, key in zip(items, keys):
+        if key in stored:
+            distractors = stored[key]
+        elif key in local:
+            distractors = local[key]
+        else:
+            options, _, error_msg = generated[key]
+            if options is None:
+                errors.append({"word": item.word, "meaning": item.meaning, "message": error_msg})
+                continue
+            distractors = options[1:]
+        # 정답은 항상 요청한 의미 그대로 맨 앞에 둠
+        result_items.append(create_vocabulary_item(item, [item.meaning] + distractors, userId, vocaId))
+    return result_items, errors
+
+def normalize_text(text):
+    """비교용으로 유니코드 정규화, 공백 정리, 소문자 변환을 합니다."""
+    return " ".join(unicodedata.normalize("NFC", text).split()).lower()
+
+def make_distractor_key(word, meaning):
+    """오답 저장소의 (단어, 의미) 키를 만듭니다."""
+    return f"{normalize_text(word)}\t{normalize_text(meaning)}"
+
+async def find_stored_distractors(keys):
+    """저장된 오답을 한 번의 $in 조회로 가져옵니다. 키 -> 오답 목록 사전을 반환합니다."""
+    unique_keys = list(set(keys))
+    if not unique_keys:
+        return {}
+    try:
+        with MONGO_DURATION.time(operation="find_distractors"):
+            cursor = distractor_collection.find(
+                {"key": {"$in": unique_keys}},
+                {"_id": 0, "key": 1, "distractors": 1}
+            )
+            docs = await cursor.to_list(length=None)
+    except Exception as e:
+        # 저장소는 최적화 용도이므로 실패해도 LLM 생성으로 진행
+        log("warning", "distractor_store_find_failed", f"경고: 오답 저장소 조회 실패: {str(e)}")
+        return {}
+    return {doc["key"]: doc["distractors"] for doc in docs}
+
+async def save_distractors(entries):
+    """새로 생성한 오답을 공유 저장소에 저장합니다. 이미 있는 키는 덮어쓰지 않습니다."""
+    if not entries:
+        return
+    now = datetime.datetime.now()
+    operations = [
+        UpdateOne(
+            {"key": make_distractor_key(item.word, item.meaning)},
+            {"$setOnInsert": {
+                "word": item.word,
+                "meaning": item.meaning,
+                "distractors": distractors,
+                "createdAt": now
+            }},
+            upsert=True
+        )
+        for item, distractors in entries
+    ]
+    try:
+        with MONGO_DURATION.time(operation="save_distractors"):
+            await distractor_collection.bulk_write(operations, ordered=False)
+    except BulkWriteError as e:
+        # 동시에 같은 키를 저장한 경우(중복 키)는 무시
+        other_errors = [err for err in e.details.get("writeErrors", []) if err.get("code") != 11000]
+        if other_errors:
+            log("warning", "distractor_store_save_failed", f"경고: 오답 저장 중 오류 발생: {other_errors}")
+    except Exception as e:
+        log("warning", "distractor_store_save_failed", f"경고: 오답 저장 실패: {str(e)}")
 
 def prepare_response_items(items):
     """응답용 항목을 준비합니다."""
@@ -87,6 +305,10 @@ def prepare_response_items(items):
         "options": item["options"]
     } for item in items]
 
+# 클라이언트가 사용하는 필드만 조회 (_id는 다음 페이지 토큰용)
+VOCABULARY_PROJECTION = {"_id": 1, "word": 1, "meaning": 1, "options": 1}
+EXPORT_PROJECTION = {"_id": 0, "word": 1, "meaning": 1, "options": 1}
+
 def create_filter_condition(userId, vocaId):
     """필터 조건을 생성합니다."""
     # 임시 구현
@@ -97,11 +319,30 @@ def create_filter_condition(userId, vocaId):
         filter_condition["vocaId"] = vocaId
     return filter_condition
 
-async def fetch_vocabulary_items(filter_condition, limit, skip):
-    """단어장 항목을 조회합니다."""
-    # 임시 구현
-    cursor = vocabulary_collection.find(filter_condition).skip(skip).limit(limit)
-    return await cursor.to_list(length=limit)
+def encode_page_token(last_id):
+    """마지막 항목의 _id로 다음 페이지 토큰을 만듭니다."""
+    return base64.urlsafe_b64encode(last_id.binary).decode("ascii").rstrip("=")
+
+def decode_page_token(token):
+    """다음 페이지 토큰을 _id로 되돌립니다. 올바르지 않으면 ValueError를 발생시킵니다."""
+    try:
+        return ObjectId(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+    except (binascii.Error, InvalidId, TypeError) as e:
+        raise ValueError("올바르지 않은 페이지 토큰입니다.") from e
+
+async def fetch_vocabulary_items(filter_condition, limit, skip=0, after_id=None):
+    """
+    단어장 항목을 _id 순으로 조회합니다.
+    after_id가 있으면 그 다음 항목부터(키셋 방식), 없으면 skip만큼 건너뛰고 조회합니다.
+    """
+    if after_id is not None:
+        filter_condition = {**filter_condition, "_id": {"$gt": after_id}}
+    cursor = vocabulary_collection.find(filter_condition, VOCABULARY_PROJECTION).sort("_id", ASCENDING)
+    if skip:
+        cursor = cursor.skip(skip)
+    cursor = cursor.limit(limit)
+    with MONGO_DURATION.time(operation="find_vocabulary"):
+        return await cursor.to_list(length=limit)
 
 vocabulary_router = APIRouter(prefix="/vocabulary", tags=["vocabulary"])
 config = load_config()
@@ -111,27 +352,68 @@ MONGO_URL = "mongodb://localhost:27017"
 client = AsyncIOMotorClient(MONGO_URL)
 db = client.vocabulary_db
 vocabulary_collection = db.vocabulary_items
+distractor_collection = db.distractors
+
+async def ensure_indexes():
+    """필요한 MongoDB 인덱스를 생성합니다."""
+    try:
+        await distractor_collection.create_index("key", unique=True, name="distractor_key_unique")
+        # 단어장 조회 필터 + _id 정렬을 인덱스만으로 처리 (필터 조합마다 등호 키 바로 뒤에 _id가 와야
+        # 정렬에 인덱스를 쓸 수 있으므로 userId만 쓰는 조회에도 별도 인덱스가 필요함)
+        await vocabulary_collection.create_index(
+            [("userId", ASCENDING), ("vocaId", ASCENDING), ("_id", ASCENDING)],
+            name="user_voca_id"
+        )
+        await vocabulary_collection.create_index(
+            [("userId", ASCENDING), ("_id", ASCENDING)],
+            name="user_id"
+        )
+        await vocabulary_collection.create_index(
+            [("vocaId", ASCENDING), ("_id", ASCENDING)],
+            name="voca_id"
+        )
+    except Exception as e:
+        log("warning", "ensure_indexes_failed", f"경고: 인덱스 생성 실패: {str(e)}")
+
 
+def validate_vocabulary_request(request: VocabularyRequest):
+    """school_level, count가 generate_vocabulary 명령어의 매개변수 조건을 벗어나면 400으로 응답합니다."""
+    try:
+        get_command_registry().get("generate_vocabulary").validate(
+            school_level=request.school_level, count=request.count
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 @vocabulary_router.post("/generate", response_model=VocabularyResponse)
 async def generate_vocabulary(request: VocabularyRequest):
     """단어장 데이터를 생성합니다."""
+    # 잘못된 입력은 생성 오류(500)가 되기 전에 걸러냄
+    validate_vocabulary_request(request)
     try:
         # 서비스 계층에서 단어장 생성 함수 직접 호출
         from services.problemgeneration_service import generate_vocabulary
+        from services.vocabulary_pool import get_vocabulary_pool
         
-        # 단어장 생성 (EnglishCommand.yaml 설정에 따라 자동으로 처리됨)
-        vocabulary_items = generate_vocabulary()
+        requested_count = request.count if request.count else 10
+        
+        # 미리 생성해 둔 풀에 충분히 있으면 바로 사용하고, 없으면 직접 생성
+        pool = get_vocabulary_pool()
+        vocabulary_items = pool.take(request.school_level, requested_count) if pool else None
+        if vocabulary_items is None:
+            with llm_request_context(request.userId, PRIORITY_INTERACTIVE), log_context(user_id=request.userId):
+                vocabulary_items = await generate_vocabulary(
+                    school_level=request.school_level, count=requested_count
+                )
         
         # 요청한 수만큼만 반환하도록 제한
-        requested_count = request.count if request.count else 10
         if len(vocabulary_items) > requested_count:
             vocabulary_items = vocabulary_items[:requested_count]
         
         # 생성된 항목 수가 요청한 수보다 적으면 오류 발생
         if len(vocabulary_items) < requested_count:
             error_msg = f"요청한 {requested_count}개 단어를 생성하지 못했습니다. 생성된 단어: {len(vocabulary_items)}개"
-            print(error_msg)
+            log("error", "vocabulary_count_short", error_msg, user_id=request.userId)
             raise HTTPException(status_code=500, detail=error_msg)
         
         # 응답 데이터 형식으로 변환
@@ -148,13 +430,67 @@ async def generate_vocabulary(request: VocabularyRequest):
             "status": "success",
             "data": formatted_items
         }
+    except LLMOverloadedError:
+        raise
     except Exception as e:
         error_msg = f"단어장 생성 중 오류 발생: {str(e)}"
-        print(error_msg)
-        import traceback
-        print(traceback.format_exc())
+        log_exception("vocabulary_request_failed", error_msg, e, user_id=request.userId)
         raise HTTPException(status_code=500, detail=error_msg)
 
+@vocabulary_router.post("/generate/stream")
+async def stream_vocabulary(request: VocabularyRequest, http_request: Request):
+    """
+    단어장 항목을 파싱되는 즉시 스트리밍합니다.
+    기본은 NDJSON이며, Accept 헤더에 text/event-stream이 있으면 SSE로 보냅니다.
+    """
+    from services.problemgeneration_service import stream_vocabulary as stream_items
+    
+    # 스트림이 시작된 뒤에는 상태 코드를 바꿀 수 없으므로 먼저 검증
+    validate_vocabulary_request(request)
+    use_sse = "text/event-stream" in http_request.headers.get("accept", "")
+    requested_count = request.count if request.count else 10
+    
+    def encode(event, payload):
+        data = json.dumps(payload, ensure_ascii=False)
+        if use_sse:
+            return f"event: {event}\ndata: {data}\n\n"
+        return data + "\n"
+    
+    async def event_stream():
+        count = 0
+        try:
+            with llm_request_context(request.userId, PRIORITY_INTERACTIVE), log_context(user_id=request.userId):
+                async with aclosing(stream_items(school_level=request.school_level, count=requested_count)) as items:
+                    async for item in items:
+                        yield encode("item", {
+                            "word": item["word"],
+                            "meaning": item["meaning"],
+                            "options": []  # 이 시점에서는 선택지 없음
+                        })
+                        count += 1
+                        # 요청한 수만큼 보내면 생성 중단
+                        if count >= requested_count:
+                            break
+        except LLMOverloadedError as e:
+            log("warning", "llm_overloaded", str(e), user_id=request.userId)
+            yield encode("error", {"status": "error", "message": str(e), "retry_after": e.retry_after})
+            return
+        except Exception as e:
+            error_msg = f"단어장 생성 중 오류 발생: {str(e)}"
+            log("error", "vocabulary_stream_failed", error_msg, user_id=request.userId)
+            yield encode("error", {"status": "error", "message": error_msg})
+            return
+        
+        if count < requested_count:
+            error_msg = f"요청한 {requested_count}개 단어를 생성하지 못했습니다. 생성된 단어: {count}개"
+            log("warning", "vocabulary_count_short", error_msg, user_id=request.userId)
+            yield encode("done", {"status": "partial", "count": count, "message": error_msg})
+        else:
+            yield encode("done", {"status": "success", "count": count})
+    
+    media_type = "text/event-stream" if use_sse else "application/x-ndjson"
+    return StreamingResponse(event_stream(), media_type=media_type)
+
 @vocabulary_router.post("/generate-options", response_model=VocabularyResponse)
 async def generate_vocabulary_options(request: VocabularyGenerateRequest):
     """단어와 의미를 받아 선택지를 포함한 단어장 항목을 생성합니다."""
@@ -162,61 +498,119 @@ async def generate_vocabulary_options(request: VocabularyGenerateRequest):
         raise HTTPException(status_code=400, detail="userId와 vocaId는 필수 항목입니다.")
     
     try:
-        # 상대 경로로 임포트
-        from services.problemgeneration_service import generate_vocabulary_options as gen_options
+        # 단어 수가 많은 요청은 대화형 요청을 막지 않도록 bulk 우선순위로 처리
+        priority = PRIORITY_BULK if len(request.items) >= LLM_BULK_ITEMS_THRESHOLD else PRIORITY_INTERACTIVE
         
-        result_items = []
-        for item in request.items:
-            try:
-                # 선택지 생성 함수 호출
-                options = gen_options(item.word, item.meaning)
-                
-                # 항목 생성
-                result_item = create_vocabulary_item(item, options, request.userId, request.vocaId)
-                result_items.append(result_item)
-            except Exception as e:
-                # 개별 항목 처리 중 오류 발생 시 오류 메시지 포함
-                error_msg = f"'{item.word}' 단어의 선택지 생성 중 오류: {str(e)}"
-                print(error_msg)
-                raise HTTPException(status_code=500, detail=error_msg)
+        # 단어별 선택지를 동시에 생성 (실패한 항목은 errors로 보고)
+        with llm_request_context(request.userId, priority), log_context(user_id=request.userId):
+            result_items, errors = await generate_options_concurrently(
+                request.items, request.userId, request.vocaId
+            )
+        
+        if request.items and not result_items:
+            error_msg = f"모든 단어의 선택지 생성에 실패했습니다: {errors[0]['message']}"
+            log("error", "options_all_failed", error_msg, user_id=request.userId)
+            raise HTTPException(status_code=500, detail=error_msg)
         
         try:
-            await save_vocabulary_items(result_items)
+            save_failures = await save_vocabulary_items(result_items)
         except Exception as e:
             error_msg = f"항목 저장 중 오류 발생: {str(e)}"
-            print(error_msg)
+            log_exception("vocabulary_save_failed", error_msg, e, user_id=request.userId)
             raise HTTPException(status_code=500, detail=error_msg)
         
+        # 저장에 실패한 항목은 응답 데이터 대신 errors로 보고
+        if save_failures:
+            failed_indexes = {failure["index"] for failure in save_failures}
+            result_items = [item for i, item in enumerate(result_items) if i not in failed_indexes]
+            errors.extend(
+                {"word": failure["word"], "meaning": failure["meaning"], "message": failure["message"]}
+                for failure in save_failures
+            )
+            log("warning", "vocabulary_save_partial", f"항목 저장 실패: {len(save_failures)}개",
+                user_id=request.userId, failed=len(save_failures))
+            if not result_items:
+                raise HTTPException(status_code=500, detail=f"모든 항목 저장에 실패했습니다: {save_failures[0]['message']}")
+        
         return {
-            "status": "success",
-            "data": prepare_response_items(result_items)
+            "status": "partial" if errors else "success",
+            "data": prepare_response_items(result_items),
+            "errors": errors
         }
-    except HTTPException:
-        # 이미 HTTPException인 경우 그대로 전달
+    except (HTTPException, LLMOverloadedError):
+        # 이미 HTTPException이거나 대기열 초과(429)인 경우 그대로 전달
         raise
     except Exception as e:
-        import traceback
         error_msg = f"선택지 생성 중 오류 발생: {str(e)}"
-        print(error_msg)
-        print(traceback.format_exc())
+        log_exception("options_request_failed", error_msg, e, user_id=request.userId)
         raise HTTPException(status_code=500, detail=error_msg)
 
-@vocabulary_router.get("", response_model=Dict[str, Any])
+@vocabulary_router.get("", response_model=VocabularyListResponse)
 async def get_vocabulary_items(
     userId: Optional[str] = None,
     vocaId: Optional[str] = None,
     limit: int = 100,
-    skip: int = 0
+    skip: int = 0,
+    cursor: Optional[str] = None
 ):
-    """저장된 단어장 항목을 조회합니다."""
+    """
+    저장된 단어장 항목을 조회합니다.
+    응답의 next 값을 cursor로 넘기면 다음 페이지를 가져옵니다. skip 방식도 계속 지원합니다.
+    """
+    if cursor and skip:
+        raise HTTPException(status_code=400, detail="cursor와 skip은 함께 사용할 수 없습니다.")
+    try:
+        after_id = decode_page_token(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
     try:
         filter_condition = create_filter_condition(userId, vocaId)
-        items = await fetch_vocabulary_items(filter_condition, limit, skip)
+        items = await fetch_vocabulary_items(filter_condition, limit, skip, after_id)
+        # 페이지가 가득 찼을 때만 다음 페이지 토큰 제공
+        next_token = encode_page_token(items[-1]["_id"]) if items and len(items) == limit else None
         return {
             "status": "success",
             "count": len(items),
-            "data": items
+            "data": [{
+                "word": item.get("word", ""),
+                "meaning": item.get("meaning", ""),
+                "options": item.get("options", [])
+            } for item in items],
+            "next": next_token
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"단어장 조회 중 오류 발생: {str(e)}")
 
+@vocabulary_router.get("/export")
+async def export_vocabulary_items(userId: Optional[str] = None, vocaId: Optional[str] = None):
+    """
+    단어장 항목 전체를 NDJSON으로 내보냅니다.
+    커서를 배치 단위로 읽어 바로 소켓에 쓰므로 단어장 크기와 관계없이 메모리 사용량이 일정합니다.
+    """
+    if not userId and not vocaId:
+        raise HTTPException(status_code=400, detail="userId 또는 vocaId가 필요합니다.")
+    
+    filter_condition = create_filter_condition(userId, vocaId)
+    
+    async def export_stream():
+        cursor = vocabulary_collection.find(filter_condition, EXPORT_PROJECTION, batch_size=EXPORT_BATCH_SIZE)
+        cursor = cursor.sort("_id", ASCENDING)
+        lines = []
+        try:
+            async for item in cursor:
+                lines.append(json.dumps(item, ensure_ascii=False))
+                if len(lines) >= EXPORT_BATCH_SIZE:
+                    yield "\n".join(lines) + "\n"
+                    lines = []
+            if lines:
+                yield "\n".join(lines) + "\n"
+        finally:
+            # 클라이언트가 도중에 연결을 끊어도 서버 커서를 정리
+            await cursor.close()
+    
+    return StreamingResponse(
+        export_stream(),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="vocabulary.ndjson"'}
+    )
@@ -1,13 +1,19 @@
 from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel
 from typing import Optional, Dict, Any, List
+from contextlib import asynccontextmanager
 import uvicorn
 import yaml
 import os
-import requests
-import json
+import sys
 
-app = FastAPI(title="영단어 생성 API", description="Ollama를 사용한 영어 단어 생성 API")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.ollama_utils import generate_with_ollama, close_ollama_client
+from utils.model_warmup import start_model_warmup, close_model_warmup
+from utils.command_registry import get_command_registry
+from utils.metrics import STRUCTURED_OUTPUT
+from services.problemgeneration_service import decode_vocabulary
 
 # 요청 모델 정의
 class WordRequest(BaseModel):
@@ -33,49 +39,28 @@ def load_config():
     except Exception as e:
         raise Exception(f"YAML 파일을 로드하는 중 오류가 발생했습니다: {e}")
 
-# Ollama API 호출 함수
-def generate_with_ollama(prompt, config):
-    try:
-        url = "http://localhost:11434/api/generate"
-        payload = {
-            "model": config["model"]["name"],
-            "prompt": prompt,
-            "temperature": config["model"]["temperature"],
-            "top_p": config["model"]["top_p"],
-            "max_tokens": config["model"]["max_tokens"]
-        }
-        
-        response = requests.post(url, json=payload)
-        response.raise_for_status()
-        
-        # Ollama는 스트리밍 응답을 반환하므로 전체 텍스트를 모아야 함
-        full_response = ""
-        for line in response.text.strip().split('\n'):
-            if line:
-                data = json.loads(line)
-                full_response += data.get("response", "")
-                if data.get("done", False):
-                    break
-        
-        return full_response
-    except requests.exceptions.ConnectionError:
-        raise Exception("Ollama 서버에 연결할 수 없습니다. Ollama가 실행 중인지 확인하세요.")
-    except Exception as e:
-        raise Exception(f"Ollama API 호출 중 오류 발생: {str(e)}")
-
 # 설정 로드
 try:
     config = load_config()
     print("설정이 성공적으로 로드되었습니다.")
-    
-    # Ollama 서버 연결 테스트
-    test_prompt = "Hello"
-    generate_with_ollama(test_prompt, config)
-    print("Ollama 서버에 성공적으로 연결되었습니다.")
 except Exception as e:
     print(f"초기화 중 오류 발생: {e}")
     config = None
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    시작 시 설정된 모델을 백그라운드에서 미리 불러오고 종료 시 커넥션 풀을 닫습니다.
+    예열은 생성 요청 없이 모델만 불러오며 서버 시작을 기다리게 하지 않습니다.
+    """
+    if config is not None:
+        start_model_warmup([config["model"]["name"]])
+    yield
+    await close_model_warmup()
+    await close_ollama_client()
+
+app = FastAPI(title="영단어 생성 API", description="Ollama를 사용한 영어 단어 생성 API", lifespan=lifespan)
+
 @app.post("/generate-word", response_model=WordResponse)
 async def generate_word(voca_id: int):
     if config is None:
@@ -89,7 +74,7 @@ async def generate_word(voca_id: int):
         prompt = f"초중고 학생을 위한 영어 단어와 그 의미를 한국어로 생성해주세요. 난이도 레벨: {voca_id}"
         
         # Ollama로 단어 생성
-        generated_text = generate_with_ollama(prompt, config)
+        generated_text = await generate_with_ollama(prompt, config)
         
         # 생성된 텍스트 파싱 (예: "단어: apple, 의미: 사과")
         try:
@@ -144,74 +129,14 @@ async def generate_multiple_words(voca_id: int, count: int = 10):
         # 여러 단어 생성을 위한 프롬프트
         prompt = f"초중고 학생을 위한 영어 단어와 그 의미를 한국어로 {count}개 생성해주세요. 난이도 레벨: {voca_id}. 각 단어는 '단어: [영단어], 의미: [한국어 의미]' 형식으로 작성해주세요."
         
-        # Ollama로 단어 생성
-        generated_text = generate_with_ollama(prompt, config)
-        
-        # 생성된 텍스트 파싱
-        words = []
-        current_word = {}
-        
-        lines = generated_text.split('\n')
-        for line in lines:
-            if not line.strip():
-                if current_word and "word" in current_word and "meaning" in current_word:
-                    words.append(current_word)
-                    current_word = {}
-                continue
-                
-            if ":" in line:
-                key, value = line.split(":", 1)
-                key = key.strip().lower()
-                value = value.strip()
-                
-                if key == "단어" or key == "word":
-                    if current_word and "word" in current_word and "meaning" in current_word:
-                        words.append(current_word)
-                        current_word = {}
-                    current_word["word"] = value
-                elif key == "의미" or key == "meaning":
-                    current_word["meaning"] = value
-        
-        # 마지막 단어 추가
-        if current_word and "word" in current_word and "meaning" in current_word:
-            words.append(current_word)
+        # Ollama로 단어 생성 (구조화 출력이면 JSON을 먼저 디코드)
+        words = await request_words(prompt)
         
         # 필요한 수만큼 단어가 생성되었는지 확인
         if len(words) < count:
             # 부족한 경우 추가 생성 시도
             additional_prompt = f"추가로 {count - len(words)}개의 영어 단어와 의미를 생성해주세요. 난이도 레벨: {voca_id}"
-            additional_text = generate_with_ollama(additional_prompt, config)
-            
-            # 추가 파싱 로직 (위와 동일)
-            additional_words = []
-            current_word = {}
-            
-            lines = additional_text.split('\n')
-            for line in lines:
-                if not line.strip():
-                    if current_word and "word" in current_word and "meaning" in current_word:
-                        additional_words.append(current_word)
-                        current_word = {}
-                    continue
-                    
-                if ":" in line:
-                    key, value = line.split(":", 1)
-                    key = key.strip().lower()
-                    value = value.strip()
-                    
-                    if key == "단어" or key == "word":
-                        if current_word and "word" in current_word and "meaning" in current_word:
-                            additional_words.append(current_word)
-                            current_word = {}
-                        current_word["word"] = value
-                    elif key == "의미" or key == "meaning":
-                        current_word["meaning"] = value
-            
-            # 마지막 단어 추가
-            if current_word and "word" in current_word and "meaning" in current_word:
-                additional_words.append(current_word)
-                
-            words.extend(additional_words)
+            words.extend(await request_words(additional_prompt))
         
         # 각 단어에 vocaId와 ID 추가
         for i, word in enumerate(words):
@@ -228,6 +153,56 @@ async def generate_multiple_words(voca_id: int, count: int = 10):
             detail=f"여러 단어 생성 중 오류 발생: {str(e)}"
         )
 
+async def request_words(prompt: str) -> List[Dict[str, str]]:
+    """
+    단어 목록을 생성합니다.
+    generate_vocabulary 명령어가 구조화 출력을 쓰면 같은 스키마로 JSON을 요청해 먼저 디코드하고,
+    디코드하지 못했을 때만 텍스트를 파싱합니다.
+    """
+    command = get_command_registry().get("generate_vocabulary")
+    if not command.structured:
+        return parse_word_lines(await generate_with_ollama(prompt, config))
+    
+    generated_text = await generate_with_ollama(
+        prompt + "\n\n" + command.format_instructions, config, output_format=command.output_format
+    )
+    items = decode_vocabulary(generated_text)
+    STRUCTURED_OUTPUT.inc(parser="vocabulary", result="fallback" if items is None else "json")
+    if items is None:
+        return parse_word_lines(generated_text)
+    return [{"word": item["word"], "meaning": item["meaning"]} for item in items]
+
+def parse_word_lines(text: str) -> List[Dict[str, str]]:
+    """'단어: [영단어]', '의미: [한국어 의미]' 줄로 된 텍스트에서 단어 목록을 파싱합니다."""
+    words = []
+    current_word = {}
+    
+    for line in text.split('\n'):
+        if not line.strip():
+            if current_word and "word" in current_word and "meaning" in current_word:
+                words.append(current_word)
+                current_word = {}
+            continue
+            
+        if ":" in line:
+            key, value = line.split(":", 1)
+            key = key.strip().lower()
+            value = value.strip()
+            
+            if key == "단어" or key == "word":
+                if current_word and "word" in current_word and "meaning" in current_word:
+                    words.append(current_word)
+                    current_word = {}
+                current_word["word"] = value
+            elif key == "의미" or key == "meaning":
+                current_word["meaning"] = value
+    
+    # 마지막 단어 추가
+    if current_word and "word" in current_word and "meaning" in current_word:
+        words.append(current_word)
+    
+    return words
+
 # 모의 ID 생성 함수 (실제 구현에서는 DB에서 생성된 ID 사용)
 def generate_mock_id():
     import random
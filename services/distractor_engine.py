@@ -0,0 +1,307 @@
+import os
+import re
+import sys
+import json
+import zlib
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+import yaml
+
+from utils.lexicon import CategoryLexicon, normalize_meaning
+from services.vocabulary_pool import write_json_atomic
+from utils.metrics import STAGE_DURATION
+from config import (
+    LEXICON_PATH,
+    VOCABULARY_POOL_PATH,
+    DISTRACTOR_ENGINE_MODE,
+    DISTRACTOR_ENGINE_DIM,
+    DISTRACTOR_ENGINE_VECTORS_PATH,
+    DISTRACTOR_ENGINE_MEANINGS_PATH,
+    DISTRACTOR_ENGINE_MIN_SIMILARITY,
+    DISTRACTOR_ENGINE_MAX_SIMILARITY,
+)
+
+HANGUL_PATTERN = re.compile(r"[가-힣]")
+# 어간이 같으면 같은 뜻으로 보고 오답에서 제외 (예: 행복한, 행복하다, 행복하게)
+STEM_SUFFIXES = ("스러운", "하다", "하게", "하는", "적인", "한", "히", "의", "다", "적")
+CATEGORY_WEIGHT = 1.5  # 같은 카테고리 단어끼리 문자가 겹치지 않아도 가깝게 만드는 가중치
+
+def meaning_stem(key: str) -> str:
+    """정규화한 의미에서 형용사/동사 어미를 떼어 낸 어간을 반환합니다."""
+    for suffix in STEM_SUFFIXES:
+        if key.endswith(suffix) and len(key) > len(suffix):
+            return key[:-len(suffix)]
+    return key
+
+def is_same_meaning(key: str, stem: str, other_key: str, other_stem: str) -> bool:
+    """두 의미가 같거나 한쪽이 다른 쪽을 포함해 오답으로 쓰기 곤란한지 확인합니다."""
+    if key == other_key or stem == other_stem:
+        return True
+    # 합성어의 끝말은 상위 개념인 경우가 많음 (예: 기차역과 역, 빨간색과 색)
+    if key.endswith(other_key) or other_key.endswith(key):
+        return True
+    # 한 글자 어간은 너무 많은 단어에 포함되므로 포함 관계는 두 글자 이상만 확인
+    return len(stem) >= 2 and len(other_stem) >= 2 and (stem in other_key or other_stem in key)
+
+def hash_feature(feature: str, dim: int) -> Tuple[int, float]:
+    """특징 문자열을 (차원, 부호)로 해시합니다. 프로세스마다 같은 값이 나오도록 crc32를 씁니다."""
+    value = zlib.crc32(feature.encode("utf-8"))
+    return value % dim, (1.0 if value & 0x80000000 else -1.0)
+
+def ngram_vector(key: str, dim: int) -> np.ndarray:
+    """문자 1-gram과 양 끝을 표시한 2-gram을 해시한 단위 벡터를 만듭니다."""
+    vector = np.zeros(dim, dtype=np.float32)
+    padded = f"<{key}>"
+    for feature in list(key) + [padded[i:i + 2] for i in range(len(padded) - 1)]:
+        index, sign = hash_feature(feature, dim)
+        vector[index] += sign
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+def collect_meanings(lexicon_path: str = LEXICON_PATH) -> Dict[str, List[str]]:
+    """
+    오답 후보가 될 의미와 그 카테고리 목록을 모읍니다.
+    카테고리 단어 목록(DEFAULT_OPTIONS 포함)과 단어 풀에 저장된 의미(카테고리 없음)를 사용합니다.
+    """
+    entries: Dict[str, List[str]] = {}
+    displays: Dict[str, str] = {}  # 정규화한 의미 -> 처음 나온 표기
+
+    def add(meaning, category=None):
+        meaning = str(meaning).strip()
+        key = normalize_meaning(meaning)
+        if not key:
+            return
+        categories = entries.setdefault(displays.setdefault(key, meaning), [])
+        if category and category not in categories:
+            categories.append(category)
+
+    lexicon = CategoryLexicon.load(lexicon_path)
+    for category, words in lexicon.categories.items():
+        for word in words:
+            add(word, category)
+
+    if VOCABULARY_POOL_PATH and os.path.exists(VOCABULARY_POOL_PATH):
+        try:
+            with open(VOCABULARY_POOL_PATH, "r", encoding="utf-8") as file:
+                pool = json.load(file)
+            for items in pool.values():
+                for item in items:
+                    add(item.get("meaning", ""))
+        except (OSError, ValueError, AttributeError) as e:
+            print(f"경고: 단어 풀 파일의 의미를 읽지 못했습니다: {str(e)}")
+    return entries
+
+def build_distractor_index(
+    vectors_path: str = DISTRACTOR_ENGINE_VECTORS_PATH,
+    meanings_path: str = DISTRACTOR_ENGINE_MEANINGS_PATH,
+    lexicon_path: str = LEXICON_PATH,
+    dim: int = DISTRACTOR_ENGINE_DIM,
+) -> int:
+    """
+    의미 벡터 행렬(.npy)과 의미 목록(.json)을 만들고 의미 수를 반환합니다.
+    각 행은 문자 n-gram 해시 벡터 뒤에 카테고리 표시를 붙여 정규화한 것입니다.
+    """
+    entries = collect_meanings(lexicon_path)
+    categories = sorted({category for names in entries.values() for category in names})
+    category_index = {category: i for i, category in enumerate(categories)}
+
+    matrix = np.zeros((len(entries), dim + len(categories)), dtype=np.float32)
+    for row, (meaning, names) in enumerate(entries.items()):
+        matrix[row, :dim] = ngram_vector(normalize_meaning(meaning), dim)
+        for name in names:
+            # 여러 카테고리에 속하면 가중치를 나눠 가짐
+            matrix[row, dim + category_index[name]] = CATEGORY_WEIGHT / np.sqrt(len(names))
+        matrix[row] /= np.linalg.norm(matrix[row])
+
+    directory = os.path.dirname(vectors_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    temp_path = vectors_path + ".tmp"
+    with open(temp_path, "wb") as file:
+        np.save(file, matrix)
+    os.replace(temp_path, vectors_path)
+    write_json_atomic(meanings_path, {
+        "kind": "ngram",
+        "dim": dim,
+        "lexicon_mtime": os.path.getmtime(lexicon_path),
+        "categories": categories,
+        "meanings": list(entries),
+    })
+    print(f"로컬 오답 엔진 색인 생성: {len(entries)}개 의미, {matrix.shape[1]}차원")
+    return len(entries)
+
+def needs_rebuild(
+    vectors_path: str = DISTRACTOR_ENGINE_VECTORS_PATH,
+    meanings_path: str = DISTRACTOR_ENGINE_MEANINGS_PATH,
+    lexicon_path: str = LEXICON_PATH,
+    dim: int = DISTRACTOR_ENGINE_DIM,
+) -> bool:
+    """색인 파일이 없거나 단어 목록/차원 설정이 바뀌었으면 True입니다."""
+    if not os.path.exists(vectors_path) or not os.path.exists(meanings_path):
+        return True
+    try:
+        with open(meanings_path, "r", encoding="utf-8") as file:
+            meta = json.load(file)
+    except (OSError, ValueError):
+        return True
+    if meta.get("kind") != "ngram":
+        # 외부에서 만든 임베딩 행렬은 그대로 사용
+        return False
+    return meta.get("dim") != dim or meta.get("lexicon_mtime") != os.path.getmtime(lexicon_path)
+
+class DistractorEngine:
+    """
+    의미 벡터 행렬에서 정답과 비슷하지만 같지 않은 의미를 찾아 오답으로 씁니다.
+
+    행렬은 메모리 매핑으로 읽고, 질의 벡터와의 코사인 유사도(행이 정규화되어 있으므로 내적)를
+    한 번의 행렬 곱으로 계산해 상위 k개를 고릅니다. 목록에 있는 의미는 저장된 행을 그대로 쓰므로
+    같은 카테고리의 단어가 먼저 나오고, 목록에 없는 의미는 문자 n-gram 벡터로 찾습니다.
+    외부 임베딩으로 만든 행렬(kind가 ngram이 아님)은 목록에 있는 의미만 찾습니다.
+    """
+
+    def __init__(
+        self,
+        vectors: np.ndarray,
+        meanings: List[str],
+        kind: str = "ngram",
+        dim: int = DISTRACTOR_ENGINE_DIM,
+        min_similarity: float = DISTRACTOR_ENGINE_MIN_SIMILARITY,
+        max_similarity: float = DISTRACTOR_ENGINE_MAX_SIMILARITY,
+    ):
+        if vectors.ndim != 2 or vectors.shape[0] != len(meanings):
+            raise ValueError("의미 벡터 행렬과 의미 목록의 크기가 맞지 않습니다.")
+        self.vectors = vectors
+        self.meanings = meanings
+        self.kind = kind
+        self.dim = dim
+        self.min_similarity = min_similarity
+        self.max_similarity = max_similarity
+        self._keys = [normalize_meaning(meaning) for meaning in meanings]
+        self._stems = [meaning_stem(key) for key in self._keys]
+        self._rows: Dict[str, int] = {}
+        for row, key in enumerate(self._keys):
+            self._rows.setdefault(key, row)
+        self.lookups = 0
+        self.hits = 0
+
+    @classmethod
+    def load(
+        cls,
+        vectors_path: str = DISTRACTOR_ENGINE_VECTORS_PATH,
+        meanings_path: str = DISTRACTOR_ENGINE_MEANINGS_PATH,
+    ) -> "DistractorEngine":
+        """저장된 색인을 불러옵니다. 행렬은 메모리 매핑하므로 필요한 부분만 읽습니다."""
+        with open(meanings_path, "r", encoding="utf-8") as file:
+            meta = json.load(file)
+        vectors = np.load(vectors_path, mmap_mode="r")
+        return cls(vectors, meta["meanings"], kind=meta.get("kind", "embedding"), dim=meta.get("dim", vectors.shape[1]))
+
+    def query_vector(self, key: str) -> Optional[np.ndarray]:
+        """정규화한 의미의 질의 벡터를 반환합니다. 만들 수 없으면 None입니다."""
+        row = self._rows.get(key)
+        if row is not None:
+            return np.asarray(self.vectors[row])
+        if self.kind != "ngram":
+            return None
+        vector = np.zeros(self.vectors.shape[1], dtype=np.float32)
+        vector[:self.dim] = ngram_vector(key, self.dim)
+        return vector
+
+    def nearest(self, meaning: str, k: int = 3) -> Optional[List[str]]:
+        """meaning과 가장 비슷하지만 같은 뜻은 아닌 의미 k개를 반환합니다. 부족하면 None입니다."""
+        self.lookups += 1
+        key = normalize_meaning(meaning)
+        if not HANGUL_PATTERN.search(key) or not self.meanings:
+            return None
+        query = self.query_vector(key)
+        if query is None:
+            return None
+
+        scores = self.vectors @ query
+        # 같은 뜻으로 걸러지는 후보가 있으므로 k보다 넉넉히 뽑은 뒤 유사도 순으로 확인
+        count = min(len(scores), k * 8)
+        top = np.argpartition(scores, len(scores) - count)[len(scores) - count:]
+        top = top[np.argsort(-scores[top])]
+
+        chosen = [(key, meaning_stem(key))]
+        results = []
+        for row in top:
+            score = scores[row]
+            if score < self.min_similarity:
+                break
+            if score > self.max_similarity:
+                continue
+            candidate = (self._keys[row], self._stems[row])
+            if any(is_same_meaning(*picked, *candidate) for picked in chosen):
+                continue
+            chosen.append(candidate)
+            results.append(self.meanings[row])
+            if len(results) == k:
+                self.hits += 1
+                return results
+        return None
+
+    def options(self, meaning: str) -> Optional[List[str]]:
+        """정답을 맨 앞에 둔 4개의 선택지를 반환합니다. 오답을 찾지 못하면 None입니다."""
+        distractors = self.nearest(meaning, 3)
+        if distractors is None:
+            return None
+        return [meaning] + distractors
+
+    def stats(self) -> Dict[str, Any]:
+        """색인 크기와 조회/성공 횟수를 반환합니다."""
+        return {
+            "mode": DISTRACTOR_ENGINE_MODE,
+            "kind": self.kind,
+            "meanings": len(self.meanings),
+            "dimensions": int(self.vectors.shape[1]),
+            "lookups": self.lookups,
+            "hits": self.hits,
+            "hit_rate": self.hits / self.lookups if self.lookups else 0.0,
+        }
+
+_distractor_engine: Optional[DistractorEngine] = None
+_distractor_engine_loaded = False
+
+def get_distractor_engine() -> Optional[DistractorEngine]:
+    """
+    공유 오답 엔진을 반환합니다. 색인이 없거나 단어 목록이 바뀌었으면 먼저 만듭니다.
+    꺼져 있거나 불러오지 못했으면 None입니다.
+    """
+    global _distractor_engine, _distractor_engine_loaded
+    if DISTRACTOR_ENGINE_MODE == "off":
+        return None
+    if not _distractor_engine_loaded:
+        _distractor_engine_loaded = True
+        try:
+            if needs_rebuild():
+                build_distractor_index()
+            _distractor_engine = DistractorEngine.load()
+        except (OSError, ValueError, KeyError, yaml.YAMLError) as e:
+            print(f"경고: 로컬 오답 엔진을 불러오지 못했습니다: {str(e)}")
+    return _distractor_engine
+
+def find_local_options(meaning: str) -> Optional[List[str]]:
+    """로컬 오답 엔진으로 선택지를 만듭니다. 엔진이 없거나 오답을 찾지 못하면 None입니다."""
+    engine = get_distractor_engine()
+    if engine is None:
+        return None
+    with STAGE_DURATION.time(stage="distractor_engine"):
+        return engine.options(meaning)
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="로컬 오답 엔진 색인 생성/조회")
+    parser.add_argument("meanings", nargs="*", help="오답을 찾을 의미")
+    parser.add_argument("--rebuild", action="store_true", help="색인을 다시 만듦 (단어 풀의 의미 반영)")
+    args = parser.parse_args()
+
+    if args.rebuild:
+        build_distractor_index()
+    engine = get_distractor_engine()
+    if engine is None:
+        sys.exit(1)
+    for meaning in args.meanings:
+        print(f"{meaning}: {engine.nearest(meaning)}")
@@ -1,12 +1,10 @@
-import yaml
 import argparse
-import os
 import sys
-import requests
-import json
 import re
+import json
 import random
-from Gpt.utils import (
+from contextlib import aclosing
+from utils import (
     clean_meaning,
     clean_option,
     ensure_correct_answer_first,
@@ -17,356 +15,470 @@ from Gpt.utils import (
     generate_default_options_with_exact_meaning,
     ensure_four_options_with_exact_meaning
 )
+from utils.ollama_utils import generate_for_command, stream_for_command
+from utils.command_registry import get_command_registry
+from utils.llm_scheduler import LLMOverloadedError
+from utils.lexicon import get_category_lexicon
+from utils.metrics import STAGE_DURATION, PARSE_FAILURES, OPTION_FALLBACKS, STRUCTURED_OUTPUT
+from utils.structured_log import log, log_exception, log_payload
+from services.vocabulary_parser import VocabularyStreamParser, JsonVocabularyStreamParser, normalize_json_item
+from services.distractor_engine import find_local_options
+from config import OPTIONS_BATCH_TOKENS_PER_ITEM, DISTRACTOR_ENGINE_MODE
+
+# 선택지 줄을 직접 훑을 때 쓰는 항목 경계(쉼표, 줄바꿈)와 쉼표 뒤 공백
+FIELD_BOUNDARY_PATTERN = re.compile(r'[,\n]')
+LEADING_SPACE_PATTERN = re.compile(r'\s*')
+NUMBERED_OPTION_PATTERN = re.compile(r'\d+\.\s*([^\d\n]+)')
+BATCH_KEY_PREFIX_PATTERN = re.compile(r'^[\s0-9*\-•.)]+')
 
 def load_commands():
-    """YAML 명령어 파일을 로드합니다."""
-    try:
-        # 여러 경로에서 파일 찾기
-        possible_paths = [
-            "EnglishCommand.yaml",  # 현재 디렉토리
-            os.path.join(os.path.dirname(os.path.abspath(__file__)), "EnglishCommand.yaml"),  # services 디렉토리
-            os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "EnglishCommand.yaml")  # 프로젝트 루트
-        ]
-        
-        yaml_path = None
-        for path in possible_paths:
-            if os.path.exists(path):
-                yaml_path = path
-                break
-        
-        if yaml_path is None:
-            print("경고: EnglishCommand.yaml 파일을 찾을 수 없습니다. 기본 설정을 사용합니다.")
-            return {
-                "model": {
-                    "name": "llama2",
-                    "temperature": 0.7,
-                    "top_p": 0.9,
-                    "max_tokens": 500
-                }
-            }
-            
-        with open(yaml_path, "r", encoding="utf-8") as file:
-            return yaml.safe_load(file)
-    except Exception as e:
-        print(f"경고: YAML 파일을 로드하는 중 오류가 발생했습니다: {e}")
-        # 오류 발생 시 기본 설정 반환
-        return {
-            "model": {
-                "name": "llama2",
-                "temperature": 0.7,
-                "top_p": 0.9,
-                "max_tokens": 500
-            }
-        }
+    """YAML 명령어 설정을 반환합니다. 파일은 명령어 저장소가 한 번만 로드합니다."""
+    return get_command_registry().config
 
-def generate_vocabulary():
+def prepare_vocabulary_request(school_level=None, count=None):
+    """generate_vocabulary 명령어의 프롬프트와 모델 설정을 준비합니다."""
+    # generate_vocabulary 명령어 찾기 (지정하지 않은 매개변수는 기본값 사용)
+    command = get_command_registry().get("generate_vocabulary")
+    prompt = command.render(school_level=school_level, count=count)
+    model_settings = command.model_settings()
+    
+    log("debug", "llm_request", command=command.name,
+        model=model_settings["model"], temperature=model_settings["temperature"])
+    log_payload("llm_prompt", command=command.name, prompt=prompt)
+    
+    return command, prompt, model_settings
+
+async def generate_vocabulary(school_level=None, count=None, use_cache=True):
     """
     단어장을 생성하는 함수 - EnglishCommand.yaml 설정에 따라 단어장 생성
     """
     try:
-        # EnglishCommand.yaml 파일 로드
-        config = load_commands()
-        
-        # generate_vocabulary 명령어 찾기
-        cmd_config = None
-        for cmd in config.get("commands", []):
-            if cmd.get("name") == "generate_vocabulary":
-                cmd_config = cmd
-                break
+        command, prompt, model_settings = prepare_vocabulary_request(school_level, count)
         
-        if not cmd_config:
-            error_msg = "generate_vocabulary 명령어를 찾을 수 없습니다."
-            print(error_msg)
-            raise ValueError(error_msg)
-        
-        # 기본 매개변수 설정
-        params = {}
-        for param in cmd_config.get("parameters", []):
-            if "default" in param:
-                params[param["name"]] = param["default"]
-        
-        # 학교 수준에 따른 난이도 조정
-        school_level = params.get("school_level", "중등")
-        
-        # 프롬프트 생성 - 템플릿 사용
-        prompt = cmd_config["prompt_template"].format(**params)
-        
-        # 모델 설정 가져오기
-        model_name = config["model"]["name"]
-        temperature = config["model"]["temperature"]
-        top_p = config["model"]["top_p"]
-        max_tokens = config["model"]["max_tokens"]
-        
-        print(f"프롬프트: {prompt}")
-        print(f"모델: {model_name}, 온도: {temperature}")
-        
-        # Ollama API 호출
-        response = requests.post(
-            "http://localhost:11434/api/generate",
-            json={
-                "model": model_name,
-                "prompt": prompt,
-                "temperature": temperature,
-                "top_p": top_p,
-                "max_tokens": max_tokens,
-                "stream": False
-            }
+        # Ollama API 호출 (파싱되는 응답만 캐시에 저장)
+        generated_text = await generate_for_command(
+            command, prompt, model_settings,
+            validate=lambda text: bool(parse_vocabulary_output(text, command.structured)[0]),
+            use_cache=use_cache
         )
         
-        if response.status_code != 200:
-            error_msg = f"API 호출 실패: {response.status_code}, 응답: {response.text}"
-            print(error_msg)
-            raise RuntimeError(error_msg)
+        # 생성된 텍스트 기록 (샘플링)
+        log_payload("llm_response", command=command.name, text=generated_text)
         
-        # 응답 파싱
-        response_json = response.json()
-        generated_text = response_json.get("response", "")
+        # 텍스트 파싱 (구조화 출력이면 JSON을 먼저 디코드)
+        with STAGE_DURATION.time(stage="parse_vocabulary"):
+            vocabulary_data, from_json = parse_vocabulary_output(generated_text, command.structured)
+        if command.structured:
+            STRUCTURED_OUTPUT.inc(parser="vocabulary", result="json" if from_json else "fallback")
+        if not vocabulary_data:
+            PARSE_FAILURES.inc(parser="vocabulary")
         
-        # 생성된 텍스트 출력
-        print(f"생성된 텍스트: {generated_text[:100]}...")
+        return vocabulary_data
         
-        # 텍스트 파싱
-        vocabulary_data = parse_vocabulary_data(generated_text)
+    except LLMOverloadedError:
+        # 대기열 초과는 429로 응답할 수 있도록 그대로 전달
+        raise
+    except Exception as e:
+        error_msg = f"단어장 생성 중 오류 발생: {str(e)}"
+        log_exception("vocabulary_generation_failed", error_msg, e)
         
-        return vocabulary_data
+        # 오류를 전파
+        raise RuntimeError(error_msg) from e
+
+async def stream_vocabulary(school_level=None, count=None):
+    """
+    Ollama 토큰 스트림을 읽으면서 파싱이 끝난 단어장 항목을 하나씩 내보냅니다.
+    """
+    try:
+        command, prompt, model_settings = prepare_vocabulary_request(school_level, count)
         
+        parser = JsonVocabularyStreamParser() if command.structured else VocabularyStreamParser()
+        chunks = []
+        stream = stream_for_command(
+            command, prompt, model_settings,
+            validate=lambda text: bool(parse_vocabulary_output(text, command.structured)[0])
+        )
+        # 소비자가 중간에 멈추면 Ollama 스트림과 실행 차례를 바로 반납하도록 명시적으로 닫음
+        async with aclosing(stream):
+            async for chunk in stream:
+                chunks.append(chunk)
+                for item in parser.feed(chunk):
+                    yield item
+        
+        # 생성 완료 후 남은 항목 내보내기
+        log_payload("llm_response", command=command.name, text="".join(chunks))
+        remaining = parser.close()
+        if command.structured:
+            STRUCTURED_OUTPUT.inc(parser="vocabulary", result="json" if parser.used_json else "fallback")
+        for item in remaining:
+            yield item
+        
+    except LLMOverloadedError:
+        # 대기열 초과는 429로 응답할 수 있도록 그대로 전달
+        raise
     except Exception as e:
-        import traceback
         error_msg = f"단어장 생성 중 오류 발생: {str(e)}"
-        print(error_msg)
-        print(traceback.format_exc())
+        log_exception("vocabulary_generation_failed", error_msg, e, stream=True)
         
         # 오류를 전파
         raise RuntimeError(error_msg) from e
 
 def parse_vocabulary_data(text):
     """생성된 텍스트에서 단어장 데이터를 파싱합니다."""
-    vocabulary_data = []
-    
-    # 응답 형식 분석
-    print("파싱 시작...")
+    parser = VocabularyStreamParser()
+    vocabulary_data = parser.feed(text)
+    vocabulary_data.extend(parser.close())
     
-    # 번호가 붙은 형식 처리 (예: "1. Word: "Creative"")
-    numbered_pattern = r'(\d+)\.\s+Word:\s+"([^"]+)"\s+Meaning:\s+([^\.]+)'
-    numbered_matches = re.findall(numbered_pattern, text, re.IGNORECASE)
-    
-    if numbered_matches:
-        print(f"번호 형식 매치 발견: {len(numbered_matches)}개")
-        for match in numbered_matches:
-            item = {
-                "word": match[1].strip(),
-                "meaning": clean_meaning(match[2].strip()),
-                "example": ""
-            }
-            vocabulary_data.append(item)
-    
-    # 기존 형식 처리 (단어: / 의미:)
-    if not vocabulary_data:
-        print("기존 형식으로 파싱 시도...")
-        current_item = {}
-        
-        lines = text.split('\n')
-        for line in lines:
-            line = line.strip()
-            if not line:
-                if current_item and "word" in current_item and "meaning" in current_item:
-                    # 예문이 없는 경우 빈 문자열 추가
-                    if "example" not in current_item:
-                        current_item["example"] = ""
-                    vocabulary_data.append(current_item)
-                    current_item = {}
-                continue
-                
-            if ":" in line:
-                parts = line.split(":", 1)
-                if len(parts) == 2:
-                    key, value = parts
-                    key = key.strip().lower()
-                    value = value.strip()
-                    
-                    if key == "단어" or key == "word":
-                        if current_item and "word" in current_item and "meaning" in current_item:
-                            if "example" not in current_item:
-                                current_item["example"] = ""
-                            vocabulary_data.append(current_item)
-                            current_item = {}
-                        # 따옴표 제거
-                        if value.startswith('"') and value.endswith('"'):
-                            value = value[1:-1]
-                        current_item["word"] = value
-                    elif key == "의미" or key == "meaning":
-                        current_item["meaning"] = clean_meaning(value)
-                    elif key == "예문" or key == "example" or key == "영어" or key == "english":
-                        current_item["example"] = value
-    
-        # 마지막 항목 추가
-        if current_item and "word" in current_item and "meaning" in current_item:
-            if "example" not in current_item:
-                current_item["example"] = ""
-            vocabulary_data.append(current_item)
-    
-    # 추가 형식 처리 - 번호 + Word/Meaning 형식 (예: "1. Word: Creative")
-    if not vocabulary_data:
-        print("추가 형식으로 파싱 시도...")
-        pattern = r'(\d+)\.\s+Word:\s+"?([^"\n]+)"?\s+Meaning:\s+([^\.\n]+)'
-        matches = re.findall(pattern, text)
-        
-        for match in matches:
-            item = {
-                "word": match[1].strip(),
-                "meaning": match[2].strip(),
-                "example": ""
-            }
-            vocabulary_data.append(item)
-    
-    print(f"최종 파싱 결과: {len(vocabulary_data)}개 항목")
+    log("debug", "vocabulary_parsed", items=len(vocabulary_data))
     return vocabulary_data
 
-def generate_vocabulary_options(word, meaning):
+def decode_json_output(text):
+    """
+    구조화 출력 응답을 JSON 객체(사전)로 디코드합니다.
+    앞뒤에 설명이 붙은 경우 가장 바깥 중괄호 부분으로 한 번 더 시도하고, 그래도 실패하면 None을 반환합니다.
+    """
+    try:
+        data = json.loads(text)
+    except ValueError:
+        start, end = text.find('{'), text.rfind('}')
+        if start < 0 or end <= start:
+            return None
+        try:
+            data = json.loads(text[start:end + 1])
+        except ValueError:
+            return None
+    return data if isinstance(data, dict) else None
+
+def decode_vocabulary(text):
+    """구조화 출력({"items": [{"word", "meaning", "example"}, ...]})에서 단어장 항목을 꺼냅니다. 형식이 맞지 않으면 None입니다."""
+    data = decode_json_output(text)
+    entries = data.get("items") if data is not None else None
+    if not isinstance(entries, list):
+        return None
+    vocabulary_data = [item for item in map(normalize_json_item, entries) if item is not None]
+    return vocabulary_data or None
+
+def parse_vocabulary_output(text, structured):
+    """
+    단어장 응답을 파싱하고 (항목 목록, JSON으로 디코드했는지 여부)를 반환합니다.
+    structured이면 JSON을 먼저 디코드하고, 실패할 때만 텍스트 파서를 씁니다.
+    """
+    if structured:
+        vocabulary_data = decode_vocabulary(text)
+        if vocabulary_data is not None:
+            return vocabulary_data, True
+    return parse_vocabulary_data(text), False
+
+async def generate_vocabulary_options(word, meaning):
     """단어와 의미를 기반으로 선택지를 생성합니다."""
+    options, _ = await generate_vocabulary_options_with_source(word, meaning)
+    return options
+
+async def generate_vocabulary_options_with_source(word, meaning):
+    """
+    선택지와 함께 LLM 응답에서 추출했는지 여부를 반환합니다.
+    로컬 오답 엔진이나 기본 선택지(DEFAULT_OPTIONS)로 만든 경우 두 번째 값이 False입니다.
+    """
+    # 엔진을 먼저 쓰는 설정이면 오답을 찾은 경우 LLM을 호출하지 않음
+    if DISTRACTOR_ENGINE_MODE == "first":
+        options = find_local_options(meaning)
+        if options is not None:
+            return options, False
+    
     try:
-        # 명령어 설정 로드
-        config = load_commands()
-        
         # generate_vocabulary_options 명령어 찾기
-        cmd_config = None
-        for cmd in config.get("commands", []):
-            if cmd.get("name") == "generate_vocabulary_options":
-                cmd_config = cmd
-                break
-        
-        if not cmd_config:
-            error_msg = "generate_vocabulary_options 명령어를 찾을 수 없습니다."
-            print(error_msg)
-            raise ValueError(error_msg)
+        command = get_command_registry().get("generate_vocabulary_options")
         
         # 프롬프트 생성
-        prompt = cmd_config["prompt_template"].format(word=word, meaning=meaning)
+        prompt = command.render(word=word, meaning=meaning)
         
         # 모델 설정 가져오기
-        model_name = config["model"]["name"]
-        temperature = config["model"]["temperature"]
-        top_p = config["model"]["top_p"]
-        max_tokens = config["model"]["max_tokens"]
-        
-        print(f"단어: {word}, 의미: {meaning}")
-        print(f"모델: {model_name}, 온도: {temperature}")
-        
-        # Ollama API 호출
-        response = requests.post(
-            "http://localhost:11434/api/generate",
-            json={
-                "model": model_name,
-                "prompt": prompt,
-                "temperature": temperature,
-                "top_p": top_p,
-                "max_tokens": max_tokens,
-                "stream": False
-            }
+        model_settings = command.model_settings()
+        
+        log("debug", "llm_request", command=command.name, word=word, meaning=meaning,
+            model=model_settings["model"], temperature=model_settings["temperature"])
+        log_payload("llm_prompt", command=command.name, prompt=prompt)
+        
+        # Ollama API 호출 (캐시 사용, 선택지를 4개 이상 추출할 수 있는 응답만 캐시)
+        generated_text = await generate_for_command(
+            command, prompt, model_settings,
+            validate=lambda text: len(
+                (decode_options(text, meaning) if command.structured else None)
+                or extract_options_from_text(text, meaning)
+                or []
+            ) >= 4
         )
         
-        if response.status_code != 200:
-            error_msg = f"API 호출 실패: {response.status_code}, 응답: {response.text}"
-            print(error_msg)
-            raise RuntimeError(error_msg)
+        # 생성된 텍스트 기록 (샘플링)
+        log_payload("llm_response", command=command.name, text=generated_text)
         
-        # 응답 파싱
-        response_json = response.json()
-        generated_text = response_json.get("response", "")
-        
-        # 생성된 텍스트 출력 (디버깅용)
-        print(f"생성된 텍스트: {generated_text[:300]}...")
-        
-        # 응답에서 선택지만 추출
-        options = extract_options_from_text(generated_text, meaning)
+        # 응답에서 선택지만 추출 (구조화 출력이면 JSON을 먼저 디코드)
+        with STAGE_DURATION.time(stage="parse_options"):
+            options = decode_options(generated_text, meaning) if command.structured else None
+            if command.structured:
+                STRUCTURED_OUTPUT.inc(parser="options", result="fallback" if options is None else "json")
+            if options is None:
+                options = extract_options_from_text(generated_text, meaning)
         
         # 선택지가 없거나 충분하지 않으면 config에서 기본 선택지 가져오기
-        if not options or len(options) < 4:
-            print("선택지 추출 실패, 기본 선택지 사용")
-            # 설정 파일에서 기본 선택지 가져오기
-            from config import DEFAULT_OPTIONS
-            
-            # 기본 선택지 생성
-            options = get_default_options_from_config(meaning, DEFAULT_OPTIONS)
+        from_llm = bool(options) and len(options) >= 4
+        if not from_llm:
+            log("warning", "options_parse_failed", "선택지 추출 실패, 기본 선택지 사용", word=word)
+            PARSE_FAILURES.inc(parser="options")
+            options = get_fallback_options(meaning)
             
             if not options or len(options) < 4:
                 error_msg = f"선택지 생성 실패: 추출된 선택지가 부족합니다. 원본 텍스트: {generated_text[:100]}"
-                print(error_msg)
                 raise ValueError(error_msg)
         
-        return options
+        return options, from_llm
         
+    except LLMOverloadedError:
+        # 대기열 초과는 429로 응답할 수 있도록 그대로 전달
+        raise
     except Exception as e:
-        import traceback
         error_msg = f"선택지 생성 중 오류 발생: {str(e)}"
-        print(error_msg)
-        print(traceback.format_exc())
+        log_exception("options_generation_failed", error_msg, e, word=word)
+        
+        # LLM 호출이 실패해도 로컬 오답 엔진이 선택지를 만들 수 있으면 사용
+        if DISTRACTOR_ENGINE_MODE == "fallback":
+            options = find_local_options(meaning)
+            if options is not None:
+                log("info", "options_fallback", "로컬 오답 엔진의 선택지 사용", word=word, source="distractor_engine")
+                OPTION_FALLBACKS.inc(source="distractor_engine")
+                return options, False
         
         # 오류를 상위로 전파
         raise RuntimeError(error_msg) from e
 
+def get_fallback_options(meaning):
+    """LLM 응답에서 선택지를 얻지 못했을 때 로컬 오답 엔진, 그다음 DEFAULT_OPTIONS로 선택지를 만듭니다."""
+    options = find_local_options(meaning)
+    if options is not None:
+        OPTION_FALLBACKS.inc(source="distractor_engine")
+        return options
+    
+    # 설정 파일에서 기본 선택지 가져오기
+    from config import DEFAULT_OPTIONS
+    OPTION_FALLBACKS.inc(source="default_options")
+    return get_default_options_from_config(meaning, DEFAULT_OPTIONS)
+
 def extract_options_from_text(text, correct_answer):
     """LLM 응답에서 선택지만 추출하는 함수"""
-    # 1. 정규 표현식으로 선택지 패턴 찾기
-    options_pattern = r'([^,\n]+)(,\s*[^,\n]+){3,}'
-    matches = re.findall(options_pattern, text)
-    
-    if matches:
-        first_match = matches[0]
-        if isinstance(first_match, tuple):
-            # 첫 번째 매치가 튜플이면 첫 번째 요소와 나머지를 합침
-            options_text = first_match[0] + ''.join(first_match[1:])
-        else:
-            options_text = first_match
-    else:
-        # 2. 쉼표로 구분된 첫 번째 라인 시도
-        lines = [line.strip() for line in text.split('\n') if line.strip()]
-        for line in lines:
-            if ',' in line and len(line.split(',')) >= 3:
-                options_text = line
-                break
-        else:
-            # 3. 번호가 있는 목록 (1. 2. 3. 등) 시도
-            number_pattern = r'\d+\.\s*([^\d\n]+)'
-            num_matches = re.findall(number_pattern, text)
-            if len(num_matches) >= 3:
-                return ensure_correct_answer_first([clean_option(m.strip()) for m in num_matches[:4]], correct_answer)
-            return []
+    # 1. 쉼표로 이어진 항목이 4개 이상인 부분 찾기
+    options_line = find_options_line(text)
+    if options_line:
+        return split_options_line(options_line, correct_answer)
     
-    # 선택지 분리
-    options = [opt.strip() for opt in options_text.split(',')]
+    # 2. 쉼표로 구분된 항목이 3개 이상인 첫 번째 라인 시도
+    for line in text.split('\n'):
+        line = line.strip()
+        if line.count(',') >= 2:
+            return split_options_line(line, correct_answer)
     
-    # 선택지 정제 (불필요한 프리픽스 등 제거)
-    cleaned_options = []
-    for opt in options:
+    # 3. 번호가 있는 목록 (1. 2. 3. 등) 시도
+    num_matches = NUMBERED_OPTION_PATTERN.findall(text)
+    if len(num_matches) >= 3:
+        return ensure_correct_answer_first([clean_option(m.strip()) for m in num_matches[:4]], correct_answer)
+    return []
+
+def find_options_line(text):
+    """
+    쉼표로 이어진 항목이 4개 이상인 첫 부분을 반환합니다. 없으면 None입니다.
+    항목의 시작에서만 찾고 찾은 항목을 되돌아가며 다시 나누지 않으므로 쉼표 없는 긴 줄에서도 시간이 길이에 비례합니다.
+    """
+    length = len(text)
+    start = 0
+    while start < length:
+        end = field_end(text, start)
+        if end > start:
+            matched_end, fields = end, 1
+            while matched_end < length and text[matched_end] == ',':
+                following = next_field_end(text, matched_end + 1)
+                if following is None:
+                    break
+                matched_end, fields = following, fields + 1
+            if fields >= 4:
+                return text[start:matched_end]
+        start = end + 1
+    return None
+
+def field_end(text, start):
+    """start부터 다음 쉼표나 줄바꿈 위치(없으면 길이)를 반환합니다."""
+    match = FIELD_BOUNDARY_PATTERN.search(text, start)
+    return match.start() if match else len(text)
+
+def next_field_end(text, start):
+    """쉼표 바로 뒤 start에서 공백(줄바꿈 포함)을 건너뛴 다음 항목의 끝 위치를 반환합니다. 항목이 없으면 None입니다."""
+    skipped = LEADING_SPACE_PATTERN.match(text, start).end()
+    if skipped < len(text) and text[skipped] != ',':
+        return field_end(text, skipped)
+    # 공백 뒤가 쉼표나 끝이면 줄바꿈이 아닌 마지막 공백까지를 항목으로 봄
+    for position in range(skipped - 1, start - 1, -1):
+        if text[position] != '\n':
+            return position + 1
+    return None
+
+def split_options_line(options_text, correct_answer):
+    """쉼표로 구분된 선택지 문자열을 정제하여 정답이 맨 앞에 오는 목록으로 만듭니다."""
+    return build_options(options_text.split(','), correct_answer)
+
+def build_options(candidates, correct_answer):
+    """오답 후보를 정제하여 정답이 맨 앞에 오는 목록으로 만듭니다."""
+    # 정답을 맨 앞에 두고, 정제한 오답을 중복 없이 3개가 찰 때까지만 추가
+    options = [correct_answer]
+    seen = {correct_answer}
+    for opt in candidates:
         cleaned_opt = clean_option(opt)
+        if cleaned_opt and cleaned_opt not in seen:
+            seen.add(cleaned_opt)
+            options.append(cleaned_opt)
+            if len(options) == 4:
+                break
+    
+    return options
+
+def json_distractors(entry):
+    """구조화 출력 항목의 distractors에서 문자열만 골라 반환합니다. 목록이 아니면 None입니다."""
+    distractors = entry.get("distractors") if isinstance(entry, dict) else None
+    if not isinstance(distractors, list):
+        return None
+    return [distractor for distractor in distractors if isinstance(distractor, str)]
+
+def decode_options(text, correct_answer):
+    """
+    구조화 출력({"distractors": [...]})에서 선택지를 만듭니다.
+    JSON이 아니거나 오답이 3개 미만이면 None을 반환해 텍스트 파서로 넘깁니다.
+    """
+    distractors = json_distractors(decode_json_output(text))
+    if distractors is None:
+        return None
+    options = build_options(distractors, correct_answer)
+    return options if len(options) >= 4 else None
+
+async def generate_vocabulary_options_batch(items):
+    """
+    여러 (단어, 의미) 쌍의 선택지를 한 번의 Ollama 호출로 생성합니다.
+    입력 순서대로 선택지 목록을 반환하며, 응답에서 찾지 못한 단어는 None입니다.
+    """
+    try:
+        # generate_vocabulary_options_batch 명령어 찾기
+        command = get_command_registry().get("generate_vocabulary_options_batch")
+        
+        # 프롬프트 생성 - 단어 목록을 한 줄에 하나씩 나열
+        items_text = "\n".join(f"- {word}: {meaning}" for word, meaning in items)
+        prompt = command.render(items=items_text)
+        
+        # 모델 설정 가져오기 (단어 수에 비례해 출력 토큰 확보)
+        model_settings = command.model_settings()
+        model_settings["max_tokens"] = max(model_settings["max_tokens"], OPTIONS_BATCH_TOKENS_PER_ITEM * len(items))
+        
+        log("debug", "llm_request", command=command.name, items=len(items),
+            model=model_settings["model"], temperature=model_settings["temperature"])
+        log_payload("llm_prompt", command=command.name, prompt=prompt)
+        
+        # Ollama API 호출 (단어가 하나라도 매핑되는 응답만 캐시에 저장)
+        generated_text = await generate_for_command(
+            command, prompt, model_settings,
+            validate=lambda text: any(
+                options is not None for options in parse_options_batch_output(text, items, command.structured)[0]
+            )
+        )
+        
+        # 생성된 텍스트 기록 (샘플링)
+        log_payload("llm_response", command=command.name, text=generated_text)
+        
+        with STAGE_DURATION.time(stage="parse_options_batch"):
+            results, from_json = parse_options_batch_output(generated_text, items, command.structured)
+        if command.structured:
+            STRUCTURED_OUTPUT.inc(parser="options_batch", result="json" if from_json else "fallback")
+        PARSE_FAILURES.inc(sum(r is None for r in results), parser="options_batch")
+        log("debug", "options_batch_parsed", items=len(items), mapped=sum(r is not None for r in results))
+        return results
+        
+    except LLMOverloadedError:
+        # 대기열 초과는 429로 응답할 수 있도록 그대로 전달
+        raise
+    except Exception as e:
+        error_msg = f"배치 선택지 생성 중 오류 발생: {str(e)}"
+        log_exception("options_batch_generation_failed", error_msg, e, items=len(items))
         
-        # 중복 선택지 제거 및 정답과 동일한 선택지 제거 (정답은 나중에 추가)
-        if cleaned_opt and cleaned_opt not in cleaned_options and cleaned_opt != correct_answer:
-            cleaned_options.append(cleaned_opt)
+        # 오류를 상위로 전파
+        raise RuntimeError(error_msg) from e
+
+def parse_vocabulary_options_batch(text, items):
+    """
+    배치 응답의 각 줄('단어: 의미, 오답1, 오답2, 오답3')을 요청한 단어에 매핑합니다.
+    선택지가 4개 미만이거나 응답에 없는 단어는 None으로 남깁니다.
+    """
+    word_index = batch_word_index(items)
+    results = [None] * len(items)
+    for line in text.split('\n'):
+        if ':' not in line:
+            continue
+        key, value = line.split(':', 1)
+        assign_batch_options(results, items, word_index, key, value.split(','))
     
-    # 정답을 맨 앞에 추가
-    cleaned_options.insert(0, correct_answer)
+    return results
+
+def decode_options_batch(text, items):
+    """
+    구조화 출력({"items": [{"word", "distractors"}, ...]})을 요청한 단어에 매핑합니다.
+    JSON 형식이 아니면 None을 반환해 텍스트 파서로 넘깁니다.
+    """
+    data = decode_json_output(text)
+    entries = data.get("items") if data is not None else None
+    if not isinstance(entries, list):
+        return None
     
-    # 최대 4개 선택지만 사용
-    return cleaned_options[:4]
+    word_index = batch_word_index(items)
+    results = [None] * len(items)
+    for entry in entries:
+        distractors = json_distractors(entry)
+        if distractors is None or not isinstance(entry.get("word"), str):
+            continue
+        assign_batch_options(results, items, word_index, entry["word"], distractors)
+    return results
+
+def parse_options_batch_output(text, items, structured):
+    """
+    배치 응답을 파싱하고 (단어별 선택지 목록, JSON으로 디코드했는지 여부)를 반환합니다.
+    structured이면 JSON을 먼저 디코드하고, 실패할 때만 텍스트 파서를 씁니다.
+    """
+    if structured:
+        results = decode_options_batch(text, items)
+        if results is not None:
+            return results, True
+    return parse_vocabulary_options_batch(text, items), False
+
+def batch_word_index(items):
+    """정규화한 단어 -> 입력 위치 목록을 만듭니다 (같은 단어가 여러 번 요청될 수 있음)."""
+    word_index = {}
+    for position, (word, _) in enumerate(items):
+        word_index.setdefault(normalize_batch_key(word), []).append(position)
+    return word_index
+
+def assign_batch_options(results, items, word_index, key, candidates):
+    """응답의 단어 key에 해당하는, 아직 채워지지 않은 첫 번째 위치에 선택지를 할당합니다."""
+    positions = word_index.get(normalize_batch_key(key))
+    if not positions:
+        return
+    for position in positions:
+        if results[position] is None:
+            options = build_options(candidates, items[position][1])
+            if len(options) >= 4:
+                results[position] = options
+            break
+
+def normalize_batch_key(word):
+    """배치 응답의 단어 키를 비교할 수 있도록 정규화합니다 (번호, 기호, 따옴표, 대소문자 제거)."""
+    key = BATCH_KEY_PREFIX_PATTERN.sub('', word)
+    return key.strip().strip('"\'`*').strip().lower()
 
 def generate_default_options(meaning):
     """기본 선택지 생성"""
-    from config import DEFAULT_OPTIONS
-    
-    # 의미 카테고리 추측
-    category = guess_category(meaning)
-    
-    # 카테고리에 맞는 기본 옵션 사용
-    if category in DEFAULT_OPTIONS:
-        options = [meaning]
-        for opt in DEFAULT_OPTIONS[category]:
-            if opt != meaning and len(options) < 4:
-                options.append(opt)
-    else:
-        # 카테고리를 찾을 수 없으면 기본 옵션 사용
-        options = [meaning, "포도", "바나나", "딸기"]
+    # 카테고리 색인에서 같은 카테고리의 오답 선택 (카테고리를 모르면 전체 단어에서 선택)
+    options = [meaning] + get_category_lexicon().sample(meaning, 3)
     
     # 옵션이 4개가 안되면 추가
     while len(options) < 4:
@@ -0,0 +1,288 @@
+import re
+import json
+from utils import clean_meaning
+
+# 번호 형식 항목의 시작 (예: '1. Word:') - 한 줄에 여러 항목이 올 수 있음
+NUMBERED_START_PATTERN = re.compile(r'(\d+)\.\s+Word:', re.IGNORECASE)
+
+# 따옴표로 감싼 번호 형식 (예: '1. Word: "Creative" Meaning: 창의적인.')
+QUOTED_NUMBERED_PATTERN = re.compile(r'(\d+)\.\s+Word:\s+"([^"]+)"\s+Meaning:\s+([^\.]+)', re.IGNORECASE)
+
+# 따옴표가 없는 번호 형식 (예: '1. Word: Creative Meaning: 창의적인')
+PLAIN_NUMBERED_PATTERN = re.compile(r'(\d+)\.\s+Word:\s+"?([^"\n]+)"?\s+Meaning:\s+([^\.\n]+)')
+
+# 블록 형식 키 앞의 목록 기호 (예: '-단어:', '* 의미:')
+BULLET_PATTERN = re.compile(r'^[-*•]\s*')
+
+WORD_KEYS = ("단어", "word")
+MEANING_KEYS = ("의미", "meaning")
+EXAMPLE_KEYS = ("예문", "example", "영어", "english")
+
+# 구조화 출력에서 상태가 바뀌는 글자 (따옴표, 역슬래시, 괄호)
+JSON_TOKEN_PATTERN = re.compile(r'["\\{}\[\]]')
+
+class VocabularyStreamParser:
+    """
+    Ollama 출력 조각을 받아 완성된 {word, meaning, example} 항목을 내보내는 점진적 파서입니다.
+
+    완성되지 않은 마지막 줄만 버퍼에 남기고, 완성된 줄은 한 번만 처리합니다.
+    번호 형식('1. Word: "..." Meaning: ...')과 블록 형식('단어:'/'의미:')을 지원하며,
+    처음 완성된 항목의 형식으로 이후 파싱 방식을 고정합니다.
+    """
+
+    def __init__(self):
+        self._pending = []  # 아직 줄바꿈이 오지 않은 조각들
+        self._mode = None  # "numbered" | "block"
+        self._record = []  # 현재 번호 형식 항목의 텍스트 조각
+        self._record_done = False  # 현재 번호 형식 항목을 이미 내보냈는지 여부
+        self._block_item = {}
+
+    def feed(self, chunk):
+        """텍스트 조각을 추가하고 이번에 완성된 항목 목록을 반환합니다."""
+        if "\n" not in chunk:
+            if chunk:
+                self._pending.append(chunk)
+            return []
+
+        lines = chunk.split("\n")
+        self._pending.append(lines[0])
+        items = self._process_line("".join(self._pending))
+        for line in lines[1:-1]:
+            items.extend(self._process_line(line))
+        self._pending = [lines[-1]] if lines[-1] else []
+        return items
+
+    def close(self):
+        """입력이 끝났음을 알리고 남아 있는 항목을 반환합니다."""
+        items = []
+        if self._pending:
+            items.extend(self._process_line("".join(self._pending)))
+            self._pending = []
+        if self._mode != "block":
+            numbered_items = self._finish_record()
+            if numbered_items:
+                self._mode = "numbered"
+                items.extend(numbered_items)
+        if self._mode != "numbered":
+            items.extend(self._finish_block_item())
+        return items
+
+    def _process_line(self, line):
+        items = []
+        if self._mode != "block":
+            for item in self._process_numbered_line(line):
+                self._mode = "numbered"
+                items.append(item)
+        if self._mode != "numbered":
+            for item in self._process_block_line(line):
+                self._mode = "block"
+                items.append(item)
+        return items
+
+    # 번호 형식
+
+    def _process_numbered_line(self, line):
+        items = []
+        position = 0
+        for match in NUMBERED_START_PATTERN.finditer(line):
+            # 새 항목이 시작되면 이전 항목을 마무리
+            self._append_record(line[position:match.start()])
+            items.extend(self._finish_record())
+            self._record = []
+            self._record_done = False
+            position = match.start()
+        self._append_record(line[position:])
+        if self._record:
+            self._record.append("\n")
+            items.extend(self._try_complete_record())
+        return items
+
+    def _append_record(self, text):
+        # 항목 시작 전의 텍스트는 버림
+        if self._record or NUMBERED_START_PATTERN.match(text):
+            self._record.append(text)
+
+    def _try_complete_record(self):
+        """의미가 끝난 것이 확실하면 항목을 바로 내보냅니다."""
+        if self._record_done:
+            return []
+        text = "".join(self._record)
+        match = QUOTED_NUMBERED_PATTERN.search(text)
+        if match:
+            # 의미는 마침표까지이므로 마침표가 나오기 전에는 다음 줄로 이어질 수 있음
+            if match.end() < len(text) and text[match.end()] == ".":
+                self._record_done = True
+                return [self._quoted_item(match)]
+            return []
+        match = PLAIN_NUMBERED_PATTERN.search(text)
+        if match and "\n" in text[match.end():]:
+            self._record_done = True
+            return [self._plain_item(match)]
+        return []
+
+    def _finish_record(self):
+        if not self._record or self._record_done:
+            return []
+        text = "".join(self._record)
+        self._record_done = True
+        match = QUOTED_NUMBERED_PATTERN.search(text)
+        if match:
+            return [self._quoted_item(match)]
+        match = PLAIN_NUMBERED_PATTERN.search(text)
+        if match:
+            return [self._plain_item(match)]
+        return []
+
+    @staticmethod
+    def _quoted_item(match):
+        return {
+            "word": match.group(2).strip(),
+            "meaning": clean_meaning(match.group(3).strip()),
+            "example": ""
+        }
+
+    @staticmethod
+    def _plain_item(match):
+        return {
+            "word": match.group(2).strip(),
+            "meaning": match.group(3).strip(),
+            "example": ""
+        }
+
+    # 블록 형식 (단어: / 의미:)
+
+    def _process_block_line(self, line):
+        line = line.strip()
+        if not line:
+            return self._finish_block_item()
+
+        if ":" not in line:
+            return []
+
+        key, value = line.split(":", 1)
+        key = BULLET_PATTERN.sub("", key.strip()).lower()
+        value = value.strip()
+
+        items = []
+        if key in WORD_KEYS:
+            items = self._finish_block_item()
+            # 따옴표 제거
+            if value.startswith('"') and value.endswith('"'):
+                value = value[1:-1]
+            self._block_item["word"] = value
+        elif key in MEANING_KEYS:
+            self._block_item["meaning"] = clean_meaning(value)
+        elif key in EXAMPLE_KEYS:
+            self._block_item["example"] = value
+        return items
+
+    def _finish_block_item(self):
+        item = self._block_item
+        if "word" in item and "meaning" in item:
+            # 예문이 없는 경우 빈 문자열 추가
+            if "example" not in item:
+                item["example"] = ""
+            self._block_item = {}
+            return [item]
+        return []
+
+def normalize_json_item(entry):
+    """구조화 출력의 항목 하나를 {word, meaning, example}로 바꿉니다. 단어나 의미가 없으면 None입니다."""
+    if not isinstance(entry, dict):
+        return None
+    word = entry.get("word")
+    meaning = entry.get("meaning")
+    if not isinstance(word, str) or not isinstance(meaning, str) or not word.strip() or not meaning.strip():
+        return None
+    example = entry.get("example")
+    return {
+        "word": word.strip(),
+        "meaning": clean_meaning(meaning.strip()),
+        "example": example.strip() if isinstance(example, str) else ""
+    }
+
+class JsonVocabularyStreamParser:
+    """
+    구조화 출력({"items": [{"word": ..., "meaning": ...}, ...]})을 조각으로 받아
+    배열 안의 객체가 닫히는 즉시 항목을 내보내는 점진적 파서입니다.
+
+    문자열/이스케이프 상태와 괄호 깊이를 조각 사이에 이어 가며 새 조각만 한 번 훑고,
+    정규식으로 따옴표, 역슬래시, 괄호 위치로만 건너뛰므로 글자마다 파이썬 코드를 실행하지 않습니다.
+    쌓아 두는 텍스트는 아직 닫히지 않은 항목 하나뿐입니다.
+    JSON 항목을 하나도 얻지 못한 채 끝나면(서버가 format을 무시한 경우 등) 받은 조각을 close()에서
+    한 번만 이어 붙여 VocabularyStreamParser로 다시 파싱합니다. used_json은 JSON으로 항목을 얻었는지 여부입니다.
+    """
+
+    def __init__(self):
+        self._chunks = []  # 텍스트 파서로 넘길 원문 (JSON 항목을 얻으면 더 모으지 않음)
+        self._offset = 0  # 지금까지 받은 글자 수
+        self._stack = []  # 열린 괄호 ('{' 또는 '[')
+        self._in_string = False
+        self._escaped_at = None  # 이스케이프된 글자의 위치 (역슬래시 바로 다음)
+        self._item_parts = None  # 열려 있는 항목의 텍스트 조각
+        self._item_depth = None  # 항목을 연 괄호 바깥의 깊이
+        self.used_json = False
+
+    def feed(self, chunk):
+        """텍스트 조각을 추가하고 이번에 닫힌 항목 목록을 반환합니다."""
+        if not chunk:
+            return []
+        if not self.used_json:
+            self._chunks.append(chunk)
+        base = self._offset
+        self._offset += len(chunk)
+
+        items = []
+        stack = self._stack
+        # 이번 조각에서 열린 항목 텍스트가 시작하는 위치
+        item_start = 0 if self._item_parts is not None else None
+        for match in JSON_TOKEN_PATTERN.finditer(chunk):
+            index = match.start()
+            char = chunk[index]
+            if self._in_string:
+                if self._escaped_at == base + index:
+                    self._escaped_at = None
+                elif char == "\\":
+                    self._escaped_at = base + index + 1
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char == "{" or char == "[":
+                if char == "{" and self._item_parts is None and stack and stack[-1] == "[":
+                    self._item_parts = []
+                    self._item_depth = len(stack)
+                    item_start = index
+                stack.append(char)
+            elif stack:
+                stack.pop()
+                if char == "}" and self._item_parts is not None and len(stack) == self._item_depth:
+                    self._item_parts.append(chunk[item_start:index + 1])
+                    item = self._decode_item("".join(self._item_parts))
+                    self._item_parts = None
+                    item_start = None
+                    if item is not None:
+                        items.append(item)
+        if self._item_parts is not None:
+            self._item_parts.append(chunk[item_start:])
+
+        if items and not self.used_json:
+            self.used_json = True
+            self._chunks = []
+        return items
+
+    def close(self):
+        """입력이 끝났음을 알리고, JSON 항목이 없었으면 텍스트 파서의 결과를 반환합니다."""
+        if self.used_json:
+            return []
+        parser = VocabularyStreamParser()
+        items = parser.feed("".join(self._chunks))
+        items.extend(parser.close())
+        return items
+
+    @staticmethod
+    def _decode_item(text):
+        try:
+            return normalize_json_item(json.loads(text))
+        except ValueError:
+            return None
@@ -0,0 +1,253 @@
+import os
+import re
+import json
+import asyncio
+from collections import deque
+from typing import Dict, Any, List, Optional
+
+from utils.llm_scheduler import llm_request_context, PRIORITY_BULK
+from config import (
+    VOCABULARY_POOL_ENABLED,
+    VOCABULARY_POOL_LEVELS,
+    VOCABULARY_POOL_LOW_WATERMARK,
+    VOCABULARY_POOL_HIGH_WATERMARK,
+    VOCABULARY_POOL_REFILL_COUNT,
+    VOCABULARY_POOL_MAX_IDLE_ATTEMPTS,
+    VOCABULARY_POOL_CHECK_INTERVAL,
+    VOCABULARY_POOL_PATH,
+)
+
+# 풀에 넣을 항목 검증: 영단어(구 포함)와 한글이 들어간 짧은 의미
+WORD_PATTERN = re.compile(r"^[A-Za-z][A-Za-z' -]{0,39}$")
+HANGUL_PATTERN = re.compile(r"[가-힣]")
+MAX_MEANING_LENGTH = 30
+
+def is_valid_item(item: Dict[str, Any]) -> bool:
+    """풀에 넣을 수 있는 항목인지 확인합니다."""
+    word = str(item.get("word", "")).strip()
+    meaning = str(item.get("meaning", "")).strip()
+    return (
+        bool(WORD_PATTERN.match(word))
+        and bool(HANGUL_PATTERN.search(meaning))
+        and len(meaning) <= MAX_MEANING_LENGTH
+    )
+
+def write_json_atomic(path: str, data: Any):
+    """임시 파일에 쓴 뒤 교체해 중간에 종료되어도 파일이 깨지지 않게 저장합니다."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    temp_path = path + ".tmp"
+    with open(temp_path, "w", encoding="utf-8") as file:
+        json.dump(data, file, ensure_ascii=False)
+    os.replace(temp_path, path)
+
+class VocabularyPool:
+    """
+    학교 수준별로 미리 생성해 둔 단어를 보관하는 저장소입니다.
+
+    풀이 하한(low_watermark) 아래로 내려가면 백그라운드 작업이 상한(high_watermark)까지
+    다시 채웁니다. 내용은 파일에 저장해 재시작 후에도 이어서 사용합니다.
+    """
+
+    def __init__(
+        self,
+        levels: List[str] = VOCABULARY_POOL_LEVELS,
+        low_watermark: int = VOCABULARY_POOL_LOW_WATERMARK,
+        high_watermark: int = VOCABULARY_POOL_HIGH_WATERMARK,
+        refill_count: int = VOCABULARY_POOL_REFILL_COUNT,
+        max_idle_attempts: int = VOCABULARY_POOL_MAX_IDLE_ATTEMPTS,
+        check_interval: float = VOCABULARY_POOL_CHECK_INTERVAL,
+        path: Optional[str] = VOCABULARY_POOL_PATH,
+    ):
+        self.low_watermark = low_watermark
+        self.high_watermark = high_watermark
+        self.refill_count = refill_count
+        self.max_idle_attempts = max_idle_attempts
+        self.check_interval = check_interval
+        self.path = path
+        self._items = {level: deque() for level in levels}
+        self._words = {level: set() for level in levels}  # 중복 확인용 (소문자 단어)
+        self._event: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self._dirty = False
+        self.served = 0
+        self.misses = 0
+        self.generated = 0
+        self.load()
+
+    def size(self, level: str) -> int:
+        items = self._items.get(level)
+        return len(items) if items is not None else 0
+
+    def add(self, level: str, items: List[Dict[str, Any]]) -> int:
+        """검증과 중복 제거를 거쳐 항목을 추가하고 추가된 개수를 반환합니다."""
+        pool = self._items.get(level)
+        if pool is None:
+            return 0
+        words = self._words[level]
+        added = 0
+        for item in items:
+            if len(pool) >= self.high_watermark:
+                break
+            if not is_valid_item(item):
+                continue
+            key = item["word"].strip().lower()
+            if key in words:
+                continue
+            words.add(key)
+            pool.append({
+                "word": item["word"].strip(),
+                "meaning": item["meaning"].strip(),
+                "example": item.get("example", "")
+            })
+            added += 1
+        if added:
+            self._dirty = True
+        return added
+
+    def take(self, level: str, count: int) -> Optional[List[Dict[str, Any]]]:
+        """
+        풀에서 count개를 꺼냅니다. 지원하지 않는 수준이거나 개수가 모자라면 None을 반환하며,
+        남은 개수가 하한 아래이면 다시 채우기를 요청합니다.
+        """
+        pool = self._items.get(level)
+        if pool is None:
+            return None
+        if len(pool) < count:
+            self.misses += 1
+            self.request_refill()
+            return None
+
+        taken = [pool.popleft() for _ in range(count)]
+        words = self._words[level]
+        for item in taken:
+            words.discard(item["word"].lower())
+        self.served += count
+        self._dirty = True
+        if len(pool) < self.low_watermark:
+            self.request_refill()
+        return taken
+
+    def request_refill(self):
+        """백그라운드 작업을 깨웁니다."""
+        if self._event is not None:
+            self._event.set()
+
+    async def refill_level(self, level: str):
+        """상한까지 채웁니다. 새 단어가 나오지 않는 생성이 이어지면 다음 확인 때까지 멈춥니다."""
+        from services.problemgeneration_service import generate_vocabulary
+
+        idle_attempts = 0
+        while self.size(level) < self.high_watermark and idle_attempts < self.max_idle_attempts:
+            count = min(self.refill_count, self.high_watermark - self.size(level))
+            # 같은 프롬프트의 캐시된 응답은 새 단어를 주지 않으므로 캐시를 건너뜀
+            with llm_request_context("vocabulary-pool", PRIORITY_BULK):
+                items = await generate_vocabulary(school_level=level, count=count, use_cache=False)
+            added = self.add(level, items)
+            self.generated += added
+            idle_attempts = 0 if added else idle_attempts + 1
+            print(f"단어 풀 채우기 ({level}): {added}개 추가, 현재 {self.size(level)}개")
+
+    async def run(self):
+        """하한 아래의 수준을 채우고, 요청이 오거나 check_interval이 지나면 다시 확인합니다."""
+        while not self._stopping:
+            self._event.clear()
+            for level in self._items:
+                if self.size(level) < self.low_watermark:
+                    try:
+                        await self.refill_level(level)
+                    except Exception as e:
+                        print(f"경고: 단어 풀 채우기 실패 ({level}): {str(e)}")
+            if self._dirty:
+                await self.save()
+            try:
+                await asyncio.wait_for(self._event.wait(), self.check_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self):
+        """백그라운드 채우기 작업을 시작합니다."""
+        if self._task is None:
+            self._stopping = False
+            self._event = asyncio.Event()
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        """백그라운드 작업을 멈추고 현재 내용을 저장합니다."""
+        if self._task is not None:
+            # wait_for가 취소를 삼키는 경우가 있어 종료 표시를 함께 남김
+            self._stopping = True
+            self._event.set()
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            self._event = None
+        if self._dirty:
+            await self.save()
+
+    def load(self):
+        """저장된 풀을 불러옵니다. 파일이 없거나 깨졌으면 빈 풀로 시작합니다."""
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as file:
+                data = json.load(file)
+        except (OSError, ValueError) as e:
+            print(f"경고: 단어 풀 파일을 읽지 못했습니다: {str(e)}")
+            return
+        for level, items in data.items():
+            if isinstance(items, list):
+                self.add(level, items)
+        self._dirty = False
+
+    async def save(self):
+        """현재 풀을 파일에 저장합니다."""
+        if not self.path:
+            return
+        snapshot = {level: list(items) for level, items in self._items.items()}
+        self._dirty = False
+        try:
+            await asyncio.to_thread(write_json_atomic, self.path, snapshot)
+        except OSError as e:
+            self._dirty = True
+            print(f"경고: 단어 풀을 저장하지 못했습니다: {str(e)}")
+
+    def stats(self) -> Dict[str, Any]:
+        """수준별 남은 개수와 제공/부족 횟수를 반환합니다."""
+        return {
+            "sizes": {level: len(items) for level, items in self._items.items()},
+            "low_watermark": self.low_watermark,
+            "high_watermark": self.high_watermark,
+            "served": self.served,
+            "misses": self.misses,
+            "generated": self.generated,
+        }
+
+_vocabulary_pool: Optional[VocabularyPool] = None
+
+def get_vocabulary_pool() -> Optional[VocabularyPool]:
+    """공유 단어 풀을 반환합니다. 풀이 꺼져 있으면 None입니다."""
+    global _vocabulary_pool
+    if not VOCABULARY_POOL_ENABLED:
+        return None
+    if _vocabulary_pool is None:
+        _vocabulary_pool = VocabularyPool()
+    return _vocabulary_pool
+
+def start_vocabulary_pool():
+    """공유 단어 풀의 백그라운드 채우기 작업을 시작합니다."""
+    pool = get_vocabulary_pool()
+    if pool is not None:
+        pool.start()
+
+async def close_vocabulary_pool():
+    """백그라운드 작업을 멈추고 풀을 저장합니다."""
+    global _vocabulary_pool
+    if _vocabulary_pool is not None:
+        await _vocabulary_pool.stop()
+        _vocabulary_pool = None
@@ -1,11 +1,12 @@
 import yaml
-import requests
-import json
 import random
 import re
 from typing import Tuple, List, Dict, Any
 from datetime import datetime
 
+from utils.ollama_utils import generate_with_ollama
+from utils.lexicon import CategoryLexicon, get_category_lexicon, get_lexicon_for
+
 def load_config():
     """YAML 설정 파일을 로드합니다."""
     try:
@@ -14,35 +15,6 @@ def load_config():
     except Exception as e:
         raise Exception(f"YAML 파일을 로드하는 중 오류가 발생했습니다: {e}")
 
-def generate_with_ollama(prompt: str, config: Dict) -> str:
-    """Ollama API를 사용하여 텍스트를 생성합니다."""
-    try:
-        url = "http://localhost:11434/api/generate"
-        payload = {
-            "model": config["model"]["name"],
-            "prompt": prompt,
-            "temperature": config["model"]["temperature"],
-            "top_p": config["model"]["top_p"],
-            "max_tokens": config["model"]["max_tokens"]
-        }
-        
-        response = requests.post(url, json=payload)
-        response.raise_for_status()
-        
-        full_response = ""
-        for line in response.text.strip().split('\n'):
-            if line:
-                data = json.loads(line)
-                full_response += data.get("response", "")
-                if data.get("done", False):
-                    break
-        
-        return full_response
-    except requests.exceptions.ConnectionError:
-        raise Exception("Ollama 서버에 연결할 수 없습니다.")
-    except Exception as e:
-        raise Exception(f"Ollama API 호출 중 오류 발생: {str(e)}")
-
 def generate_mock_id() -> int:
     """모의 ID를 생성합니다."""
     return random.randint(1000, 9999)
@@ -56,13 +28,22 @@ def get_difficulty_settings(school_level: str) -> Tuple[str, str]:
     }
     return settings.get(school_level, ("중간", "전체"))
 
+GENERATED_TEXT_LINE_PATTERN = re.compile(r'.*생성된 텍스트:.*\n?')
+LEADING_MARKER_PATTERN = re.compile(r'^[0-9*\-•]+\.?\s*')
+LEADING_MARKER_CHARS = frozenset("0123456789*-•")
+PARENTHESES_PATTERN = re.compile(r'\([^)]*\)')
+TRAILING_DASH_PATTERN = re.compile(r'\s*-.*$')
+ENGLISH_WORD_PATTERN = re.compile(r'[a-zA-Z]{3,}')
+# 괄호, 하이픈, 영문자가 없으면 정제할 것이 없음 (대부분의 한국어 선택지)
+NEEDS_CLEANING_PATTERN = re.compile(r'[(\-a-zA-Z]')
+
 def parse_vocabulary_options(text: str) -> List[str]:
     """생성된 텍스트에서 선택지를 파싱합니다."""
     options = []
-    cleaned_text = re.sub(r'.*생성된 텍스트:.*\n?', '', text)
+    cleaned_text = GENERATED_TEXT_LINE_PATTERN.sub('', text)
     
     if "," in cleaned_text:
-        first_line = cleaned_text.split('\n')[0].strip()
+        first_line = cleaned_text.split('\n', 1)[0].strip()
         if ":" in first_line:
             first_line = first_line.split(":", 1)[1].strip()
         
@@ -75,12 +56,17 @@ def parse_vocabulary_options(text: str) -> List[str]:
     return options
 
 def clean_option(option: str) -> str:
-    """선택지 텍스트를 정제합니다."""
+    """선택지 텍스트를 정제합니다 (앞 번호/기호, 괄호 설명, 하이픈 뒤 설명, 영어 단어 제거)."""
     opt = option.strip()
-    opt = re.sub(r'^[0-9*\-•]+\.?\s*', '', opt)
-    opt = re.sub(r'\([^)]*\)', '', opt)
-    opt = re.sub(r'\s*-.*$', '', opt)
-    opt = re.sub(r'[a-zA-Z]{3,}', '', opt)
+    if opt[:1] in LEADING_MARKER_CHARS:
+        opt = LEADING_MARKER_PATTERN.sub('', opt, count=1)
+    if not NEEDS_CLEANING_PATTERN.search(opt):
+        return opt
+    if '(' in opt:
+        opt = PARENTHESES_PATTERN.sub('', opt)
+    if '-' in opt:
+        opt = TRAILING_DASH_PATTERN.sub('', opt, count=1)
+    opt = ENGLISH_WORD_PATTERN.sub('', opt)
     return opt.strip()
 
 def is_valid_option(option: str) -> bool:
@@ -105,47 +91,27 @@ def ensure_correct_answer_first(options: List[str], correct_answer: str) -> List
     options.insert(0, correct_answer)
     
     if len(options) < 4:
-        from config import DEFAULT_OPTIONS
-        category = guess_category_from_config(correct_answer, DEFAULT_OPTIONS)
-        if category in DEFAULT_OPTIONS:
-            for opt in DEFAULT_OPTIONS[category]:
-                if opt != correct_answer and opt not in options and len(options) < 4:
-                    options.append(opt)
+        options.extend(get_category_lexicon().sample(correct_answer, 4 - len(options), exclude=options))
     
     return options[:4]
 
+def get_lexicon_for_options(default_options: Dict[str, List[str]]) -> CategoryLexicon:
+    """config의 DEFAULT_OPTIONS(공유 색인에 포함됨)이면 공유 색인을, 다른 사전이면 캐시된 그 사전의 색인을 반환합니다."""
+    from config import DEFAULT_OPTIONS
+    if default_options is DEFAULT_OPTIONS:
+        return get_category_lexicon()
+    return get_lexicon_for(default_options)
+
 def get_default_options_from_config(meaning: str, default_options: Dict[str, List[str]]) -> List[str]:
-    category = guess_category_from_config(meaning, default_options)
-    if category in default_options:
-        options = [meaning]
-        for opt in default_options[category]:
-            if opt != meaning and len(options) < 4:
-                options.append(opt)
-    else:
-        options = [meaning]
-        for cat, opts in default_options.items():
-            for opt in opts:
-                if opt != meaning and opt not in options and len(options) < 4:
-                    options.append(opt)
-    
-    return options
+    """같은 카테고리의 후보에서 오답을 골라 선택지를 만듭니다. 카테고리를 모르면 전체 단어에서 고릅니다."""
+    return [meaning] + get_lexicon_for_options(default_options).sample(meaning, 3)
 
 def guess_category_from_config(word: str, default_options: Dict[str, List[str]]) -> str:
-    for category, words in default_options.items():
-        if word in words:
-            return category
-    return list(default_options.keys())[0] if default_options else "기타"
+    """word의 카테고리를 반환합니다. 어느 카테고리에도 없으면 "기타"입니다."""
+    return get_lexicon_for_options(default_options).category(word)
 
 def generate_default_options(meaning: str) -> List[str]:
-    from config import DEFAULT_OPTIONS
-    category = guess_category(meaning)
-    if category in DEFAULT_OPTIONS:
-        options = [meaning]
-        for opt in DEFAULT_OPTIONS[category]:
-            if opt != meaning and len(options) < 4:
-                options.append(opt)
-    else:
-        options = [meaning, "포도", "바나나", "딸기"]
+    options = [meaning] + get_category_lexicon().sample(meaning, 3)
     
     while len(options) < 4:
         fallback = ["학교", "책", "펜", "노트"]
@@ -156,18 +122,7 @@ def generate_default_options(meaning: str) -> List[str]:
     return options
 
 def guess_category(word: str) -> str:
-    fruit_words = ["사과", "배", "포도", "오렌지", "바나나", "딸기", "키위"]
-    vegetable_words = ["당근", "양파", "감자", "배추", "시금치", "오이"]
-    animal_words = ["개", "고양이", "말", "소", "돼지", "토끼", "사자"]
-    
-    if word in fruit_words:
-        return "과일"
-    elif word in vegetable_words:
-        return "채소"
-    elif word in animal_words:
-        return "동물"
-    else:
-        return "기타"
+    return get_category_lexicon().category(word)
 
 def generate_default_options_with_exact_meaning(meaning: str) -> List[str]:
     meaning_clean = meaning.split('(')[0].strip()
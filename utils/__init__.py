@@ -0,0 +1,37 @@
+"""
+공용 유틸리티 패키지입니다.
+
+저장소 루트의 utils.py(선택지/의미 정제, 기본 선택지 등 도우미 함수)는 이 패키지와 이름이 같아
+`import utils`로는 가려져 불러올 수 없습니다. 그래서 처음 필요할 때 파일 경로로 불러와
+그 이름들을 이 패키지에서 그대로 내보냅니다. 저장소 루트에서 실행할 때와 Gpt 패키지로 실행할 때 모두
+`from utils import clean_meaning`(또는 `from Gpt.utils import clean_meaning`)처럼 사용할 수 있습니다.
+"""
+import os
+import sys
+import importlib.util
+
+_HELPERS_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "utils.py")
+_HELPERS_NAME = f"{__name__}._helpers"
+
+def _load_helpers():
+    """utils.py를 한 번만 불러와 반환합니다."""
+    helpers = sys.modules.get(_HELPERS_NAME)
+    if helpers is None:
+        spec = importlib.util.spec_from_file_location(_HELPERS_NAME, _HELPERS_PATH)
+        helpers = importlib.util.module_from_spec(spec)
+        sys.modules[_HELPERS_NAME] = helpers
+        try:
+            spec.loader.exec_module(helpers)
+        except BaseException:
+            del sys.modules[_HELPERS_NAME]
+            raise
+    return helpers
+
+def __getattr__(name):
+    # 하위 모듈이나 특수 속성이 아니면 utils.py의 같은 이름을 찾음
+    if name.startswith("__"):
+        raise AttributeError(name)
+    try:
+        return getattr(_load_helpers(), name)
+    except AttributeError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
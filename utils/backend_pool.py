@@ -0,0 +1,206 @@
+import time
+import random
+import asyncio
+from collections import deque
+from typing import Dict, Any, List, Optional, Tuple
+
+import httpx
+
+from config import (
+    OLLAMA_BACKENDS,
+    OLLAMA_POOL_SIZE,
+    OLLAMA_KEEPALIVE_CONNECTIONS,
+    OLLAMA_CONNECT_TIMEOUT,
+    OLLAMA_READ_TIMEOUT,
+    OLLAMA_POOL_TIMEOUT,
+    OLLAMA_HEALTH_INTERVAL,
+    OLLAMA_HEALTH_TIMEOUT,
+    OLLAMA_EJECT_AFTER_FAILURES,
+    OLLAMA_EJECT_DURATION,
+    OLLAMA_HEDGE_ENABLED,
+    OLLAMA_HEDGE_PERCENTILE,
+    OLLAMA_HEDGE_MIN_SAMPLES,
+)
+
+class Backend:
+    """Ollama 서버 하나와 그 서버 전용 커넥션 풀, 상태 정보입니다."""
+
+    def __init__(self, url: str, limits: httpx.Limits, timeout: httpx.Timeout):
+        self.url = url.rstrip("/")
+        self._limits = limits
+        self._timeout = timeout
+        self._client: Optional[httpx.AsyncClient] = None
+        self.outstanding = 0  # 처리 중인 요청 수
+        self.healthy = True  # 마지막 상태 확인 결과
+        self.consecutive_failures = 0
+        self.ejected_until = 0.0
+        self.requests = 0
+        self.failures = 0
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """커넥션 풀을 처음 사용할 때 생성합니다."""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                base_url=self.url,
+                limits=self._limits,
+                timeout=self._timeout
+            )
+        return self._client
+
+    @property
+    def available(self) -> bool:
+        return self.healthy and self.ejected_until <= time.monotonic()
+
+    async def aclose(self):
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "url": self.url,
+            "available": self.available,
+            "healthy": self.healthy,
+            "ejected": self.ejected_until > time.monotonic(),
+            "outstanding": self.outstanding,
+            "requests": self.requests,
+            "failures": self.failures,
+        }
+
+class BackendPool:
+    """
+    여러 Ollama 서버에 요청을 나눠 보내는 서버 목록입니다.
+
+    처리 중인 요청이 가장 적은 서버를 고르고, 연속으로 실패한 서버는 일정 시간 제외합니다.
+    주기적인 상태 확인(/api/tags)에 응답하지 않는 서버에는 요청을 보내지 않습니다.
+    """
+
+    def __init__(
+        self,
+        urls: List[str] = OLLAMA_BACKENDS,
+        pool_size: int = OLLAMA_POOL_SIZE,
+        keepalive_connections: int = OLLAMA_KEEPALIVE_CONNECTIONS,
+        connect_timeout: float = OLLAMA_CONNECT_TIMEOUT,
+        read_timeout: float = OLLAMA_READ_TIMEOUT,
+        pool_timeout: float = OLLAMA_POOL_TIMEOUT,
+        health_interval: float = OLLAMA_HEALTH_INTERVAL,
+        health_timeout: float = OLLAMA_HEALTH_TIMEOUT,
+        eject_after_failures: int = OLLAMA_EJECT_AFTER_FAILURES,
+        eject_duration: float = OLLAMA_EJECT_DURATION,
+        hedge_enabled: bool = OLLAMA_HEDGE_ENABLED,
+        hedge_percentile: float = OLLAMA_HEDGE_PERCENTILE,
+        hedge_min_samples: int = OLLAMA_HEDGE_MIN_SAMPLES,
+    ):
+        if not urls:
+            raise ValueError("Ollama 서버 목록이 비어 있습니다.")
+        limits = httpx.Limits(max_connections=pool_size, max_keepalive_connections=keepalive_connections)
+        timeout = httpx.Timeout(read_timeout, connect=connect_timeout, pool=pool_timeout)
+        self.backends = [Backend(url, limits, timeout) for url in urls]
+        self.health_interval = health_interval
+        self.health_timeout = health_timeout
+        self.eject_after_failures = eject_after_failures
+        self.eject_duration = eject_duration
+        self.hedge_enabled = hedge_enabled
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        # (모델, 명령어) -> 최근 성공한 요청의 지연(초)
+        # 명령어마다 출력 길이가 크게 달라 하나로 모으면 긴 생성이 짧은 생성 기준으로 거의 항상 헤징됨
+        self._latencies: Dict[Tuple[str, str], deque] = {}
+        self._health_task: Optional[asyncio.Task] = None
+        self.hedged = 0
+        self.hedge_wins = 0
+
+    def pick(self, exclude=()) -> Optional[Backend]:
+        """
+        처리 중인 요청이 가장 적은 서버를 고릅니다 (같으면 무작위).
+        사용 가능한 서버가 없으면 제외 목록 밖의 서버 중에서 고르고, 그것도 없으면 None입니다.
+        """
+        candidates = [backend for backend in self.backends if backend not in exclude]
+        available = [backend for backend in candidates if backend.available]
+        # 모든 서버가 제외된 상태라면 요청을 막기보다 그중 하나라도 시도
+        candidates = available or candidates
+        if not candidates:
+            return None
+        lowest = min(backend.outstanding for backend in candidates)
+        return random.choice([backend for backend in candidates if backend.outstanding == lowest])
+
+    def record_success(self, backend: Backend, elapsed: float, key: Tuple[str, str] = ("", "")):
+        """성공한 요청을 기록합니다. key는 헤징 기준 지연을 따로 모을 (모델, 명령어)입니다."""
+        backend.consecutive_failures = 0
+        backend.ejected_until = 0.0
+        latencies = self._latencies.get(key)
+        if latencies is None:
+            latencies = self._latencies[key] = deque(maxlen=200)
+        latencies.append(elapsed)
+
+    def record_failure(self, backend: Backend):
+        backend.failures += 1
+        backend.consecutive_failures += 1
+        if backend.consecutive_failures >= self.eject_after_failures:
+            if backend.ejected_until <= time.monotonic():
+                print(f"경고: Ollama 서버를 {self.eject_duration}초 동안 제외합니다: {backend.url}")
+            backend.ejected_until = time.monotonic() + self.eject_duration
+
+    def hedge_delay(self, key: Tuple[str, str] = ("", "")) -> Optional[float]:
+        """
+        (모델, 명령어) key의 요청을 두 번째 서버로 보내기 전까지 기다릴 시간입니다.
+        그 key의 지연 표본이 hedge_min_samples보다 적거나 헤징하지 않으면 None입니다.
+        """
+        latencies = self._latencies.get(key)
+        if not self.hedge_enabled or len(self.backends) < 2 or latencies is None or len(latencies) < self.hedge_min_samples:
+            return None
+        ordered = sorted(latencies)
+        index = min(len(ordered) - 1, int(len(ordered) * self.hedge_percentile / 100))
+        return ordered[index]
+
+    async def probe(self, backend: Backend):
+        """
+        서버 상태를 확인합니다.
+        연속 실패로 제외된 서버는 상태 확인에 응답해도 제외 시간이 끝날 때까지 제외합니다.
+        """
+        try:
+            response = await backend.client.get("/api/tags", timeout=self.health_timeout)
+            healthy = response.status_code == 200
+        except httpx.HTTPError:
+            healthy = False
+        if healthy and not backend.healthy:
+            print(f"Ollama 서버가 다시 응답합니다: {backend.url}")
+        elif not healthy and backend.healthy:
+            print(f"경고: Ollama 서버 상태 확인 실패: {backend.url}")
+        backend.healthy = healthy
+
+    async def probe_all(self):
+        await asyncio.gather(*(self.probe(backend) for backend in self.backends))
+
+    async def _health_loop(self):
+        while True:
+            await self.probe_all()
+            await asyncio.sleep(self.health_interval)
+
+    def start_health_checks(self):
+        """주기적인 상태 확인을 시작합니다. 서버가 하나뿐이면 확인하지 않습니다."""
+        if self._health_task is None and len(self.backends) > 1:
+            self._health_task = asyncio.create_task(self._health_loop())
+
+    async def aclose(self):
+        """상태 확인을 멈추고 모든 커넥션 풀을 닫습니다."""
+        if self._health_task is not None:
+            self._health_task.cancel()
+            try:
+                await self._health_task
+            except asyncio.CancelledError:
+                pass
+            self._health_task = None
+        for backend in self.backends:
+            await backend.aclose()
+
+    def stats(self) -> Dict[str, Any]:
+        """서버별 상태와 헤징 횟수를 반환합니다."""
+        return {
+            "backends": [backend.stats() for backend in self.backends],
+            "hedge_delay": {f"{model}/{command}": self.hedge_delay((model, command))
+                            for model, command in list(self._latencies)},
+            "hedged": self.hedged,
+            "hedge_wins": self.hedge_wins,
+        }
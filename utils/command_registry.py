@@ -0,0 +1,277 @@
+import os
+import time
+import string
+import threading
+from typing import Dict, Any, List, Optional
+
+import yaml
+
+from config import COMMANDS_PATH, COMMANDS_RELOAD_INTERVAL, STRUCTURED_OUTPUT_ENABLED
+from utils.metrics import STAGE_DURATION
+
+PARAMETER_TYPES = {
+    "integer": int,
+    "string": str,
+}
+
+MODEL_KEYS = ("name", "temperature", "top_p", "max_tokens")
+
+_formatter = string.Formatter()
+
+class CommandConfigError(ValueError):
+    """EnglishCommand.yaml 내용이 올바르지 않음을 나타냅니다."""
+
+class Command:
+    """검증과 템플릿 분석을 마친 명령어 하나입니다."""
+
+    def __init__(self, spec: Dict[str, Any], model: Dict[str, Any]):
+        self.name = spec.get("name")
+        if not self.name or not isinstance(self.name, str):
+            raise CommandConfigError("name이 없는 명령어가 있습니다.")
+
+        template = spec.get("prompt_template")
+        if not isinstance(template, str) or not template:
+            raise CommandConfigError(f"{self.name}: prompt_template이 없습니다.")
+
+        self.description = spec.get("description", "")
+        self.spec = spec
+        self.parameters = {}
+        self.defaults = {}
+        self.required = []
+        for param in spec.get("parameters") or []:
+            self._add_parameter(param)
+
+        # 명령어별 모델 설정이 있으면 전역 설정을 덮어씀
+        overrides = spec.get("model") or {}
+        unknown = set(overrides) - set(MODEL_KEYS)
+        if unknown:
+            raise CommandConfigError(f"{self.name}: 알 수 없는 모델 설정 {sorted(unknown)}")
+        self.model = {**model, **overrides}
+
+        # 응답 캐시 사용 여부 (명령어별 선택)
+        self.cache_enabled = spec.get("cache", False)
+        if not isinstance(self.cache_enabled, bool):
+            raise CommandConfigError(f"{self.name}: cache는 true 또는 false여야 합니다.")
+        self.cache_ttl = spec.get("cache_ttl")
+        if self.cache_ttl is not None and (
+            isinstance(self.cache_ttl, bool) or not isinstance(self.cache_ttl, (int, float)) or self.cache_ttl <= 0
+        ):
+            raise CommandConfigError(f"{self.name}: cache_ttl은 양수(초)여야 합니다.")
+
+        # 구조화 출력: Ollama format에 넘길 "json" 또는 JSON 스키마, 그리고 프롬프트 끝에 붙일 안내문
+        self.output_format = spec.get("format")
+        if self.output_format is not None and self.output_format != "json" and not isinstance(self.output_format, dict):
+            raise CommandConfigError(f"{self.name}: format은 \"json\" 또는 JSON 스키마(매핑)여야 합니다.")
+        self.format_instructions = spec.get("format_instructions") or ""
+        if not isinstance(self.format_instructions, str):
+            raise CommandConfigError(f"{self.name}: format_instructions는 문자열이어야 합니다.")
+
+        self.template = template
+        self._segments = self._compile(template)
+        self.fields = {field for _, field, _, _ in self._segments if field is not None}
+
+    def _add_parameter(self, param: Dict[str, Any]):
+        name = param.get("name")
+        if not name:
+            raise CommandConfigError(f"{self.name}: name이 없는 매개변수가 있습니다.")
+        param_type = param.get("type", "string")
+        if param_type not in PARAMETER_TYPES:
+            raise CommandConfigError(f"{self.name}.{name}: 지원하지 않는 타입 '{param_type}'")
+        if "default" in param:
+            self._check_value(param, param["default"])
+            self.defaults[name] = param["default"]
+        elif param.get("required", False):
+            self.required.append(name)
+        self.parameters[name] = param
+
+    def _check_value(self, param: Dict[str, Any], value: Any):
+        name = param["name"]
+        expected = PARAMETER_TYPES[param.get("type", "string")]
+        if not isinstance(value, expected) or isinstance(value, bool):
+            raise CommandConfigError(f"{self.name}.{name}: {param.get('type')} 타입이 아닌 값 {value!r}")
+        if "choices" in param and value not in param["choices"]:
+            raise CommandConfigError(f"{self.name}.{name}: {value!r}은(는) {param['choices']} 중 하나가 아닙니다.")
+        if "min" in param and value < param["min"]:
+            raise CommandConfigError(f"{self.name}.{name}: {value!r}은(는) 최솟값 {param['min']}보다 작습니다.")
+        if "max" in param and value > param["max"]:
+            raise CommandConfigError(f"{self.name}.{name}: {value!r}은(는) 최댓값 {param['max']}보다 큽니다.")
+
+    def _compile(self, template: str) -> List[tuple]:
+        """템플릿을 미리 (문자열, 필드, 포맷, 변환) 조각으로 나눠 둡니다."""
+        try:
+            segments = list(_formatter.parse(template))
+        except ValueError as e:
+            raise CommandConfigError(f"{self.name}: prompt_template 형식 오류: {e}") from e
+        for _, field, _, _ in segments:
+            if field is not None and not field.isidentifier():
+                raise CommandConfigError(f"{self.name}: prompt_template의 '{{{field}}}'는 이름 있는 필드여야 합니다.")
+        return segments
+
+    @property
+    def structured(self) -> bool:
+        """이 명령어가 구조화(JSON) 출력을 요청하는지 여부입니다."""
+        return self.output_format is not None and STRUCTURED_OUTPUT_ENABLED
+
+    def render(self, **params) -> str:
+        """기본값과 전달된 값을 합쳐 프롬프트를 만듭니다. 구조화 출력이면 format_instructions를 덧붙입니다."""
+        with STAGE_DURATION.time(stage="prompt_render"):
+            prompt = self._render(params)
+        if self.structured and self.format_instructions:
+            prompt = prompt.rstrip("\n") + "\n\n" + self.format_instructions
+        return prompt
+
+    def validate(self, **params):
+        """전달된 값이 매개변수의 타입, choices, min/max를 벗어나면 ValueError를 발생시킵니다. None은 기본값을 뜻하므로 건너뜁니다."""
+        for name, value in params.items():
+            param = self.parameters.get(name)
+            if param is not None and value is not None:
+                try:
+                    self._check_value(param, value)
+                except CommandConfigError as e:
+                    raise ValueError(str(e)) from e
+
+    def _render(self, params: Dict[str, Any]) -> str:
+        values = dict(self.defaults)
+        values.update((name, value) for name, value in params.items() if value is not None)
+        missing = [field for field in self.fields if field not in values]
+        if missing:
+            raise ValueError(f"{self.name}: 필수 매개변수가 없습니다: {', '.join(sorted(missing))}")
+        self.validate(**params)
+
+        parts = []
+        for literal, field, format_spec, conversion in self._segments:
+            parts.append(literal)
+            if field is not None:
+                value = values[field]
+                if conversion:
+                    value = _formatter.convert_field(value, conversion)
+                parts.append(format(value, format_spec) if format_spec else str(value))
+        return "".join(parts)
+
+    def model_settings(self) -> Dict[str, Any]:
+        """Ollama 클라이언트에 넘길 모델 설정을 반환합니다."""
+        settings = {
+            "model": self.model["name"],
+            "temperature": self.model["temperature"],
+            "top_p": self.model["top_p"],
+            "max_tokens": self.model["max_tokens"]
+        }
+        if self.structured:
+            settings["output_format"] = self.output_format
+        return settings
+
+def compile_commands(config: Any) -> Dict[str, Command]:
+    """YAML 내용을 검증하고 이름으로 색인된 명령어 사전을 만듭니다."""
+    if not isinstance(config, dict):
+        raise CommandConfigError("최상위 구조가 매핑이 아닙니다.")
+
+    model = config.get("model")
+    if not isinstance(model, dict):
+        raise CommandConfigError("model 설정이 없습니다.")
+    missing = [key for key in MODEL_KEYS if key not in model]
+    if missing:
+        raise CommandConfigError(f"model 설정에 {missing} 항목이 없습니다.")
+
+    commands = {}
+    for spec in config.get("commands") or []:
+        command = Command(spec, model)
+        if command.name in commands:
+            raise CommandConfigError(f"명령어 이름이 중복되었습니다: {command.name}")
+        commands[command.name] = command
+    return commands
+
+def find_commands_path() -> Optional[str]:
+    """EnglishCommand.yaml 위치를 찾습니다."""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    possible_paths = [
+        COMMANDS_PATH,  # 현재 디렉토리 기준
+        os.path.join(root, "services", COMMANDS_PATH),  # services 디렉토리
+        os.path.join(root, COMMANDS_PATH)  # 프로젝트 루트
+    ]
+    for path in possible_paths:
+        if os.path.exists(path):
+            return os.path.abspath(path)
+    return None
+
+class CommandRegistry:
+    """
+    EnglishCommand.yaml을 한 번 로드해 명령어를 이름으로 색인해 두는 저장소입니다.
+
+    파일 수정 시각(mtime)이 바뀌었을 때만 다시 로드하며, 다시 로드한 파일이 올바르지 않으면
+    오류를 출력하고 이전 설정을 계속 사용합니다.
+    """
+
+    def __init__(self, path: str, reload_interval: float = COMMANDS_RELOAD_INTERVAL):
+        self.path = path
+        self.reload_interval = reload_interval
+        self.config: Dict[str, Any] = {}
+        self._commands: Dict[str, Command] = {}
+        self._mtime: Optional[float] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        """파일을 읽어 검증한 뒤 한 번에 교체합니다. 실패하면 CommandConfigError를 발생시킵니다."""
+        mtime = os.stat(self.path).st_mtime
+        with STAGE_DURATION.time(stage="config_load"):
+            try:
+                with open(self.path, "r", encoding="utf-8") as file:
+                    config = yaml.safe_load(file)
+            except yaml.YAMLError as e:
+                raise CommandConfigError(f"YAML 파싱 오류: {e}") from e
+            commands = compile_commands(config)
+
+        self.config = config
+        self._commands = commands
+        self._mtime = mtime
+        self._checked_at = time.monotonic()
+
+    def refresh(self):
+        """마지막 확인 후 reload_interval이 지났고 파일이 바뀌었으면 다시 로드합니다."""
+        now = time.monotonic()
+        if now - self._checked_at < self.reload_interval:
+            return
+        with self._lock:
+            if now - self._checked_at < self.reload_interval:
+                return
+            self._checked_at = now
+            try:
+                mtime = os.stat(self.path).st_mtime
+            except OSError as e:
+                print(f"경고: 명령어 설정 파일을 확인할 수 없습니다. 이전 설정을 유지합니다: {e}")
+                return
+            if mtime == self._mtime:
+                return
+            try:
+                self.load()
+                print(f"명령어 설정을 다시 로드했습니다: {self.path}")
+            except (OSError, CommandConfigError) as e:
+                # 같은 잘못된 파일을 반복해서 읽지 않도록 수정 시각은 기록해 둠
+                self._mtime = mtime
+                print(f"경고: 명령어 설정을 다시 로드하지 못했습니다. 이전 설정을 유지합니다: {e}")
+
+    def get(self, name: str) -> Command:
+        """이름으로 명령어를 찾습니다."""
+        self.refresh()
+        command = self._commands.get(name)
+        if command is None:
+            raise ValueError(f"{name} 명령어를 찾을 수 없습니다.")
+        return command
+
+    def commands(self) -> List[Command]:
+        """등록된 모든 명령어를 반환합니다."""
+        self.refresh()
+        return list(self._commands.values())
+
+_registry: Optional[CommandRegistry] = None
+
+def get_command_registry() -> CommandRegistry:
+    """공유 명령어 저장소를 반환합니다. 처음 호출할 때 파일을 로드합니다."""
+    global _registry
+    if _registry is None:
+        path = find_commands_path()
+        if path is None:
+            raise CommandConfigError(f"{COMMANDS_PATH} 파일을 찾을 수 없습니다.")
+        _registry = CommandRegistry(path)
+    return _registry
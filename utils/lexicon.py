@@ -0,0 +1,140 @@
+import re
+import random
+import unicodedata
+from typing import Dict, Any, List, Iterable, Optional
+
+import yaml
+
+from config import LEXICON_PATH, DEFAULT_OPTIONS
+
+UNKNOWN_CATEGORY = "기타"
+
+PARENTHESES_PATTERN = re.compile(r"\([^)]*\)")
+# 단어가 수천 개이므로 libyaml이 있으면 C 로더로 읽음
+YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+def normalize_meaning(meaning: str) -> str:
+    """비교용으로 괄호 설명과 공백을 없앤 의미를 반환합니다."""
+    text = PARENTHESES_PATTERN.sub("", unicodedata.normalize("NFC", meaning))
+    return "".join(text.split())
+
+class CategoryLexicon:
+    """
+    단어 -> 카테고리 해시 색인과 카테고리별 후보 단어 목록입니다.
+
+    조회는 정규화한 단어로 사전을 한 번 찾는 것으로 끝나며, 목록에 없는 단어는
+    UNKNOWN_CATEGORY입니다. 한 단어가 여러 카테고리에 있으면 먼저 나온 카테고리가 대표입니다.
+    """
+
+    def __init__(self, categories: Optional[Dict[str, Iterable[str]]] = None):
+        self.categories: Dict[str, List[str]] = {}
+        self.words: List[str] = []  # 모든 카테고리의 단어 (중복 없음)
+        self._index: Dict[str, List[str]] = {}  # 정규화한 단어 -> 속한 카테고리 목록
+        for category, words in (categories or {}).items():
+            self.add(category, words)
+
+    def add(self, category: str, words: Iterable[str]):
+        """category에 단어를 추가합니다. 이미 그 카테고리에 있는 단어는 건너뜁니다."""
+        members = self.categories.setdefault(category, [])
+        for word in words or []:
+            word = str(word).strip()
+            key = normalize_meaning(word)
+            if not key:
+                continue
+            categories = self._index.setdefault(key, [])
+            if category in categories:
+                continue
+            if not categories:
+                self.words.append(word)
+            categories.append(category)
+            members.append(word)
+
+    @classmethod
+    def load(cls, path: str = LEXICON_PATH, extra: Optional[Dict[str, List[str]]] = DEFAULT_OPTIONS) -> "CategoryLexicon":
+        """YAML 단어 목록(categories: {카테고리: [단어, ...]})을 읽고 extra의 단어를 보탭니다."""
+        with open(path, "r", encoding="utf-8") as file:
+            data = yaml.load(file, Loader=YAML_LOADER) or {}
+        categories = data.get("categories") if isinstance(data, dict) else None
+        if not isinstance(categories, dict):
+            raise ValueError(f"{path}: categories 항목이 없습니다.")
+        lexicon = cls(categories)
+        for category, words in (extra or {}).items():
+            lexicon.add(category, words)
+        return lexicon
+
+    def __contains__(self, word: str) -> bool:
+        return normalize_meaning(word) in self._index
+
+    def category(self, word: str) -> str:
+        """word의 대표 카테고리를 반환합니다. 목록에 없으면 UNKNOWN_CATEGORY입니다."""
+        categories = self._index.get(normalize_meaning(word))
+        return categories[0] if categories else UNKNOWN_CATEGORY
+
+    def categories_of(self, word: str) -> List[str]:
+        """word가 속한 모든 카테고리를 반환합니다."""
+        return list(self._index.get(normalize_meaning(word), ()))
+
+    def candidates(self, category: str) -> List[str]:
+        """category의 후보 단어 목록을 반환합니다."""
+        return self.categories.get(category, [])
+
+    def sample(self, meaning: str, count: int = 3, exclude: Iterable[str] = ()) -> List[str]:
+        """
+        meaning과 같은 카테고리에서 무작위로 count개의 오답을 고릅니다.
+        카테고리를 모르거나 후보가 모자라면 전체 단어에서 채웁니다.
+        """
+        excluded = {normalize_meaning(meaning)}
+        excluded.update(normalize_meaning(word) for word in exclude)
+        picked = []
+        for pool in (self.candidates(self.category(meaning)), self.words):
+            # 후보가 많을 수 있으므로 전체를 섞지 않고 제외될 몫까지 더해 필요한 만큼만 뽑음
+            for word in random.sample(pool, min(len(pool), count + len(excluded))):
+                key = normalize_meaning(word)
+                if key in excluded:
+                    continue
+                excluded.add(key)
+                picked.append(word)
+                if len(picked) == count:
+                    return picked
+        return picked
+
+    def stats(self) -> Dict[str, Any]:
+        """카테고리 수와 단어 수를 반환합니다."""
+        return {
+            "categories": len(self.categories),
+            "words": len(self.words),
+        }
+
+_category_lexicon: Optional[CategoryLexicon] = None
+
+def get_category_lexicon() -> CategoryLexicon:
+    """
+    공유 카테고리 색인을 반환합니다. 처음 호출할 때 LEXICON_PATH와 DEFAULT_OPTIONS로 만들며,
+    파일을 읽지 못하면 DEFAULT_OPTIONS만으로 만듭니다.
+    """
+    global _category_lexicon
+    if _category_lexicon is None:
+        try:
+            _category_lexicon = CategoryLexicon.load()
+        except (OSError, ValueError, yaml.YAMLError) as e:
+            print(f"경고: 카테고리 단어 목록을 불러오지 못해 DEFAULT_OPTIONS만 사용합니다: {str(e)}")
+            _category_lexicon = CategoryLexicon(DEFAULT_OPTIONS)
+    return _category_lexicon
+
+# 사용자 지정 카테고리 사전의 내용 -> 색인 (호출마다 다시 만들지 않도록)
+_custom_lexicons: Dict[tuple, CategoryLexicon] = {}
+CUSTOM_LEXICON_CACHE_SIZE = 32
+
+def get_lexicon_for(categories: Dict[str, Iterable[str]]) -> CategoryLexicon:
+    """
+    사용자 지정 카테고리 사전의 색인을 반환합니다. 내용이 같은 사전은 한 번 만든 색인을 다시 씁니다.
+    내용으로 찾으므로 호출한 쪽이 사전을 바꾸면 새 색인을 만듭니다.
+    """
+    key = tuple((category, tuple(words or ())) for category, words in categories.items())
+    lexicon = _custom_lexicons.get(key)
+    if lexicon is None:
+        if len(_custom_lexicons) >= CUSTOM_LEXICON_CACHE_SIZE:
+            # 가장 먼저 만든 색인부터 버림
+            del _custom_lexicons[next(iter(_custom_lexicons))]
+        lexicon = _custom_lexicons[key] = CategoryLexicon(categories)
+    return lexicon
@@ -0,0 +1,256 @@
+import math
+import time
+import asyncio
+import contextvars
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import Dict, Any, Hashable, Optional
+
+from config import (
+    LLM_SCHEDULER_ENABLED,
+    LLM_INITIAL_CONCURRENCY,
+    LLM_MIN_CONCURRENCY,
+    LLM_MAX_CONCURRENCY,
+    LLM_MAX_QUEUE_DEPTH,
+    LLM_LATENCY_TOLERANCE,
+    LLM_PRIORITY_WEIGHTS,
+)
+from utils.metrics import LLM_QUEUE_WAIT
+
+PRIORITY_INTERACTIVE = "interactive"
+PRIORITY_BULK = "bulk"
+
+# 현재 요청의 (userId, 우선순위) - 라우트에서 설정하고 Ollama 호출 시 읽음
+_request_context = contextvars.ContextVar("llm_request_context", default=(None, PRIORITY_INTERACTIVE))
+
+@contextmanager
+def llm_request_context(user_id: Optional[str] = None, priority: str = PRIORITY_INTERACTIVE):
+    """이 블록 안의 LLM 호출이 어느 사용자, 어떤 우선순위의 요청인지 지정합니다."""
+    token = _request_context.set((user_id, priority))
+    try:
+        yield
+    finally:
+        _request_context.reset(token)
+
+class LLMOverloadedError(RuntimeError):
+    """대기열이 가득 차 LLM 호출을 받을 수 없음을 나타냅니다. retry_after는 권장 대기 시간(초)입니다."""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+class LLMScheduler:
+    """
+    Ollama 앞에서 동시 실행 수를 제한하는 대기열입니다.
+
+    우선순위별 가중치(LLM_PRIORITY_WEIGHTS)에 따라 차례를 나누고, 같은 우선순위 안에서는
+    userId별로 돌아가며 꺼내 한 사용자가 대기열을 독점하지 못하게 합니다.
+    동시 실행 수는 지연 시간을 보고 조절합니다. 지연은 (모델, 명령어)별로 따로 추적해 각 호출을 자기 기준과 비교하며,
+    지연이 기준의 LLM_LATENCY_TOLERANCE배를 넘거나 호출이 실패하면 줄이고, 제한까지 꽉 찬 상태에서 지연이 괜찮으면 하나씩 늘립니다.
+    대기열이 max_queue_depth를 넘으면 기다리지 않고 LLMOverloadedError를 발생시킵니다.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int = LLM_INITIAL_CONCURRENCY,
+        min_limit: int = LLM_MIN_CONCURRENCY,
+        max_limit: int = LLM_MAX_CONCURRENCY,
+        max_queue_depth: int = LLM_MAX_QUEUE_DEPTH,
+        latency_tolerance: float = LLM_LATENCY_TOLERANCE,
+        priority_weights: Dict[str, int] = LLM_PRIORITY_WEIGHTS,
+    ):
+        self.limit = initial_limit
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.max_queue_depth = max_queue_depth
+        self.latency_tolerance = latency_tolerance
+        # 우선순위 -> (userId -> 대기 중인 Future 목록)
+        self._queues = {priority: OrderedDict() for priority in priority_weights}
+        # 가중치만큼 차례를 반복한 순서 (예: interactive 4번, bulk 1번)
+        self._turns = [priority for priority, weight in priority_weights.items() for _ in range(weight)]
+        self._turn = 0
+        self.in_flight = 0
+        self.queued = 0
+        # (모델, 명령어) -> [지연 지수 이동 평균, 천천히 올라가는 최솟값 기준]
+        self._latencies: Dict[Hashable, list] = {}
+        self._window_count = 0
+        self._window_failed = False
+        self._window_slow = False
+        self._window_saturated = False
+        self.admitted = 0
+        self.rejected = 0
+
+    @asynccontextmanager
+    async def slot(self, key: Hashable = None):
+        """
+        실행 차례를 받을 때까지 기다렸다가, 블록이 끝나면 차례를 반납합니다.
+        key는 지연을 따로 추적할 단위이며 보통 (모델, 명령어)입니다.
+        """
+        user_id, priority = _request_context.get()
+        started = time.monotonic()
+        await self._acquire(user_id or "", priority)
+        LLM_QUEUE_WAIT.observe(time.monotonic() - started, priority=priority)
+        started = time.monotonic()
+        try:
+            yield
+        except (asyncio.CancelledError, GeneratorExit):
+            # 클라이언트가 끊었거나 스트림을 일찍 닫은 경우는 지연/실패 판단에 반영하지 않음
+            self._release()
+            raise
+        except BaseException:
+            self._release(key, time.monotonic() - started, False)
+            raise
+        else:
+            self._release(key, time.monotonic() - started, True)
+
+    async def _acquire(self, user_id: str, priority: str):
+        if priority not in self._queues:
+            priority = PRIORITY_INTERACTIVE
+        if self.in_flight < self.limit and self.queued == 0:
+            self.in_flight += 1
+            self.admitted += 1
+            return
+
+        self._window_saturated = True
+        if self.queued >= self.max_queue_depth:
+            self.rejected += 1
+            retry_after = self.retry_after()
+            raise LLMOverloadedError(
+                f"LLM 요청 대기열이 가득 찼습니다. {retry_after}초 후 다시 시도해주세요.", retry_after
+            )
+
+        future = asyncio.get_running_loop().create_future()
+        users = self._queues[priority]
+        users.setdefault(user_id, deque()).append(future)
+        self.queued += 1
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.cancelled():
+                self._remove_waiter(priority, user_id, future)
+            else:
+                # 차례를 받은 직후 취소된 경우 받은 차례를 돌려줌
+                self._release()
+            raise
+        self.admitted += 1
+
+    def _remove_waiter(self, priority: str, user_id: str, future: asyncio.Future):
+        users = self._queues[priority]
+        waiters = users.get(user_id)
+        if waiters is not None and future in waiters:
+            waiters.remove(future)
+            self.queued -= 1
+            if not waiters:
+                del users[user_id]
+
+    def _next_waiter(self) -> Optional[asyncio.Future]:
+        """가중치 차례에 따라 우선순위를 고르고, 그 안에서 다음 사용자의 요청을 꺼냅니다."""
+        for offset in range(len(self._turns)):
+            priority = self._turns[(self._turn + offset) % len(self._turns)]
+            users = self._queues[priority]
+            if not users:
+                continue
+            self._turn = (self._turn + offset + 1) % len(self._turns)
+            user_id, waiters = users.popitem(last=False)
+            future = waiters.popleft()
+            if waiters:
+                # 남은 요청이 있는 사용자는 맨 뒤로 보내 차례를 돌림
+                users[user_id] = waiters
+            return future
+        return None
+
+    def _release(self, key: Hashable = None, elapsed: Optional[float] = None, succeeded: bool = True):
+        self.in_flight -= 1
+        if elapsed is not None:
+            self._record(key, elapsed, succeeded)
+        self._dispatch()
+
+    def _dispatch(self):
+        while self.in_flight < self.limit and self.queued:
+            future = self._next_waiter()
+            if future is None:
+                break
+            self.queued -= 1
+            if future.done():
+                continue
+            self.in_flight += 1
+            future.set_result(None)
+
+    def _record(self, key: Hashable, elapsed: float, succeeded: bool):
+        """완료된 호출의 지연을 그 key의 기준과 비교해 반영하고, limit개가 끝날 때마다 동시 실행 수를 조절합니다."""
+        if succeeded:
+            state = self._latencies.get(key)
+            if state is None:
+                state = self._latencies[key] = [elapsed, elapsed]
+            else:
+                state[0] = 0.8 * state[0] + 0.2 * elapsed
+                # 기준은 관측된 최소 지연이며, 모델/부하 변화에 맞춰 천천히 올라감
+                if state[0] < state[1]:
+                    state[1] = state[0]
+                else:
+                    state[1] *= 1.001
+            # 명령어마다 걸리는 시간이 달라 섞인 트래픽이 느려 보이지 않도록 자기 기준과만 비교
+            if state[0] > state[1] * self.latency_tolerance:
+                self._window_slow = True
+        else:
+            self._window_failed = True
+        if self.queued:
+            self._window_saturated = True
+
+        self._window_count += 1
+        if self._window_count < self.limit:
+            return
+
+        if self._window_failed or self._window_slow:
+            self.limit = max(self.min_limit, int(self.limit * 0.8))
+        elif self._window_saturated:
+            self.limit = min(self.max_limit, self.limit + 1)
+        self._window_count = 0
+        self._window_failed = False
+        self._window_slow = False
+        self._window_saturated = False
+
+    @property
+    def latency(self) -> Optional[float]:
+        """추적 중인 모든 key의 평균 지연(초)을 반환합니다. 아직 완료된 호출이 없으면 None입니다."""
+        if not self._latencies:
+            return None
+        return sum(state[0] for state in self._latencies.values()) / len(self._latencies)
+
+    def retry_after(self) -> int:
+        """현재 대기열이 빠지는 데 걸릴 예상 시간(초)을 반환합니다."""
+        latency = self.latency if self.latency is not None else 1.0
+        return max(1, min(120, math.ceil((self.queued + 1) / max(self.limit, 1) * latency)))
+
+    def stats(self) -> Dict[str, Any]:
+        """현재 동시 실행 제한, 대기 수, 지연 추정값을 반환합니다."""
+        return {
+            "limit": self.limit,
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "queued_by_priority": {
+                priority: sum(len(waiters) for waiters in users.values())
+                for priority, users in self._queues.items()
+            },
+            "latency": self.latency,
+            "latency_by_key": {
+                "/".join(map(str, key)) if isinstance(key, tuple) else str(key): {
+                    "latency": state[0],
+                    "baseline_latency": state[1],
+                }
+                for key, state in self._latencies.items()
+            },
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+        }
+
+_llm_scheduler: Optional[LLMScheduler] = None
+
+def get_llm_scheduler() -> Optional[LLMScheduler]:
+    """공유 LLM 대기열을 반환합니다. 꺼져 있으면 None입니다."""
+    global _llm_scheduler
+    if not LLM_SCHEDULER_ENABLED:
+        return None
+    if _llm_scheduler is None:
+        _llm_scheduler = LLMScheduler()
+    return _llm_scheduler
@@ -0,0 +1,228 @@
+import time
+import bisect
+import threading
+import contextvars
+from contextlib import contextmanager
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+
+from config import METRICS_ENABLED, METRICS_BUCKETS
+
+# 지금 실행 중인 명령어 이름 (Ollama 지표의 command 라벨)
+_current_command = contextvars.ContextVar("metrics_command", default="none")
+
+@contextmanager
+def command_context(name: str):
+    """블록 안에서 보내는 Ollama 요청을 name 명령어의 요청으로 기록합니다."""
+    token = _current_command.set(name)
+    try:
+        yield
+    finally:
+        _current_command.reset(token)
+
+def current_command() -> str:
+    return _current_command.get()
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+class Counter:
+    """라벨별로 증가만 하는 값입니다."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        if not METRICS_ENABLED:
+            return
+        key = tuple(str(labels.get(name, "")) for name in self.labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(tuple(str(labels.get(name, "")) for name in self.labels), 0)
+
+    def total(self, **labels) -> float:
+        """주어진 라벨 값과 일치하는 모든 라벨 조합의 합계를 반환합니다."""
+        indexes = [(self.labels.index(name), str(value)) for name, value in labels.items()]
+        with self._lock:
+            return sum(value for key, value in self._values.items()
+                       if all(key[index] == expected for index, expected in indexes))
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labels, key)} {_format_value(value)}" for key, value in items]
+
+class Histogram:
+    """라벨별로 관측값을 누적 버킷에 세는 히스토그램입니다."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = (),
+                 buckets: Sequence[float] = METRICS_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        # 라벨 -> [버킷별 개수(누적 아님)..., 합계, 개수]
+        self._values: Dict[Tuple[str, ...], List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        if not METRICS_ENABLED:
+            return
+        key = tuple(str(labels.get(name, "")) for name in self.labels)
+        # value 이상인 첫 경계의 버킷 (모든 경계보다 크면 +Inf 버킷)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._values.get(key)
+            if counts is None:
+                counts = self._values[key] = [0] * (len(self.buckets) + 3)
+            counts[index] += 1
+            counts[-2] += value
+            counts[-1] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """블록 실행 시간(초)을 관측합니다. 예외가 나도 기록합니다."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def count(self, **labels) -> int:
+        counts = self._values.get(tuple(str(labels.get(name, "")) for name in self.labels))
+        return int(counts[-1]) if counts else 0
+
+    def total_count(self) -> int:
+        """모든 라벨 조합의 관측 횟수 합계를 반환합니다."""
+        with self._lock:
+            return int(sum(counts[-1] for counts in self._values.values()))
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted((key, list(counts)) for key, counts in self._values.items())
+        lines = []
+        for key, counts in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                labels = _format_labels(self.labels, key, f'le="{_format_value(bound)}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labels, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(counts[-2])}")
+            lines.append(f"{self.name}_count{labels} {int(counts[-1])}")
+        return lines
+
+class MetricsRegistry:
+    """지표를 등록해 두고 Prometheus 텍스트 형식으로 내보냅니다."""
+
+    def __init__(self):
+        self._metrics: List[Any] = []
+
+    def counter(self, name: str, help_text: str, labels: Sequence[str] = ()) -> Counter:
+        metric = Counter(name, help_text, labels)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, help_text: str, labels: Sequence[str] = (),
+                  buckets: Optional[Sequence[float]] = None) -> Histogram:
+        metric = Histogram(name, help_text, labels, buckets or METRICS_BUCKETS)
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+REGISTRY = MetricsRegistry()
+
+# 단계별 처리 시간
+# stage: config_load, prompt_render, parse_vocabulary, parse_options, parse_options_batch, distractor_engine
+STAGE_DURATION = REGISTRY.histogram(
+    "vocab_stage_duration_seconds", "처리 단계별 소요 시간(초)", ["stage"]
+)
+LLM_QUEUE_WAIT = REGISTRY.histogram(
+    "vocab_llm_queue_wait_seconds", "LLM 대기열에서 실행 차례를 기다린 시간(초)", ["priority"]
+)
+OLLAMA_FIRST_TOKEN = REGISTRY.histogram(
+    "vocab_ollama_time_to_first_token_seconds", "스트리밍 요청의 첫 조각까지 걸린 시간(초)", ["model", "command"]
+)
+OLLAMA_DURATION = REGISTRY.histogram(
+    "vocab_ollama_request_duration_seconds", "Ollama 요청 하나의 전체 시간(초)", ["model", "command"]
+)
+MONGO_DURATION = REGISTRY.histogram(
+    "vocab_mongo_duration_seconds", "MongoDB 작업 시간(초)", ["operation"]
+)
+
+# Ollama 응답의 eval_count / eval_duration (토큰/초 = rate(tokens) / rate(seconds))
+OLLAMA_EVAL_TOKENS = REGISTRY.counter(
+    "vocab_ollama_eval_tokens_total", "Ollama가 생성한 토큰 수 (eval_count 합계)", ["model", "command"]
+)
+OLLAMA_EVAL_SECONDS = REGISTRY.counter(
+    "vocab_ollama_eval_seconds_total", "Ollama가 토큰 생성에 쓴 시간(초, eval_duration 합계)", ["model", "command"]
+)
+OLLAMA_ERRORS = REGISTRY.counter(
+    "vocab_ollama_errors_total", "실패한 Ollama 요청 수", ["model", "command"]
+)
+
+# parser: vocabulary, options, options_batch
+PARSE_FAILURES = REGISTRY.counter(
+    "vocab_parse_failures_total", "LLM 응답에서 필요한 항목을 파싱하지 못한 횟수", ["parser"]
+)
+# source: distractor_engine, default_options
+OPTION_FALLBACKS = REGISTRY.counter(
+    "vocab_option_fallbacks_total", "LLM 선택지 대신 다른 방법으로 선택지를 만든 횟수", ["source"]
+)
+# parser: vocabulary, options, options_batch / result: json (구조화 출력 디코드 성공), fallback (텍스트 파서 사용)
+STRUCTURED_OUTPUT = REGISTRY.counter(
+    "vocab_structured_output_total", "구조화 출력 명령어의 응답을 디코드한 방법별 횟수", ["parser", "result"]
+)
+# kind: ollama_failover, ollama_hedge, options_batch_item
+RETRIES = REGISTRY.counter(
+    "vocab_retries_total", "다시 시도한 호출 수", ["kind"]
+)
+# result: startup, evicted (메모리에서 내려가 다시 불러옴), error
+MODEL_WARMUPS = REGISTRY.counter(
+    "vocab_model_warmups_total", "Ollama 서버에 모델을 미리 불러온 횟수", ["model", "result"]
+)
+LOG_DROPPED = REGISTRY.counter(
+    "vocab_log_dropped_total", "로그 대기열이 가득 차 버린 로그 레코드 수"
+)
+
+def record_ollama_response(model: str, command: str, data: Dict[str, Any], elapsed: float):
+    """Ollama 응답(비스트리밍 본문 또는 스트림의 마지막 줄)의 시간과 eval 통계를 기록합니다."""
+    OLLAMA_DURATION.observe(elapsed, model=model, command=command)
+    eval_count = data.get("eval_count")
+    eval_duration = data.get("eval_duration")
+    if eval_count:
+        OLLAMA_EVAL_TOKENS.inc(eval_count, model=model, command=command)
+    if eval_duration:
+        # Ollama는 나노초 단위로 보냄
+        OLLAMA_EVAL_SECONDS.inc(eval_duration / 1e9, model=model, command=command)
+
+def render_metrics() -> str:
+    """모든 지표를 Prometheus 텍스트 형식으로 반환합니다."""
+    return REGISTRY.render()
@@ -0,0 +1,212 @@
+import time
+import asyncio
+from typing import Dict, Any, List, Optional, Iterable
+
+import httpx
+
+from config import (
+    MODEL_WARMUP_ENABLED,
+    MODEL_WARMUP_INTERVAL,
+    MODEL_WARMUP_TIMEOUT,
+)
+from utils.backend_pool import Backend, BackendPool
+from utils.command_registry import get_command_registry
+from utils.ollama_utils import get_ollama_client, keep_alive_for
+from utils.metrics import MODEL_WARMUPS
+from utils.structured_log import log
+
+def loaded_name(model: str) -> str:
+    """/api/ps가 돌려주는 이름과 비교할 수 있도록 태그가 없으면 :latest를 붙입니다."""
+    return model if ":" in model else f"{model}:latest"
+
+def registry_models() -> List[str]:
+    """명령어 저장소의 전역 모델과 명령어별 모델 이름을 중복 없이 반환합니다."""
+    registry = get_command_registry()
+    names = [registry.config["model"]["name"]]
+    names.extend(command.model["name"] for command in registry.commands())
+    return list(dict.fromkeys(names))
+
+class ModelState:
+    """서버 하나의 모델 하나가 메모리에 올라와 있는지 기록합니다."""
+
+    def __init__(self):
+        self.hot = False
+        self.warming = False
+        self.warmups = 0
+        self.last_warmed: Optional[float] = None  # time.time()
+        self.load_seconds: Optional[float] = None
+        self.error: Optional[str] = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "hot": self.hot,
+            "warming": self.warming,
+            "warmups": self.warmups,
+            "last_warmed": self.last_warmed,
+            "load_seconds": self.load_seconds,
+            "error": self.error,
+        }
+
+class ModelWarmer:
+    """
+    모든 Ollama 서버에 명령어가 쓰는 모델을 미리 올려 두는 백그라운드 작업입니다.
+
+    시작하면 (서버, 모델)마다 프롬프트 없는 /api/generate를 keep_alive와 함께 보내 모델만 불러오고,
+    그 뒤 interval초마다 /api/ps로 메모리에 남아 있는지 확인해 내려간 모델을 다시 불러옵니다.
+    서버 시작을 막지 않으며, ready()는 모든 모델이 사용 가능한 서버 하나 이상에 올라와 있을 때 True입니다.
+    """
+
+    def __init__(self, pool: BackendPool, models: Optional[Iterable[str]] = None,
+                 interval: float = MODEL_WARMUP_INTERVAL, timeout: float = MODEL_WARMUP_TIMEOUT):
+        self.pool = pool
+        self._models = list(models) if models is not None else None
+        self.interval = interval
+        self.timeout = timeout
+        self._states: Dict[tuple, ModelState] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._warm_tasks: Dict[tuple, asyncio.Task] = {}
+
+    def models(self) -> List[str]:
+        # 명령어 설정이 다시 로드되면 새 모델도 불러오도록 매번 확인
+        return self._models if self._models is not None else registry_models()
+
+    def _state(self, backend: Backend, model: str) -> ModelState:
+        key = (backend.url, model)
+        state = self._states.get(key)
+        if state is None:
+            state = self._states[key] = ModelState()
+        return state
+
+    async def warm(self, backend: Backend, model: str, reason: str):
+        """서버 하나에 모델을 불러옵니다. 생성은 하지 않습니다."""
+        state = self._state(backend, model)
+        state.warming = True
+        started = time.monotonic()
+        try:
+            response = await backend.client.post(
+                "/api/generate",
+                json={"model": model, "keep_alive": keep_alive_for(model), "stream": False},
+                timeout=self.timeout
+            )
+            if response.status_code != 200:
+                raise RuntimeError(f"{response.status_code}, 응답: {response.text[:200]}")
+        except Exception as e:
+            # 예상하지 못한 오류도 이 (서버, 모델)의 실패로 기록하고 다음 확인 때 다시 시도
+            state.hot = False
+            state.error = str(e) or type(e).__name__
+            MODEL_WARMUPS.inc(model=model, result="error")
+            log("warning", "model_warmup_failed", f"경고: 모델을 불러오지 못했습니다: {model} ({backend.url})",
+                backend=backend.url, model=model, error=state.error)
+            return
+        finally:
+            state.warming = False
+        state.hot = True
+        state.error = None
+        state.warmups += 1
+        state.last_warmed = time.time()
+        state.load_seconds = round(time.monotonic() - started, 3)
+        MODEL_WARMUPS.inc(model=model, result=reason)
+        log("info", "model_warmed", backend=backend.url, model=model, reason=reason, seconds=state.load_seconds)
+
+    def _schedule_warm(self, backend: Backend, model: str, reason: str):
+        """같은 (서버, 모델)을 불러오는 중이면 다시 보내지 않습니다."""
+        key = (backend.url, model)
+        task = self._warm_tasks.get(key)
+        if task is not None and not task.done():
+            return
+        self._warm_tasks[key] = asyncio.create_task(self.warm(backend, model, reason))
+
+    async def check(self, backend: Backend, models: List[str]):
+        """/api/ps로 메모리에 있는 모델을 확인하고 내려간 모델을 다시 불러옵니다."""
+        try:
+            response = await backend.client.get("/api/ps", timeout=self.pool.health_timeout)
+            response.raise_for_status()
+            loaded = {entry.get("name") for entry in response.json().get("models", [])}
+        except (httpx.HTTPError, ValueError):
+            # 상태를 알 수 없으면 마지막으로 알던 상태를 유지
+            return
+        for model in models:
+            state = self._state(backend, model)
+            if loaded_name(model) in loaded:
+                state.hot = True
+            elif not state.warming:
+                reason = "evicted" if state.hot or state.warmups else "startup"
+                state.hot = False
+                self._schedule_warm(backend, model, reason)
+
+    async def _run(self):
+        models = self.models()
+        for backend in self.pool.backends:
+            for model in models:
+                self._schedule_warm(backend, model, "startup")
+        while True:
+            await asyncio.sleep(self.interval)
+            # 한 번의 확인이 실패해도 작업이 끝나지 않도록 오류는 기록만 하고 다음 주기에 다시 확인
+            try:
+                models = self.models()
+                backends = [backend for backend in self.pool.backends if backend.available]
+                results = await asyncio.gather(
+                    *(self.check(backend, models) for backend in backends), return_exceptions=True
+                )
+            except Exception as e:
+                log("warning", "model_warmup_check_failed", f"경고: 모델 상태 확인 실패: {str(e)}",
+                    error=type(e).__name__)
+                continue
+            for backend, result in zip(backends, results):
+                if isinstance(result, Exception):
+                    log("warning", "model_warmup_check_failed",
+                        f"경고: 모델 상태 확인 실패: {backend.url} ({str(result)})",
+                        backend=backend.url, error=type(result).__name__)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def aclose(self):
+        tasks = list(self._warm_tasks.values())
+        if self._task is not None:
+            tasks.append(self._task)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._task = None
+        self._warm_tasks.clear()
+
+    def ready(self) -> bool:
+        """모든 모델이 사용 가능한 서버 하나 이상에 올라와 있으면 True입니다."""
+        available = {backend.url for backend in self.pool.backends if backend.available}
+        hot = {model for (url, model), state in self._states.items() if state.hot and url in available}
+        return all(model in hot for model in self.models())
+
+    def stats(self) -> Dict[str, Any]:
+        """서버별, 모델별 상태를 반환합니다."""
+        return {
+            "models": self.models(),
+            "backends": {
+                backend.url: {
+                    model: self._state(backend, model).stats() for model in self.models()
+                }
+                for backend in self.pool.backends
+            }
+        }
+
+_model_warmer: Optional[ModelWarmer] = None
+
+def get_model_warmer() -> Optional[ModelWarmer]:
+    """공유 모델 예열 작업을 반환합니다. 시작하지 않았으면 None입니다."""
+    return _model_warmer
+
+def start_model_warmup(models: Optional[Iterable[str]] = None):
+    """공유 Ollama 클라이언트의 서버들에 모델 예열을 시작합니다. models가 없으면 명령어 저장소의 모델을 씁니다."""
+    global _model_warmer
+    if not MODEL_WARMUP_ENABLED or _model_warmer is not None:
+        return
+    _model_warmer = ModelWarmer(get_ollama_client().pool, models)
+    _model_warmer.start()
+
+async def close_model_warmup():
+    """예열 작업을 멈춥니다."""
+    global _model_warmer
+    if _model_warmer is not None:
+        await _model_warmer.aclose()
+        _model_warmer = None
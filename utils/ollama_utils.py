@@ -1,71 +1,350 @@
-import yaml
-import os
-import requests
 import json
-from typing import Dict
+import time
+import asyncio
+from contextlib import aclosing, nullcontext
+from typing import Dict, Any, List, Optional, AsyncIterator, Callable
+
+import httpx
+
+from config import SINGLE_FLIGHT_ENABLED, OLLAMA_KEEP_ALIVE, OLLAMA_MODEL_KEEP_ALIVE
+from utils.backend_pool import Backend, BackendPool
+from utils.command_registry import get_command_registry
+from utils.response_cache import get_response_cache, make_cache_key
+from utils.single_flight import get_single_flight
+from utils.llm_scheduler import get_llm_scheduler
+from utils.metrics import (
+    OLLAMA_FIRST_TOKEN,
+    OLLAMA_ERRORS,
+    RETRIES,
+    command_context,
+    current_command,
+    record_ollama_response
+)
+from utils.structured_log import log
 
 def load_config():
-    """YAML 설정 파일을 로드합니다."""
-    try:
-        # 현재 디렉토리에서 파일 찾기
-        config_path = "EnglishCommand.yaml"
-        
-        # 파일이 없으면 상위 디렉토리에서 찾기
-        if not os.path.exists(config_path):
-            config_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "EnglishCommand.yaml")
-        
-        # 파일이 여전히 없으면 기본 설정 반환
-        if not os.path.exists(config_path):
-            print("경고: EnglishCommand.yaml 파일을 찾을 수 없습니다. 기본 설정을 사용합니다.")
-            return {
-                "model": "llama2",
-                "temperature": 0.7,
-                "top_p": 0.9,
-                "max_tokens": 500
-            }
-            
-        with open(config_path, "r", encoding="utf-8") as file:
-            return yaml.safe_load(file)
-    except Exception as e:
-        print(f"경고: YAML 파일을 로드하는 중 오류가 발생했습니다: {e}")
-        # 오류 발생 시 기본 설정 반환
-        return {
-            "model": "llama2",
-            "temperature": 0.7,
-            "top_p": 0.9,
-            "max_tokens": 500
-        }
+    """YAML 설정을 반환합니다. 파일은 명령어 저장소가 한 번만 로드합니다."""
+    return get_command_registry().config
+
+class OllamaError(RuntimeError):
+    """Ollama API 호출 실패를 나타냅니다. retryable이면 다른 서버로 다시 보내도 됩니다."""
+
+    def __init__(self, message: str, retryable: bool = False):
+        super().__init__(message)
+        self.retryable = retryable
+
+def translate_http_error(error: httpx.HTTPError) -> OllamaError:
+    """httpx 예외를 OllamaError로 변환합니다."""
+    if isinstance(error, (httpx.ConnectError, httpx.ConnectTimeout)):
+        # 요청이 서버에 도달하지 않았으므로 다른 서버로 재시도 가능
+        return OllamaError("Ollama 서버에 연결할 수 없습니다.", retryable=True)
+    if isinstance(error, httpx.TimeoutException):
+        return OllamaError(f"Ollama 응답 시간 초과: {str(error)}")
+    return OllamaError(f"Ollama API 호출 중 오류 발생: {str(error)}")
+
+def keep_alive_for(model: str):
+    """
+    모델별 keep_alive 값을 반환합니다 (OLLAMA_MODEL_KEEP_ALIVE에 없으면 OLLAMA_KEEP_ALIVE).
+    Ollama는 요청마다 모델의 남은 유지 시간을 그 요청의 keep_alive로 다시 정하므로 모든 요청에 넣습니다.
+    """
+    return OLLAMA_MODEL_KEEP_ALIVE.get(model, OLLAMA_KEEP_ALIVE)
+
+def admission(model: str, command: str):
+    """
+    LLM 대기열에서 실행 차례를 받는 컨텍스트를 반환합니다. 대기열이 꺼져 있으면 바로 실행합니다.
+    지연은 (model, command)별 기준과 비교합니다.
+    """
+    scheduler = get_llm_scheduler()
+    return scheduler.slot((model, command)) if scheduler is not None else nullcontext()
+
+class OllamaClient:
+    """
+    여러 Ollama 서버(BackendPool)에 요청을 나눠 보내는 비동기 클라이언트입니다.
 
-def generate_with_ollama(prompt, model="llama2", temperature=0.7, top_p=0.9, max_tokens=500):
-    """Ollama를 사용하여 텍스트를 생성합니다."""
-    # 임시 구현 - 실제로는 Ollama API를 호출해야 합니다
-    return f"Ollama 응답: {prompt[:50]}..."
+    연결에 실패하거나 5xx로 응답한 서버는 건너뛰고 다른 서버로 다시 보냅니다.
+    헤징을 켜면 최근 지연의 백분위수보다 오래 걸리는 요청을 다른 서버에도 보내 먼저 온 응답을 씁니다.
+    """
 
-def generate_with_ollama(prompt: str, config: Dict) -> str:
-    """Ollama API를 사용하여 텍스트를 생성합니다."""
-    try:
-        url = "http://localhost:11434/api/generate"
+    def __init__(self, pool: Optional[BackendPool] = None):
+        self.pool = pool if pool is not None else BackendPool()
+
+    @staticmethod
+    def build_payload(prompt: str, model: str, temperature: float, top_p: float,
+                      max_tokens: int, stream: bool = False, output_format: Any = None) -> Dict[str, Any]:
+        """/api/generate 요청 본문을 생성합니다. output_format("json" 또는 JSON 스키마)을 주면 구조화 출력을 요청합니다."""
         payload = {
-            "model": config["model"]["name"],
+            "model": model,
             "prompt": prompt,
-            "temperature": config["model"]["temperature"],
-            "top_p": config["model"]["top_p"],
-            "max_tokens": config["model"]["max_tokens"]
+            "stream": stream,
+            "keep_alive": keep_alive_for(model),
+            "options": {
+                "temperature": temperature,
+                "top_p": top_p,
+                "num_predict": max_tokens
+            }
         }
-        
-        response = requests.post(url, json=payload)
-        response.raise_for_status()
-        
-        full_response = ""
-        for line in response.text.strip().split('\n'):
-            if line:
-                data = json.loads(line)
-                full_response += data.get("response", "")
-                if data.get("done", False):
-                    break
-        
-        return full_response
-    except requests.exceptions.ConnectionError:
-        raise Exception("Ollama 서버에 연결할 수 없습니다.")
-    except Exception as e:
-        raise Exception(f"Ollama API 호출 중 오류 발생: {str(e)}") 
\ No newline at end of file
+        if output_format is not None:
+            payload["format"] = output_format
+        return payload
+
+    async def generate(self, prompt: str, model: str = "llama2", temperature: float = 0.7,
+                       top_p: float = 0.9, max_tokens: int = 500, output_format: Any = None) -> str:
+        """프롬프트를 보내고 생성된 전체 텍스트를 반환합니다."""
+        payload = self.build_payload(prompt, model, temperature, top_p, max_tokens, output_format=output_format)
+        async with admission(model, current_command()):
+            return await self._generate_hedged(payload)
+
+    async def _post(self, backend: Backend, payload: Dict[str, Any]) -> str:
+        """서버 하나에 요청을 보내고 생성된 텍스트를 반환합니다."""
+        backend.outstanding += 1
+        backend.requests += 1
+        started = time.monotonic()
+        try:
+            response = await backend.client.post("/api/generate", json=payload)
+        except httpx.HTTPError as e:
+            self.pool.record_failure(backend)
+            OLLAMA_ERRORS.inc(model=payload["model"], command=current_command())
+            raise translate_http_error(e) from e
+        finally:
+            backend.outstanding -= 1
+
+        if response.status_code != 200:
+            server_error = response.status_code >= 500
+            if server_error:
+                self.pool.record_failure(backend)
+            OLLAMA_ERRORS.inc(model=payload["model"], command=current_command())
+            raise OllamaError(f"API 호출 실패: {response.status_code}, 응답: {response.text}", retryable=server_error)
+
+        elapsed = time.monotonic() - started
+        self.pool.record_success(backend, elapsed, (payload["model"], current_command()))
+        data = response.json()
+        record_ollama_response(payload["model"], current_command(), data, elapsed)
+        return data.get("response", "")
+
+    async def _post_with_failover(self, payload: Dict[str, Any], tried: List[Backend]) -> str:
+        """재시도 가능한 오류가 나면 아직 시도하지 않은 서버로 다시 보냅니다. tried에 사용한 서버를 기록합니다."""
+        last_error = None
+        while True:
+            backend = self.pool.pick(exclude=tried)
+            if backend is None:
+                raise last_error or OllamaError("사용 가능한 Ollama 서버가 없습니다.")
+            tried.append(backend)
+            try:
+                return await self._post(backend, payload)
+            except OllamaError as e:
+                if not e.retryable:
+                    raise
+                last_error = e
+                RETRIES.inc(kind="ollama_failover")
+                log("warning", "ollama_failover", f"경고: {backend.url} 호출 실패, 다른 서버로 재시도합니다: {str(e)}",
+                    backend=backend.url)
+
+    async def _generate_hedged(self, payload: Dict[str, Any]) -> str:
+        delay = self.pool.hedge_delay((payload["model"], current_command()))
+        tried = []
+        if delay is None:
+            return await self._post_with_failover(payload, tried)
+
+        tasks = [asyncio.ensure_future(self._post_with_failover(payload, tried))]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if not done and any(backend.available and backend not in tried for backend in self.pool.backends):
+                # 지연 백분위수를 넘긴 요청은 다른 서버에도 보냄
+                tasks.append(asyncio.ensure_future(self._post_with_failover(payload, list(tried))))
+                self.pool.hedged += 1
+                RETRIES.inc(kind="ollama_hedge")
+
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is not tasks[0]:
+                            self.pool.hedge_wins += 1
+                        return task.result()
+            # 모두 실패하면 첫 요청의 오류를 전달
+            return tasks[0].result()
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    async def stream(self, prompt: str, model: str = "llama2", temperature: float = 0.7,
+                     top_p: float = 0.9, max_tokens: int = 500, output_format: Any = None,
+                     command: Optional[str] = None) -> AsyncIterator[str]:
+        """
+        프롬프트를 보내고 생성되는 텍스트 조각을 도착하는 순서대로 내보냅니다.
+        command는 지표에 기록할 명령어 이름입니다 (제너레이터는 호출한 쪽의 컨텍스트에서 실행되므로 직접 전달).
+        """
+        payload = self.build_payload(prompt, model, temperature, top_p, max_tokens, stream=True,
+                                     output_format=output_format)
+        command = command or current_command()
+        # 스트림이 끝날 때까지 실행 차례를 유지
+        async with admission(model, command):
+            tried = []
+            last_error = None
+            while True:
+                backend = self.pool.pick(exclude=tried)
+                if backend is None:
+                    raise last_error or OllamaError("사용 가능한 Ollama 서버가 없습니다.")
+                tried.append(backend)
+                received = False
+                try:
+                    async with aclosing(self._stream_from(backend, payload, command)) as chunks:
+                        async for chunk in chunks:
+                            received = True
+                            yield chunk
+                    return
+                except OllamaError as e:
+                    # 이미 조각을 내보냈으면 다른 서버로 이어 받을 수 없음
+                    if received or not e.retryable:
+                        raise
+                    last_error = e
+                    RETRIES.inc(kind="ollama_failover")
+                    log("warning", "ollama_failover", f"경고: {backend.url} 호출 실패, 다른 서버로 재시도합니다: {str(e)}",
+                        backend=backend.url)
+
+    async def _stream_from(self, backend: Backend, payload: Dict[str, Any], command: str) -> AsyncIterator[str]:
+        backend.outstanding += 1
+        backend.requests += 1
+        model = payload["model"]
+        started = time.monotonic()
+        try:
+            async with backend.client.stream("POST", "/api/generate", json=payload) as response:
+                if response.status_code != 200:
+                    body = (await response.aread()).decode("utf-8", "replace")
+                    server_error = response.status_code >= 500
+                    if server_error:
+                        self.pool.record_failure(backend)
+                    OLLAMA_ERRORS.inc(model=model, command=command)
+                    raise OllamaError(f"API 호출 실패: {response.status_code}, 응답: {body}", retryable=server_error)
+
+                # Ollama는 한 줄에 하나의 JSON 객체를 보냄
+                first_chunk = True
+                data = {}
+                async for line in response.aiter_lines():
+                    if not line:
+                        continue
+                    data = json.loads(line)
+                    chunk = data.get("response", "")
+                    if chunk:
+                        if first_chunk:
+                            OLLAMA_FIRST_TOKEN.observe(time.monotonic() - started, model=model, command=command)
+                            first_chunk = False
+                        yield chunk
+                    if data.get("done", False):
+                        break
+            elapsed = time.monotonic() - started
+            self.pool.record_success(backend, elapsed, (model, command))
+            # 마지막 줄(done)에 eval_count / eval_duration이 들어 있음
+            record_ollama_response(model, command, data, elapsed)
+        except httpx.HTTPError as e:
+            self.pool.record_failure(backend)
+            OLLAMA_ERRORS.inc(model=model, command=command)
+            raise translate_http_error(e) from e
+        finally:
+            backend.outstanding -= 1
+
+    def start_health_checks(self):
+        """서버 상태 확인을 시작합니다."""
+        self.pool.start_health_checks()
+
+    async def aclose(self):
+        """상태 확인을 멈추고 커넥션 풀을 닫습니다."""
+        await self.pool.aclose()
+
+# 프로세스 전체에서 공유하는 클라이언트
+_ollama_client: Optional[OllamaClient] = None
+
+def get_ollama_client() -> OllamaClient:
+    """공유 Ollama 클라이언트를 반환합니다."""
+    global _ollama_client
+    if _ollama_client is None:
+        _ollama_client = OllamaClient()
+    return _ollama_client
+
+def start_ollama_health_checks():
+    """공유 클라이언트의 서버 상태 확인을 시작합니다."""
+    get_ollama_client().start_health_checks()
+
+async def close_ollama_client():
+    """공유 Ollama 클라이언트의 커넥션 풀을 닫습니다."""
+    global _ollama_client
+    if _ollama_client is not None:
+        await _ollama_client.aclose()
+        _ollama_client = None
+
+def get_model_settings(config: Dict) -> Dict[str, Any]:
+    """설정에서 모델 이름과 샘플링 파라미터를 꺼냅니다."""
+    model = config["model"]
+    return {
+        "model": model["name"],
+        "temperature": model["temperature"],
+        "top_p": model["top_p"],
+        "max_tokens": model["max_tokens"]
+    }
+
+async def generate_with_ollama(prompt: str, config: Dict, output_format: Any = None) -> str:
+    """Ollama API를 사용하여 텍스트를 생성합니다. output_format을 주면 구조화(JSON) 출력을 요청합니다."""
+    return await get_ollama_client().generate(prompt, output_format=output_format, **get_model_settings(config))
+
+async def generate_for_command(command, prompt: str, model_settings: Optional[Dict[str, Any]] = None,
+                               validate: Optional[Callable[[str], bool]] = None, use_cache: bool = True) -> str:
+    """
+    명령어 단위로 텍스트를 생성합니다.
+    명령어가 캐시를 사용하면 먼저 캐시를 확인하고, 새로 생성한 응답은 validate를 통과할 때만 저장합니다.
+    use_cache가 False이면 캐시를 건너뜁니다.
+    같은 (명령어, 프롬프트, 모델 설정)으로 진행 중인 생성이 있으면 새로 호출하지 않고 그 결과를 함께 받습니다.
+    """
+    if model_settings is None:
+        model_settings = command.model_settings()
+
+    cache = get_response_cache() if command.cache_enabled and use_cache else None
+    key = make_cache_key(command.name, prompt, model_settings)
+    if cache is not None:
+        cached = await cache.get(key)
+        if cached is not None:
+            return cached
+
+    async def generate():
+        with command_context(command.name):
+            generated_text = await get_ollama_client().generate(prompt, **model_settings)
+        if cache is not None and (validate is None or validate(generated_text)):
+            await cache.set(key, generated_text, command.cache_ttl)
+        return generated_text
+
+    if not SINGLE_FLIGHT_ENABLED:
+        return await generate()
+    return await get_single_flight().run(key, generate)
+
+async def stream_for_command(command, prompt: str, model_settings: Optional[Dict[str, Any]] = None,
+                             validate: Optional[Callable[[str], bool]] = None) -> AsyncIterator[str]:
+    """
+    명령어 단위로 텍스트 조각을 스트리밍합니다.
+    캐시에 있으면 저장된 전체 텍스트를 한 번에 내보내고, 끝까지 받은 응답만 캐시에 저장합니다.
+    """
+    if model_settings is None:
+        model_settings = command.model_settings()
+
+    cache = get_response_cache() if command.cache_enabled else None
+    if cache is None:
+        async with aclosing(get_ollama_client().stream(prompt, command=command.name, **model_settings)) as stream:
+            async for chunk in stream:
+                yield chunk
+        return
+
+    key = make_cache_key(command.name, prompt, model_settings)
+    cached = await cache.get(key)
+    if cached is not None:
+        yield cached
+        return
+
+    chunks = []
+    async with aclosing(get_ollama_client().stream(prompt, command=command.name, **model_settings)) as stream:
+        async for chunk in stream:
+            chunks.append(chunk)
+            yield chunk
+
+    generated_text = "".join(chunks)
+    if validate is None or validate(generated_text):
+        await cache.set(key, generated_text, command.cache_ttl)
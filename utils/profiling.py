@@ -0,0 +1,139 @@
+import os
+import re
+import time
+import asyncio
+import cProfile
+import datetime
+from urllib.parse import parse_qsl
+
+from config import (
+    PROFILING_TOKEN,
+    PROFILING_FORMAT,
+    PROFILING_DIR,
+    PROFILING_URL_PREFIX,
+    PROFILING_MAX_FILES,
+    PROFILING_INTERVAL,
+)
+from utils.structured_log import log
+
+PROFILE_HEADER = b"x-profile"
+PROFILE_QUERY = "profile"
+UNSAFE_FILENAME_PATTERN = re.compile(r"[^A-Za-z0-9_-]+")
+
+def _profile_requested(scope) -> bool:
+    """X-Profile 헤더나 profile 쿼리 값이 켜짐(또는 PROFILING_TOKEN과 같음)인지 확인합니다."""
+    value = None
+    for name, header_value in scope["headers"]:
+        if name == PROFILE_HEADER:
+            value = header_value.decode("latin-1")
+            break
+    if value is None and scope.get("query_string"):
+        value = dict(parse_qsl(scope["query_string"].decode("latin-1"))).get(PROFILE_QUERY)
+    if value is None:
+        return False
+    if PROFILING_TOKEN:
+        return value == PROFILING_TOKEN
+    return value.lower() in ("1", "true", "yes")
+
+def _profile_filename(scope, extension: str) -> str:
+    path = UNSAFE_FILENAME_PATTERN.sub("_", scope["path"]).strip("_") or "root"
+    stamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+    return f"{stamp}-{scope['method'].lower()}-{path[:60]}.{extension}"
+
+def _apply_retention(directory: str, max_files: int):
+    """가장 최근 max_files개만 남기고 오래된 프로파일을 지웁니다."""
+    try:
+        names = [name for name in os.listdir(directory) if name.endswith((".html", ".pstats"))]
+    except FileNotFoundError:
+        return
+    if len(names) <= max_files:
+        return
+    paths = sorted((os.path.join(directory, name) for name in names), key=os.path.getmtime)
+    for path in paths[:len(paths) - max_files]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+def _load_pyinstrument():
+    try:
+        from pyinstrument import Profiler
+    except ImportError:
+        return None
+    return Profiler
+
+class ProfilingMiddleware:
+    """
+    X-Profile 헤더나 ?profile= 쿼리가 있는 요청 하나를 프로파일러로 감싸고 결과를 PROFILING_DIR에 저장합니다.
+    응답의 X-Profile-URL 헤더로 저장 위치(/static/profiles/...)를 알려 줍니다.
+
+    "html"은 pyinstrument 샘플링 프로파일러로 await 시간을 포함한 호출 트리를 만들어
+    LLM 대기, 파싱, MongoDB 중 어디서 시간이 가는지 볼 수 있습니다.
+    "pstats"(또는 pyinstrument가 없을 때)는 cProfile 결과라 await 중인 시간은 빠지고,
+    같은 이벤트 루프에서 동시에 실행된 다른 요청의 함수도 함께 기록됩니다.
+    프로파일러는 스레드에 하나만 걸 수 있으므로 한 번에 한 요청만 프로파일링하고, 그동안 들어온 요청은 그냥 처리합니다.
+    PROFILING_ENABLED가 꺼져 있으면 main.py가 이 미들웨어를 등록하지 않으므로 비용이 없습니다.
+    """
+
+    def __init__(self, app, directory: str = PROFILING_DIR, url_prefix: str = PROFILING_URL_PREFIX,
+                 output_format: str = PROFILING_FORMAT, max_files: int = PROFILING_MAX_FILES,
+                 interval: float = PROFILING_INTERVAL):
+        self.app = app
+        self.directory = directory
+        self.url_prefix = url_prefix.rstrip("/")
+        self.max_files = max_files
+        self.interval = interval
+        self.pyinstrument = _load_pyinstrument() if output_format == "html" else None
+        if output_format == "html" and self.pyinstrument is None:
+            log("warning", "profiling_fallback", "pyinstrument가 설치되어 있지 않아 pstats 형식으로 프로파일을 저장합니다.")
+        self._busy = False
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or self._busy or not _profile_requested(scope):
+            await self.app(scope, receive, send)
+            return
+
+        extension = "html" if self.pyinstrument is not None else "pstats"
+        filename = _profile_filename(scope, extension)
+
+        async def send_with_profile_url(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"x-profile-url", f"{self.url_prefix}/{filename}".encode("latin-1"))
+                ]
+            await send(message)
+
+        if self.pyinstrument is not None:
+            profiler = self.pyinstrument(interval=self.interval, async_mode="enabled")
+            start, stop = profiler.start, profiler.stop
+        else:
+            profiler = cProfile.Profile()
+            start, stop = profiler.enable, profiler.disable
+
+        self._busy = True
+        started = time.perf_counter()
+        start()
+        try:
+            await self.app(scope, receive, send_with_profile_url)
+        finally:
+            stop()
+            self._busy = False
+            elapsed = time.perf_counter() - started
+            # 결과 변환과 파일 쓰기는 이벤트 루프를 막지 않도록 스레드에서 실행
+            await asyncio.to_thread(self._save, profiler, filename)
+            log("info", "request_profiled", path=scope["path"], seconds=round(elapsed, 3),
+                profile=f"{self.url_prefix}/{filename}")
+
+    def _save(self, profiler, filename: str):
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, filename)
+        try:
+            if self.pyinstrument is not None:
+                with open(path, "w", encoding="utf-8") as file:
+                    file.write(profiler.output_html())
+            else:
+                profiler.dump_stats(path)
+        except Exception as e:
+            log("warning", "profiling_save_failed", f"경고: 프로파일을 저장하지 못했습니다: {str(e)}", path=path)
+            return
+        _apply_retention(self.directory, self.max_files)
@@ -0,0 +1,209 @@
+import os
+import json
+import time
+import sqlite3
+import asyncio
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+
+from config import (
+    CACHE_ENABLED,
+    CACHE_TTL,
+    CACHE_MEMORY_MAX_ENTRIES,
+    CACHE_MEMORY_MAX_BYTES,
+    CACHE_DB_PATH,
+    CACHE_DB_MAX_ENTRIES,
+)
+
+def make_cache_key(command: str, prompt: str, model_settings: Dict[str, Any]) -> str:
+    """(명령어, 프롬프트, 모델, 샘플링 파라미터, 출력 형식)로 캐시 키를 만듭니다."""
+    fields = [command, prompt, model_settings.get("model"), model_settings.get("temperature"),
+              model_settings.get("top_p"), model_settings.get("max_tokens")]
+    # 텍스트 출력 명령어의 기존 키가 바뀌지 않도록 출력 형식은 있을 때만 포함
+    if model_settings.get("output_format") is not None:
+        fields.append(model_settings["output_format"])
+    material = json.dumps(fields, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+class MemoryCache:
+    """항목 수와 전체 크기(바이트)로 제한되는 TTL LRU 캐시입니다."""
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (value, expires_at, size)
+        self._bytes = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, expires_at, _ = entry
+        if expires_at <= time.time():
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: str, expires_at: float):
+        size = len(value.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (value, expires_at, size)
+        self._bytes += size
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def _remove(self, key: str):
+        _, _, size = self._entries.pop(key)
+        self._bytes -= size
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+    def __len__(self):
+        return len(self._entries)
+
+class DiskCache:
+    """재시작 후에도 유지되는 SQLite 캐시입니다. 호출은 스레드에서 실행합니다."""
+
+    def __init__(self, path: str, max_entries: int):
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._writes = 0
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "expires_at REAL NOT NULL, created_at REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS responses_created_at ON responses (created_at)")
+            self._conn.commit()
+
+    def get(self, key: str) -> Optional[tuple]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None or row[1] <= time.time():
+            return None
+        return row
+
+    def set(self, key: str, value: str, expires_at: float):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, expires_at, created_at) VALUES (?, ?, ?, ?)",
+                (key, value, expires_at, time.time())
+            )
+            self._writes += 1
+            # 가끔씩 만료 항목과 한도를 넘는 오래된 항목을 정리
+            if self._writes % 100 == 0:
+                self._prune()
+            self._conn.commit()
+
+    def _prune(self):
+        self._conn.execute("DELETE FROM responses WHERE expires_at <= ?", (time.time(),))
+        self._conn.execute(
+            "DELETE FROM responses WHERE key IN ("
+            "SELECT key FROM responses ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,)
+        )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+class ResponseCache:
+    """메모리(LRU) 계층과 디스크(SQLite) 계층으로 된 LLM 응답 캐시입니다."""
+
+    def __init__(
+        self,
+        ttl: float = CACHE_TTL,
+        memory_max_entries: int = CACHE_MEMORY_MAX_ENTRIES,
+        memory_max_bytes: int = CACHE_MEMORY_MAX_BYTES,
+        db_path: Optional[str] = CACHE_DB_PATH,
+        db_max_entries: int = CACHE_DB_MAX_ENTRIES,
+    ):
+        self.ttl = ttl
+        self.memory = MemoryCache(memory_max_entries, memory_max_bytes)
+        self.disk = DiskCache(db_path, db_max_entries) if db_path else None
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.stores = 0
+
+    async def get(self, key: str) -> Optional[str]:
+        """캐시된 응답을 찾습니다. 디스크에서 찾은 항목은 메모리로 올립니다."""
+        value = self.memory.get(key)
+        if value is not None:
+            self.memory_hits += 1
+            return value
+
+        if self.disk is not None:
+            row = await asyncio.to_thread(self.disk.get, key)
+            if row is not None:
+                value, expires_at = row
+                self.memory.set(key, value, expires_at)
+                self.disk_hits += 1
+                return value
+
+        self.misses += 1
+        return None
+
+    async def set(self, key: str, value: str, ttl: Optional[float] = None):
+        """응답을 두 계층에 저장합니다."""
+        expires_at = time.time() + (ttl if ttl is not None else self.ttl)
+        self.memory.set(key, value, expires_at)
+        if self.disk is not None:
+            await asyncio.to_thread(self.disk.set, key, value, expires_at)
+        self.stores += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """적중/실패 횟수와 현재 크기를 반환합니다."""
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0,
+            "stores": self.stores,
+            "memory_entries": len(self.memory),
+            "memory_bytes": self.memory.size_bytes,
+            "memory_evictions": self.memory.evictions,
+        }
+
+    def close(self):
+        if self.disk is not None:
+            self.disk.close()
+
+_response_cache: Optional[ResponseCache] = None
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """공유 응답 캐시를 반환합니다. 캐시가 꺼져 있으면 None입니다."""
+    global _response_cache
+    if not CACHE_ENABLED:
+        return None
+    if _response_cache is None:
+        _response_cache = ResponseCache()
+    return _response_cache
+
+def close_response_cache():
+    """공유 응답 캐시의 디스크 연결을 닫습니다."""
+    global _response_cache
+    if _response_cache is not None:
+        _response_cache.close()
+        _response_cache = None
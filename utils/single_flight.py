@@ -0,0 +1,70 @@
+import asyncio
+from typing import Dict, Any, Awaitable, Callable, Optional
+
+class SingleFlight:
+    """
+    같은 키로 동시에 들어온 호출을 하나로 합칩니다.
+
+    첫 호출만 실제로 실행하고, 끝나기 전에 들어온 같은 키의 호출은 그 결과(또는 예외)를
+    함께 받습니다. 대기자 한 명이 취소되어도 공유 작업은 계속 실행되지만,
+    마지막 대기자까지 취소되면 결과를 받을 쪽이 없으므로 공유 작업도 취소해 LLM 차례를 돌려줍니다.
+    """
+
+    def __init__(self):
+        self._tasks: Dict[str, asyncio.Task] = {}
+        # 키별로 공유 작업을 기다리는 호출 수
+        self._waiters: Dict[str, int] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    async def run(self, key: str, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """key로 진행 중인 작업이 있으면 기다리고, 없으면 factory()를 실행합니다."""
+        task = self._tasks.get(key)
+        if task is None:
+            self.calls += 1
+            task = asyncio.ensure_future(factory())
+            self._tasks[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+        else:
+            self.coalesced += 1
+        self._waiters[key] = self._waiters.get(key, 0) + 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if self._tasks.get(key) is task and self._waiters[key] == 1 and not task.done():
+                task.cancel()
+                self._forget(key)
+            raise
+        finally:
+            if self._tasks.get(key) is task:
+                self._waiters[key] -= 1
+
+    def _forget(self, key: str):
+        self._tasks.pop(key, None)
+        self._waiters.pop(key, None)
+
+    def _finish(self, key: str, task: asyncio.Task):
+        if self._tasks.get(key) is task:
+            self._forget(key)
+        # 대기자가 모두 취소된 경우에도 예외가 처리되지 않았다는 경고가 나오지 않도록 확인
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> Dict[str, Any]:
+        """실행/합쳐진 호출 수를 반환합니다."""
+        total = self.calls + self.coalesced
+        return {
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._tasks),
+            "coalesce_rate": self.coalesced / total if total else 0.0,
+        }
+
+_single_flight: Optional[SingleFlight] = None
+
+def get_single_flight() -> SingleFlight:
+    """공유 SingleFlight를 반환합니다."""
+    global _single_flight
+    if _single_flight is None:
+        _single_flight = SingleFlight()
+    return _single_flight
@@ -0,0 +1,212 @@
+import sys
+import json
+import time
+import uuid
+import queue
+import atexit
+import random
+import datetime
+import threading
+import traceback
+import contextvars
+from contextlib import contextmanager
+from typing import Dict, Any, Optional
+
+from config import (
+    LOG_ENABLED,
+    LOG_LEVEL,
+    LOG_PATH,
+    LOG_QUEUE_SIZE,
+    LOG_PAYLOAD_SAMPLE_RATE,
+    LOG_PAYLOAD_MAX_CHARS,
+)
+from utils.metrics import LOG_DROPPED
+
+LEVELS = {"debug": 10, "info": 20, "warning": 30, "error": 40}
+_min_level = LEVELS.get(LOG_LEVEL, LEVELS["info"])
+
+# 현재 요청의 로그 필드 (request_id, user_id, 큰 페이로드를 기록할지 여부 sampled)
+# 값은 바꾸지 않고 항상 새 사전으로 교체하므로 기록 스레드에 그대로 넘겨도 안전함
+_log_context = contextvars.ContextVar("log_context", default={})
+
+@contextmanager
+def log_context(**fields):
+    """
+    이 블록 안의 로그에 fields를 붙입니다.
+    request_id를 새로 지정하면 이 요청의 프롬프트/응답 본문을 기록할지 한 번 정해 요청 안의 로그가 같은 결정을 따릅니다.
+    """
+    context = {**_log_context.get(), **{key: value for key, value in fields.items() if value is not None}}
+    if "request_id" in fields and "sampled" not in fields:
+        context["sampled"] = random.random() < LOG_PAYLOAD_SAMPLE_RATE
+    token = _log_context.set(context)
+    try:
+        yield
+    finally:
+        _log_context.reset(token)
+
+class RequestContextMiddleware:
+    """
+    요청마다 request_id(X-Request-ID 헤더가 있으면 그 값)를 로그 컨텍스트에 넣고 응답 헤더로 돌려줍니다.
+    BaseHTTPMiddleware와 달리 본문을 다시 감싸지 않는 ASGI 미들웨어라 스트리밍 응답에 비용이 거의 없습니다.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        request_id = None
+        for name, value in scope["headers"]:
+            if name == b"x-request-id":
+                request_id = value.decode("latin-1")[:64]
+                break
+        request_id = request_id or uuid.uuid4().hex[:16]
+
+        async def send_with_request_id(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"x-request-id", request_id.encode("latin-1"))
+                ]
+            await send(message)
+
+        with log_context(request_id=request_id):
+            await self.app(scope, receive, send_with_request_id)
+
+class StructuredLogger:
+    """
+    로그 레코드를 대기열에 넣기만 하고, 백그라운드 스레드가 JSON 한 줄씩 모아서 씁니다.
+    대기열이 가득 차면 기다리지 않고 레코드를 버리며 vocab_log_dropped_total을 늘립니다.
+    """
+
+    _STOP = object()
+
+    def __init__(self, path: Optional[str] = LOG_PATH, queue_size: int = LOG_QUEUE_SIZE):
+        self.path = path
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._thread = threading.Thread(target=self._run, name="structured-log", daemon=True)
+        self._thread.start()
+
+    def emit(self, level: str, event: str, fields: Dict[str, Any], exc: Optional[BaseException] = None):
+        # 직렬화와 traceback 문자열 변환은 모두 기록 스레드에서 함
+        record = (time.time(), level, event, _log_context.get(), fields, exc)
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            LOG_DROPPED.inc()
+
+    def close(self, timeout: float = 5.0):
+        """대기 중인 레코드를 모두 쓰고 기록 스레드를 멈춥니다."""
+        if not self._thread.is_alive():
+            return
+        try:
+            self._queue.put(self._STOP, timeout=timeout)
+        except queue.Full:
+            return
+        self._thread.join(timeout)
+
+    def _run(self):
+        output = open(self.path, "a", encoding="utf-8") if self.path else None
+        try:
+            while True:
+                batch = [self._queue.get()]
+                # 쌓인 레코드를 한 번에 써서 쓰기/flush 횟수를 줄임
+                while len(batch) < 512:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                stop = any(record is self._STOP for record in batch)
+                lines = [self._format(record) for record in batch if record is not self._STOP]
+                if lines:
+                    stream = output or sys.stdout
+                    try:
+                        stream.write("".join(lines))
+                        stream.flush()
+                    except (OSError, ValueError):
+                        LOG_DROPPED.inc(len(lines))
+                if stop:
+                    return
+        finally:
+            if output:
+                output.close()
+
+    @staticmethod
+    def _format(record) -> str:
+        created, level, event, context, fields, exc = record
+        entry = {
+            "ts": datetime.datetime.fromtimestamp(created, datetime.timezone.utc).isoformat(timespec="milliseconds"),
+            "level": level,
+            "event": event,
+        }
+        entry.update(context)
+        entry.pop("sampled", None)
+        entry.update(fields)
+        if exc is not None:
+            entry["error"] = str(exc)
+            entry["traceback"] = "".join(traceback.format_exception(type(exc), exc, exc.__traceback__))
+        try:
+            return json.dumps(entry, ensure_ascii=False, default=str) + "\n"
+        except (TypeError, ValueError) as e:
+            return json.dumps({"ts": entry["ts"], "level": level, "event": event, "log_error": str(e)}) + "\n"
+
+_logger: Optional[StructuredLogger] = None
+_logger_lock = threading.Lock()
+
+def get_logger() -> Optional[StructuredLogger]:
+    """공유 로거를 반환합니다. LOG_ENABLED가 꺼져 있으면 None입니다."""
+    global _logger
+    if not LOG_ENABLED:
+        return None
+    if _logger is None:
+        with _logger_lock:
+            if _logger is None:
+                _logger = StructuredLogger()
+                # 서버가 아닌 스크립트에서 쓰는 경우에도 종료 전에 남은 레코드를 씀
+                atexit.register(close_logger)
+    return _logger
+
+def close_logger():
+    """남은 로그를 쓰고 기록 스레드를 멈춥니다."""
+    global _logger
+    if _logger is not None:
+        _logger.close()
+        _logger = None
+
+def log_enabled(level: str) -> bool:
+    return LOG_ENABLED and LEVELS[level] >= _min_level
+
+def log(level: str, event: str, message: str = "", **fields):
+    """event 레코드를 기록합니다. level이 LOG_LEVEL보다 낮거나 로그가 꺼져 있으면 바로 반환합니다."""
+    if not log_enabled(level):
+        return
+    if message:
+        fields["message"] = message
+    get_logger().emit(level, event, fields)
+
+def log_exception(event: str, message: str, exc: BaseException, **fields):
+    """오류 레코드를 traceback과 함께 기록합니다."""
+    if not log_enabled("error"):
+        return
+    fields["message"] = message
+    get_logger().emit("error", event, fields, exc)
+
+def log_payload(event: str, **fields):
+    """
+    프롬프트나 생성된 텍스트처럼 큰 본문을 LOG_PAYLOAD_SAMPLE_RATE 비율로만 기록합니다.
+    문자열 값은 LOG_PAYLOAD_MAX_CHARS까지만 남깁니다.
+    """
+    if not log_enabled("info") or LOG_PAYLOAD_SAMPLE_RATE <= 0:
+        return
+    sampled = _log_context.get().get("sampled")
+    if sampled is None:
+        # 요청 밖(단어 풀 채우기 등)에서는 호출마다 정함
+        sampled = random.random() < LOG_PAYLOAD_SAMPLE_RATE
+    if not sampled:
+        return
+    for key, value in list(fields.items()):
+        if isinstance(value, str) and len(value) > LOG_PAYLOAD_MAX_CHARS:
+            fields[key] = value[:LOG_PAYLOAD_MAX_CHARS]
+            fields[f"{key}_length"] = len(value)
+    get_logger().emit("info", event, fields)